@@ -0,0 +1,168 @@
+"""Offline stand-ins for every external service the crew talks to.
+
+Serper, EXA and scraped pages are served from recorded fixtures by a local
+HTTP server, so the real clients, transports and parsers stay on the
+measured path. yfinance, the LLM and the embedder are replaced in process
+with fixture-backed fakes that return the same data on every call.
+"""
+import functools
+import hashlib
+import json
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+@functools.lru_cache(maxsize=None)
+def load_fixture(name: str):
+    with open(os.path.join(FIXTURES, name), "r", encoding="utf-8") as f:
+        return f.read() if name.endswith(".html") else json.load(f)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    routes = {}  # path -> (content type, body bytes)
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real APIs
+    wbufsize = 1 << 16  # headers and body leave in one segment, avoiding Nagle stalls
+
+    def _reply(self):
+        route = self.routes.get(self.path.split("?")[0])
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        if route is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        content_type, body = route
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)  # conditional GET of an unchanged page
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+class StandInServer:
+    """Threaded local server replaying the recorded Serper, EXA and page fixtures."""
+
+    def __init__(self):
+        _Handler.routes = {
+            "/news": ("application/json", json.dumps(load_fixture("serper_news.json")).encode()),
+            "/search": ("application/json", json.dumps(load_fixture("exa_search.json")).encode()),
+            "/page": ("text/html", load_fixture("page.html").encode()),
+        }
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_port}"
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class FakeTicker:
+    """yfinance.Ticker replaying the recorded history, info and dividends."""
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        data = load_fixture("yfinance.json")
+        history = data["history"]
+        self._history = pd.DataFrame(
+            {field: history[field] for field in ("Open", "High", "Low", "Close", "Volume")},
+            index=pd.DatetimeIndex(history["dates"], name="Date"),
+        )
+        self._history["Dividends"] = 0.0
+        self._history["Stock Splits"] = 0.0
+        self.info = {**data["info"], "symbol": symbol}
+        self.dividends = pd.Series(data["dividends"], dtype=float)
+        self.dividends.index = pd.DatetimeIndex(self.dividends.index)
+        self.earnings = None
+        self.news = []
+
+    def history(self, period: str = None, start=None, end=None, **kwargs) -> pd.DataFrame:
+        if period:
+            return self._history.tail(int(re.match(r"\d+", period).group()))
+        return self._history.loc[pd.Timestamp(start):pd.Timestamp(end) - pd.Timedelta(days=1)]
+
+
+def fake_download(tickers, period: str = None, start=None, end=None, group_by: str = "ticker", **kwargs) -> pd.DataFrame:
+    """yf.download over ``FakeTicker`` data, with the (ticker, field) column layout."""
+    tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+    frames = {symbol: FakeTicker(symbol).history(period=period, start=start, end=end) for symbol in tickers}
+    return pd.concat(frames, axis=1)
+
+
+def hash_embedder(texts, dim: int = 256):
+    """Deterministic bag-of-words embedding: each token hashes into one of ``dim`` buckets."""
+    vectors = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for token in re.findall(r"\w+", text.lower()):
+            vectors[row, int(hashlib.md5(token.encode()).hexdigest()[:8], 16) % dim] += 1.0
+    return vectors
+
+
+def _canned_llm_call(self, messages, tools=None, callbacks=None, available_functions=None):
+    """Answer like a ReAct agent: call the agent's recorded tool once, then give its final answer."""
+    completions = load_fixture("llm_completions.json")
+    text = messages if isinstance(messages, str) else "\n".join(str(m.get("content", "")) for m in messages)
+    role = next((role for role in completions if f"You are {role}" in text), None)
+    if role is None:
+        # Converter / summarizer prompts: hand back the JSON already in the prompt
+        match = re.search(r"\{.*\}", text, re.S)
+        return match.group() if match else "{}"
+    canned = completions[role]
+    if canned.get("action") and "Observation:" not in text:
+        action = canned["action"]
+        return (
+            f"Thought: I should gather data first.\nAction: {action['tool']}\n"
+            f"Action Input: {json.dumps(action['input'])}"
+        )
+    return f"Thought: I now know the final answer\nFinal Answer: {json.dumps(canned['final'])}"
+
+
+def install(server_url: str):
+    """Route every external dependency to the stand-ins; returns nothing, patches in place."""
+    import yfinance
+    from crewai.knowledge.storage.knowledge_storage import KnowledgeStorage
+    from crewai.llm import LLM
+
+    import ipm.tools.serper_client as serper_client
+    from ipm.rate_limit import rate_limiter
+
+    serper_client.SERPER_NEWS_URL = f"{server_url}/news"
+    rate_limiter.configure(quotas={})  # the stand-ins have no quotas to respect
+    yfinance.Ticker = FakeTicker
+    yfinance.download = fake_download
+    LLM.call = _canned_llm_call
+    KnowledgeStorage._set_embedder_config = lambda self, embedder=None: setattr(self, "embedder", hash_embedder)
+
+    try:
+        from exa_py import Exa
+        from crewai_tools.tools.exa_tools import exa_search_tool
+
+        exa_search_tool.Exa = functools.partial(Exa, base_url=server_url)
+    except ImportError:
+        pass  # crewai_tools without EXA support; the EXA benchmark is skipped
@@ -0,0 +1,307 @@
+"""Offline benchmark suite for the tools, models and a full Ipm crew run.
+
+Usage:
+    python benchmarks/run.py                      # all suites
+    python benchmarks/run.py --suite tools models # selected suites
+    python benchmarks/run.py --compare benchmarks/results/<commit>.json
+
+Every external call is served by ``replay``, so runs are deterministic
+and need no API keys. Results are written as JSON (one record per
+benchmark with latency percentiles and throughput) to
+``benchmarks/results/<commit>.json`` for comparison across commits.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKDIR = tempfile.mkdtemp(prefix="ipm-bench-")
+
+# Caches, outputs and credentials must be isolated before ipm is imported
+os.environ["IPM_CACHE_DIR"] = os.path.join(WORKDIR, ".cache")
+os.environ.setdefault("MODEL", "gemini/gemini-2.0-flash")
+for name in ("GEMINI_API_KEY", "SERPER_API_KEY", "EXA_API_KEY", "OPENAI_API_KEY"):
+    os.environ.setdefault(name, "offline-benchmark")
+os.environ["CREWAI_DISABLE_TELEMETRY"] = "true"
+os.environ["OTEL_SDK_DISABLED"] = "true"
+os.environ["LITELLM_LOCAL_MODEL_COST_MAP"] = "True"
+warnings.filterwarnings("ignore")
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import replay  # noqa: E402
+
+
+def measure(name: str, fn, iterations: int, warmup: int = 1, setup=None) -> dict:
+    """Call ``fn`` ``iterations`` times after ``warmup`` calls; ``setup`` runs untimed before each call."""
+    for _ in range(warmup):
+        if setup:
+            setup()
+        fn()
+    timings = []
+    for _ in range(iterations):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    result = {
+        "name": name,
+        "iterations": iterations,
+        "mean_ms": statistics.fmean(timings) * 1000,
+        "p50_ms": timings[len(timings) // 2] * 1000,
+        "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000,
+        "min_ms": timings[0] * 1000,
+        "ops_per_s": len(timings) / sum(timings) if sum(timings) else float("inf"),
+    }
+    print(f"  {name:<40} p50 {result['p50_ms']:>10.3f} ms   p95 {result['p95_ms']:>10.3f} ms   {result['ops_per_s']:>10.1f} ops/s")
+    return result
+
+
+def silent(fn):
+    """``fn`` with its prints (tools and verbose agents log to stdout) swallowed."""
+    def call():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fn()
+    return call
+
+
+def suite_tools(scale: int) -> list:
+    from ipm.tools.fin import FetchStockDataTool, stock_cache
+    from ipm.tools.price_store import price_store
+    from ipm.tools.news_archive import news_archive
+    from ipm.tools.serper_client import news_cache
+    from ipm.tools.serper_news import SerperNewsTool
+
+    def forget_news():
+        news_cache.clear()
+        news_archive.clear()
+
+    serper = SerperNewsTool(api_key="offline-benchmark")
+    stock = FetchStockDataTool()
+    results = [
+        measure("serper_news.uncached", silent(lambda: serper._run(query="infrastructure market outlook")), 20 * scale, setup=forget_news),
+        measure("serper_news.cached", silent(lambda: serper._run(query="infrastructure market outlook")), 200 * scale),
+        measure("serper_news.batch_4", silent(lambda: serper._run(queries=["metro rail", "cement demand", "steel prices", "rbi policy"])), 10 * scale, setup=forget_news),
+        measure("fetch_stock.current", lambda: stock._run(ticker="RELIANCE.NS"), 50 * scale, setup=stock_cache.clear),
+        measure("fetch_stock.info", lambda: stock._run(ticker="RELIANCE.NS", data_type="info"), 50 * scale, setup=stock_cache.clear),
+        measure("fetch_stock.historical_cold", lambda: stock._run(ticker="RELIANCE.NS", data_type="historical", start_date="2024-01-01", end_date="2024-12-31", format="json"), 10 * scale, setup=price_store.clear),
+        measure("fetch_stock.historical_warm", lambda: stock._run(ticker="RELIANCE.NS", data_type="historical", start_date="2024-01-01", end_date="2024-12-31", format="json"), 50 * scale),
+        measure("fetch_stock.batch_3_current", lambda: stock._run(tickers=["RELIANCE.NS", "TCS.NS", "INFY.NS"]), 20 * scale, setup=stock_cache.clear),
+    ]
+    try:
+        from crewai_tools import EXASearchTool, ScrapeWebsiteTool
+
+        exa = EXASearchTool(api_key="offline-benchmark")
+        scrape = ScrapeWebsiteTool()
+        results.append(measure("exa_search", lambda: exa._run(search_query="Indian infrastructure stocks"), 20 * scale))
+        results.append(measure("scrape_website", lambda: scrape._run(website_url=f"{SERVER.url}/page"), 20 * scale))
+    except ImportError:
+        print("  crewai_tools not installed; skipping EXA and scrape benchmarks")
+
+    from ipm.tools.scraper import page_cache, scrape_pages
+
+    links = [f"{SERVER.url}/page?article={i}" for i in range(15)]
+    results += [
+        measure("scrape_links.15_cold", lambda: scrape_pages(links), 10 * scale, setup=page_cache.clear),
+        measure("scrape_links.15_cached", lambda: scrape_pages(links), 100 * scale),
+        measure("scrape_links.15_revalidated", lambda: scrape_pages(links, max_age=0), 10 * scale),
+    ]
+    return results
+
+
+def suite_relevance(scale: int) -> list:
+    from ipm.tools.news_archive import NewsArchive
+    from ipm.tools.news_dedup import dedupe_articles
+    from ipm.tools.relevance import market_filter
+
+    articles = replay.load_fixture("serper_news.json")["news"]
+    many = [dict(article, link=f"{article['link']}?v={i}") for i in range(20) for article in articles]
+    archive = NewsArchive(os.path.join(WORKDIR, "bench_archive.sqlite"))
+    archive.add([dict(article, link=f"{article['link']}?v={i}", title=f"{article['title']} {i}") for i in range(200) for article in articles])
+    return [
+        measure("relevance.filter_15", lambda: market_filter.filter(articles), 500 * scale),
+        measure("relevance.filter_300", lambda: market_filter.filter(many), 50 * scale),
+        measure("dedupe.300", lambda: dedupe_articles(many), 50 * scale),
+        measure("news_archive.search_3000", lambda: archive.search("cement demand infrastructure", limit=15), 100 * scale),
+    ]
+
+
+def suite_serialization(scale: int) -> list:
+    from ipm.context import field_tree, fit_budget, project, render_context
+    from ipm.tools.price_format import historical_payload
+    from ipm.tools.serper_client import batch_response
+
+    history = replay.FakeTicker("RELIANCE.NS").history(start="2024-01-01", end="2025-01-01")
+    articles = replay.load_fixture("serper_news.json")["news"]
+    report = replay.load_fixture("llm_completions.json")["Document Analyst"]["final"]
+    report_fields = field_tree(["project_name", "project_description", "objectives", "risks", "timeline"])
+    news_fields = field_tree(["news.title", "news.link", "news.snippet", "news.date", "news.source"])
+
+    def project_context():
+        sections = [["document_query_task", project(report, report_fields)], ["market_analysis_task", project({"news": articles}, news_fields)]]
+        return render_context(fit_budget(sections, 1500))
+
+    return [
+        measure("context.project_budget_1500", project_context, 500 * scale),
+        measure("historical_payload.daily_csv", lambda: historical_payload(history, "daily", True, "csv"), 100 * scale),
+        measure("historical_payload.weekly_columns", lambda: historical_payload(history, "weekly", True, "columns"), 100 * scale),
+        measure("historical_payload.json_dumps", lambda: json.dumps(historical_payload(history, "daily", True, "columns"), separators=(",", ":")), 100 * scale),
+        measure("batch_response.15", lambda: batch_response(articles, {}, lambda data: data["news"]), 500 * scale),
+    ]
+
+
+def varied_reports(report: dict, count: int) -> list:
+    """``count`` NDJSON lines shaped like ``report``, with the numbers and wording varied per line."""
+    rng = random.Random(0)
+    wording = ["Outperforming", "Underperforming", "Weak demand", "Strong order book", "Flat", "Rallied", "Mixed"]
+    sectors = ["Infrastructure", "IT", "Banking", "Cement", "Steel", "Pharma", "FMCG", "Auto", "Power", "Realty"]
+    lines = []
+    for i in range(count):
+        data = {
+            "stock_market_fluctuations": [
+                dict(entry, change=f"{rng.choice('+-')}{rng.uniform(0, 5):.2f}%", driver=f"{entry['driver']} {i}")
+                for entry in report["stock_market_fluctuations"] * rng.randint(1, 3)
+            ],
+            "job_market_trends": [dict(entry, trend=f"Hiring up {rng.randint(1, 30)}% in report {i}") for entry in report["job_market_trends"]],
+            "economic_news": [dict(entry, headline=f"{entry['headline']} ({i})") for entry in report["economic_news"]],
+            "sector_performance": {
+                sector: f"{rng.choice(wording)}, {rng.choice('+-')}{rng.uniform(0, 9):.1f}% this week"
+                for sector in rng.sample(sectors, rng.randint(2, 6))
+            },
+            "investment_strategies": [f"{strategy} ({i})" for strategy in report["investment_strategies"]],
+        }
+        lines.append(json.dumps(data) + "\n")
+    return lines
+
+
+def suite_models(scale: int) -> list:
+    from ipm.models import FinalReport, SerperNewsResponse, StockTrendAnalysisResult
+
+    completions = replay.load_fixture("llm_completions.json")
+    cases = [
+        ("FinalReport", FinalReport, completions["Document Analyst"]["final"]),
+        ("SerperNewsResponse", SerperNewsResponse, replay.load_fixture("serper_news.json")),
+        ("StockTrendAnalysisResult", StockTrendAnalysisResult, completions["Stock Market Research Analyst"]["final"]),
+    ]
+    results = []
+    for name, model, data in cases:
+        raw = json.dumps(data)
+        results.append(measure(f"validate.{name}.dict", lambda: model.model_validate(data), 2000 * scale))
+        results.append(measure(f"validate.{name}.json", lambda: model.model_validate_json(raw), 2000 * scale))
+        instance = model.model_validate(data)
+        results.append(measure(f"dump.{name}.json", lambda: instance.model_dump_json(), 2000 * scale))
+
+    from ipm.records import StockReportTable, load_ndjson
+
+    lines = varied_reports(completions["Stock Market Research Analyst"]["final"], 1000)
+    records, _ = load_ndjson(lines, StockTrendAnalysisResult, records=True, trusted=True)
+    results += [
+        measure("ndjson.StockTrendAnalysisResult.models_1000", lambda: load_ndjson(lines, StockTrendAnalysisResult), 20 * scale),
+        measure("ndjson.StockTrendAnalysisResult.records_1000", lambda: load_ndjson(lines, StockTrendAnalysisResult, records=True), 20 * scale),
+        measure("ndjson.StockTrendAnalysisResult.trusted_1000", lambda: load_ndjson(lines, StockTrendAnalysisResult, records=True, trusted=True), 20 * scale),
+        measure("records.StockReportTable.sector_summary_1000", lambda: StockReportTable(records).sector_summary(), 20 * scale),
+    ]
+    return results
+
+
+def suite_crew(scale: int) -> list:
+    from ipm.crew import Ipm
+    from ipm.task_cache import task_cache
+
+    inputs = {"question": "Give me a brief about this whole document."}
+    previous = os.getcwd()
+    os.chdir(WORKDIR)
+    if not os.path.exists("knowledge"):
+        os.symlink(os.path.join(ROOT, "knowledge"), "knowledge")
+
+    def kickoff():
+        Ipm(retriever="local").crew().kickoff(inputs=inputs)
+
+    try:
+        results = [
+            measure("crew.kickoff", silent(kickoff), 3 * scale, setup=task_cache.invalidate),
+            measure("crew.kickoff_task_cache", silent(kickoff), 3 * scale),
+        ]
+    finally:
+        os.chdir(previous)
+    print(f"  {'(crew outputs in ' + WORKDIR + '/output)':<40}")
+    return results
+
+
+SUITES = {
+    "tools": suite_tools,
+    "relevance": suite_relevance,
+    "serialization": suite_serialization,
+    "models": suite_models,
+    "crew": suite_crew,
+}
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current: dict, baseline: dict):
+    """Print the p50 change of every benchmark present in both runs."""
+    before = {result["name"]: result for result in baseline["results"]}
+    print(f"\np50 vs {baseline['commit']}:")
+    for result in current["results"]:
+        if result["name"] in before:
+            old, new = before[result["name"]]["p50_ms"], result["p50_ms"]
+            change = (new - old) / old * 100 if old else 0.0
+            print(f"  {result['name']:<40} {old:>10.3f} -> {new:>10.3f} ms  {change:+7.1f}%")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--suite", nargs="+", choices=sorted(SUITES), default=list(SUITES))
+    parser.add_argument("--scale", type=int, default=1, help="Multiply every iteration count.")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<commit>.json).")
+    parser.add_argument("--compare", help="Earlier result file to compare against.")
+    args = parser.parse_args(argv)
+
+    global SERVER
+    with replay.StandInServer() as SERVER:
+        replay.install(SERVER.url)
+        results = []
+        for name in args.suite:
+            print(f"[{name}]")
+            results.extend(dict(result, suite=name) for result in SUITES[name](args.scale))
+
+    commit = _commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "results": results,
+    }
+    output = args.output or os.path.join(ROOT, "benchmarks", "results", f"{commit}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
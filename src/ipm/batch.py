@@ -0,0 +1,105 @@
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional
+
+from ipm.ingest import iter_documents
+from ipm.rate_limit import rate_limiter
+from ipm.tracing import flushes_spans, tracer
+
+# One crew per worker process, built on the worker's first document
+_ipm = None
+_crew_args: dict = {}
+
+
+def document_slug(path: str, root: str) -> str:
+    """Output directory name for ``path``, unique within ``root``."""
+    relative = os.path.splitext(os.path.relpath(path, root))[0]
+    return re.sub(r"[^A-Za-z0-9_\-]+", "_", relative.replace(os.sep, "__"))
+
+
+def _init_worker(process: Optional[str], max_workers: Optional[int], workers: int):
+    global _crew_args
+    # Workers draw from the same per-key quotas; their calls queue as batch priority
+    rate_limiter.configure_worker(workers)
+    tracer.clear()  # forked workers inherit the parent's spans
+    _crew_args = {"process": process, "max_workers": max_workers}
+
+
+def _crew_for(path: str, output_dir: str):
+    global _ipm
+    if _ipm is None:
+        from ipm.crew import Ipm, document_knowledge
+
+        # The document is the crew's knowledge from the start; knowledge/ is never ingested
+        _ipm = Ipm(retriever="local", knowledge_source=document_knowledge(path), **_crew_args)
+    return _ipm.for_document(path, output_dir)
+
+
+@flushes_spans
+def _run_document(path: str, output_dir: str, inputs: Dict[str, str]) -> dict:
+    started = time.perf_counter()
+    record = {"document": path, "output_dir": output_dir}
+    try:
+        with rate_limiter.scope(client=path):
+            result = _crew_for(path, output_dir).kickoff(inputs={**inputs, "file_path": path})
+        with open(os.path.join(output_dir, "result.md"), "w", encoding="utf-8") as f:
+            f.write(result.raw)
+        record.update(status="ok", token_usage=result.token_usage.model_dump())
+    except Exception as e:
+        record.update(status="error", error=f"{type(e).__name__}: {e}")
+    record["seconds"] = round(time.perf_counter() - started, 2)
+    return record
+
+
+def run_batch(
+    paths: Iterable[str],
+    root: str,
+    output_root: str = "output/batch",
+    inputs: Dict[str, str] = None,
+    workers: int = None,
+    process: str = None,
+    max_workers: int = None,
+) -> dict:
+    """Run the crew once per document on a pool of ``workers`` processes.
+
+    Each worker builds its ``Ipm`` crew once and reuses it for every
+    document it is given. Outputs go to ``<output_root>/<document>/`` and
+    an aggregated ``summary.json`` is written to ``output_root``.
+    """
+    paths = list(paths)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(paths) or 1))
+    records: List[dict] = []
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(process, max_workers, workers)) as pool:
+        futures = {}
+        for path in paths:
+            output_dir = os.path.join(output_root, document_slug(path, root))
+            os.makedirs(output_dir, exist_ok=True)
+            futures[pool.submit(_run_document, path, output_dir, inputs or {})] = path
+        for future in as_completed(futures):
+            record = future.result()
+            records.append(record)
+            print(f"[{len(records)}/{len(paths)}] {record['status']}: {record['document']} ({record['seconds']}s)")
+
+    order = {path: i for i, path in enumerate(paths)}
+    records.sort(key=lambda record: order[record["document"]])
+    summary = {
+        "documents": len(records),
+        "succeeded": sum(record["status"] == "ok" for record in records),
+        "failed": sum(record["status"] == "error" for record in records),
+        "workers": workers,
+        "seconds": round(time.perf_counter() - started, 2),
+        "results": records,
+    }
+    os.makedirs(output_root, exist_ok=True)
+    with open(os.path.join(output_root, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+
+def run_directory(directory: str, output_root: str = "output/batch", **kwargs) -> dict:
+    """``run_batch`` over every supported document under ``directory``."""
+    return run_batch(iter_documents(directory), directory, output_root, **kwargs)
@@ -0,0 +1,177 @@
+import json
+import math
+import os
+from typing import Any, Dict, List, Optional
+
+from crewai import Task
+from crewai.tasks.task_output import TaskOutput
+
+from ipm.text import cap_text
+from ipm.tracing import tracer
+
+# Set IPM_CONTEXT_PROJECTION=0 to hand every task the full upstream outputs
+CONTEXT_PROJECTION = os.getenv("IPM_CONTEXT_PROJECTION", "1") != "0"
+
+# crewAI's separator between upstream outputs
+DIVIDER = "\n\n----------\n\n"
+# Strings are never cut below this many characters to meet a budget
+MIN_TEXT_CHARS = 200
+
+
+def field_tree(paths: List[str]) -> Dict[str, Any]:
+    """``["project_name", "news.title", "news.link"]`` -> ``{"project_name": None, "news": {"title": None, "link": None}}``.
+
+    ``None`` keeps the whole value; keys stay in the order first declared.
+    """
+    tree: Dict[str, Any] = {}
+    for path in paths:
+        node = tree
+        *parents, leaf = path.split(".")
+        for part in parents:
+            if node.get(part, {}) is None:
+                break  # the whole parent is already kept
+            node = node.setdefault(part, {})
+        else:
+            node[leaf] = None
+    return tree
+
+
+def project(value: Any, tree: Optional[Dict[str, Any]]) -> Any:
+    """``value`` narrowed to the fields in ``tree``; lists are narrowed item by item."""
+    if tree is None:
+        return value
+    if isinstance(value, list):
+        return [project(item, tree) for item in value]
+    if isinstance(value, dict):
+        return {key: project(value[key], subtree) for key, subtree in tree.items() if key in value}
+    return value
+
+
+def output_data(output: TaskOutput) -> Optional[dict]:
+    """An upstream output as a plain dict, or None if it is free text."""
+    if output.pydantic is not None:
+        return output.pydantic.model_dump(mode="json")
+    if output.json_dict:
+        return output.json_dict
+    try:
+        data = json.loads(output.raw)
+    except (TypeError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _render(value: Any) -> str:
+    return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+
+
+def _shrink(value: Any) -> Any:
+    """``value`` one step smaller, or None once it cannot be cut any further.
+
+    Lists lose their last item (Serper and the LLM list the most relevant
+    first), dicts their last key, and long strings a quarter of their text.
+    """
+    if isinstance(value, list) and len(value) > 1:
+        return value[:-1]
+    if isinstance(value, dict) and len(value) > 1:
+        return dict(list(value.items())[:-1])
+    if isinstance(value, str) and len(value) > MIN_TEXT_CHARS:
+        return cap_text(value, max(MIN_TEXT_CHARS, len(value) * 3 // 4))[0]
+    return None
+
+
+def _cap_texts(value: Any) -> Any:
+    """``value`` with every string in it over ``MIN_TEXT_CHARS`` shortened, or None if there is none."""
+    if isinstance(value, str):
+        return _shrink(value)
+    if not isinstance(value, (list, dict)):
+        return None
+    items = list(value.items()) if isinstance(value, dict) else list(enumerate(value))
+    capped = [_cap_texts(item) for _, item in items]
+    if all(item is None for item in capped):
+        return None
+    merged = [(key, item if new is None else new) for (key, item), new in zip(items, capped)]
+    return dict(merged) if isinstance(value, dict) else [item for _, item in merged]
+
+
+def fit_budget(sections: List[list], max_chars: int) -> List[list]:
+    """Cut ``[name, value]`` sections until they render within ``max_chars``.
+
+    Fields rank in declaration order; free-text sections rank as one field.
+    Long text goes first: the strings of the last field of the last section
+    are shortened down to ``MIN_TEXT_CHARS``, then those of the field ranked
+    above it. Then every list keeps the same share of its leading items, so
+    a 15-article list and a 5-risk list shrink together. Only then are
+    trailing dict keys dropped, lowest ranked first.
+    """
+    total = len(render_context(sections))
+    # (holder, slot) of each field from the lowest ranked up; a free-text section is its own field
+    fields = [
+        (sections[index], 1) if key is None else (sections[index][1], key)
+        for index in reversed(range(len(sections)))
+        for key in (reversed(list(sections[index][1])) if isinstance(sections[index][1], dict) else [None])
+    ]
+
+    def cut(shrink) -> bool:
+        nonlocal total
+        for holder, slot in fields:
+            while total > max_chars:
+                smaller = shrink(holder[slot])
+                if smaller is None:
+                    break
+                total += len(_render(smaller)) - len(_render(holder[slot]))
+                holder[slot] = smaller
+        return total <= max_chars
+
+    if cut(_cap_texts):
+        return sections
+    lists = [(holder, slot, len(holder[slot])) for holder, slot in fields if isinstance(holder[slot], list) and len(holder[slot]) > 1]
+    fraction = 1.0
+    while total > max_chars and any(len(holder[slot]) > 1 for holder, slot, _ in lists):
+        fraction *= 0.9
+        for holder, slot, length in lists:
+            keep = max(1, math.ceil(length * fraction))
+            if keep < len(holder[slot]):
+                total += len(_render(holder[slot][:keep])) - len(_render(holder[slot]))
+                holder[slot] = holder[slot][:keep]
+    cut(_shrink)
+    return sections
+
+
+def render_context(sections: List[list]) -> str:
+    return DIVIDER.join(f"{name}:\n{_render(value)}" for name, value in sections)
+
+
+def project_context(task: Task, context: Optional[str]) -> Optional[str]:
+    """The context for ``task``: its upstream outputs narrowed to the declared fields.
+
+    ``task.context_fields`` maps an upstream task name to the fields of its
+    output to pass on (``news.title`` for a field of every article);
+    upstream tasks it does not name are passed whole. ``task.context_max_chars``
+    caps the length with ``fit_budget``. Without either, ``context`` is
+    returned unchanged.
+    """
+    fields = getattr(task, "context_fields", None) or {}
+    max_chars = getattr(task, "context_max_chars", None)
+    if not CONTEXT_PROJECTION or not (fields or max_chars) or not isinstance(task.context, list):
+        return context
+    unknown = set(fields) - {upstream.name for upstream in task.context}
+    if unknown:
+        raise ValueError(f"Task '{task.name}' declares context_fields for {sorted(unknown)}, which are not in its context.")
+
+    with tracer.span("context.project", "context", task=task.name, chars_in=len(context or "")) as span:
+        sections = []
+        for upstream in task.context:
+            if upstream.output is None:
+                continue
+            data = output_data(upstream.output)
+            if data is None:
+                sections.append([upstream.name, upstream.output.raw])
+            elif upstream.name in fields:
+                sections.append([upstream.name, project(data, field_tree(fields[upstream.name]))])
+            else:
+                sections.append([upstream.name, data])
+        if max_chars:
+            fit_budget(sections, max_chars)
+        projected = render_context(sections)
+        span["chars_out"] = len(projected)
+    return projected
@@ -1,29 +1,109 @@
+from functools import lru_cache
 from crewai import Agent, Crew, Process, Task, LLM
 from crewai.project import CrewBase, agent, crew, task
-from crewai.knowledge.source.pdf_knowledge_source import PDFKnowledgeSource
+from crewai.utilities.printer import Printer
 from .models import (
     FinalReport,
     SerperNewsResponse,
     StockTrendAnalysisResult
 )
-from crewai_tools import EXASearchTool, ScrapeWebsiteTool
+from ipm.llm_cache import llm_cache
+from ipm.rate_limit import EMBEDDING_QUOTAS, rate_limiter
+from ipm.task_cache import CachedTask
 import json
-from ipm.tools.serper_news import SerperNewsTool
-from ipm.tools.serper2 import SerperNewsTool2
 import os
 from dotenv import load_dotenv
 load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
-llm = LLM(
-    model=os.getenv("MODEL"),
-    api_key=GEMINI_API_KEY,
-    temperature=0,
-    streaming=True,
-    stop=["###"]
-)
+# The LLM, knowledge source and tools are built on first use, so importing this
+# module (and every CLI entry point) stays cheap. crewai_tools alone takes seconds.
+
+class RateLimitedLLM(LLM):
+    """
+    LLM whose calls wait for the provider's quota in the shared rate limiter
+    (the model prefix, e.g. 'gemini'). A 429 pauses the quota for every caller
+    and is retried, instead of failing the agent.
+    """
+
+    max_rate_limit_retries = 3
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None):
+        import litellm
+
+        provider = (self.model or "").split("/")[0]
+        for attempt in range(self.max_rate_limit_retries + 1):
+            rate_limiter.acquire(provider)
+            try:
+                return super().call(messages, tools, callbacks, available_functions)
+            except litellm.RateLimitError:
+                if attempt == self.max_rate_limit_retries or provider not in rate_limiter.buckets:
+                    raise
+                rate_limiter.penalize(provider, min(60.0, 2.0 * (2 ** attempt)))
+
+
+class CachedLLM(RateLimitedLLM):
+    """
+    LLM that answers repeated prompts from llm_cache; at temperature 0 the
+    same prompt gives an equivalent completion. Hits never touch the quota.
+    Calls that may execute functions are always made.
+    """
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None):
+        compute = lambda: super(CachedLLM, self).call(messages, tools, callbacks, available_functions)
+        if available_functions:
+            return compute()
+        return llm_cache.call(self, messages, tools, compute)
+
  
-knowledge=PDFKnowledgeSource(file_paths="project_manager_final_10_pages.pdf")
+EMBEDDER = {
+    "provider": "google",
+    "config": {
+        "model": "models/text-embedding-004",
+        "api_key": GEMINI_API_KEY,
+    }
+}
+
+@lru_cache(maxsize=None)
+def get_llm() -> LLM:
+    similarity = os.getenv("IPM_LLM_CACHE_SIMILARITY")
+    if similarity:
+        # Semantic tier: reuse completions of near-identical prompts (e.g. 0.98)
+        from crewai.utilities import EmbeddingConfigurator
+
+        embedder = EmbeddingConfigurator().configure_embedder(EMBEDDER)
+        llm_cache.use_semantic(rate_limiter.limit_embedder(embedder, EMBEDDING_QUOTAS.get(EMBEDDER["provider"])), float(similarity))
+    model = os.getenv("MODEL")
+    provider = (model or "").split("/")[0]
+    # A paid key left on the free-tier default would crawl; say which quota applies
+    Printer().print(content=f"{model}: {provider} quota {rate_limiter.describe(provider)} (IPM_GEMINI_RPM / IPM_RATE_LIMITS)", color="cyan")
+    return CachedLLM(
+        model=model,
+        api_key=GEMINI_API_KEY,
+        temperature=0,
+        stream=True,
+        stop=["###"]
+    )
+
+@lru_cache(maxsize=None)
+def get_knowledge():
+    """
+    Every pdf/txt/docx under knowledge/; embeddings are cached on disk by content
+    hash, so unchanged pages are never re-embedded.
+    """
+    from ipm.ingest import KnowledgeDirectorySource
+
+    return KnowledgeDirectorySource(embedding_model=EMBEDDER["config"]["model"])
+
+def document_knowledge(path: str):
+    """Knowledge source for a single document, as used by batch runs."""
+    from ipm.ingest import KnowledgeDirectorySource
+
+    return KnowledgeDirectorySource(
+        files=[path],
+        embedding_model=EMBEDDER["config"]["model"],
+        max_workers=1,  # documents are already spread over processes
+    )
 
 import json
 
@@ -49,6 +129,38 @@ class Ipm():
     agents_config = 'config/agents.yaml'
     tasks_config = 'config/tasks.yaml'
 
+    def __init__(self, process: str = None, max_workers: int = None, retriever: str = None, knowledge_source=None):
+        """
+        process: 'sequential' (default) or 'dag', which runs tasks concurrently
+        as soon as the tasks in their `context` have finished.
+        retriever: 'local' (default) searches the on-disk embedding index in
+        process; 'chroma' uses crewAI's Chroma-backed knowledge storage.
+        All fall back to the IPM_PROCESS / IPM_MAX_WORKERS / IPM_RETRIEVER
+        environment variables.
+        knowledge_source: the documents given to the crew and the researcher;
+        defaults to everything under knowledge/ (get_knowledge).
+        """
+        self.knowledge_source = knowledge_source
+        self.process = process or os.getenv("IPM_PROCESS", "sequential")
+        self.max_workers = max_workers or int(os.getenv("IPM_MAX_WORKERS", "4"))
+        self.retriever = retriever or os.getenv("IPM_RETRIEVER", "local")
+        if self.process not in ("sequential", "dag"):
+            raise ValueError(f"Invalid process '{self.process}'. Options: 'sequential', 'dag'.")
+        if self.retriever not in ("local", "chroma"):
+            raise ValueError(f"Invalid retriever '{self.retriever}'. Options: 'local', 'chroma'.")
+
+    def knowledge(self):
+        """The injected knowledge source, else the shared knowledge/ directory source."""
+        return self.knowledge_source or get_knowledge()
+
+    def knowledge_storage(self, collection_name: str):
+        """Local storage for a knowledge collection, or None to let crewAI use Chroma."""
+        if self.retriever == "local":
+            from ipm.retriever import LocalKnowledgeStorage
+
+            return LocalKnowledgeStorage(embedder=EMBEDDER, collection_name=collection_name)
+        return None
+
     # If you would like to add tools to your agents, you can learn more about it here:
     # https://docs.crewai.com/concepts/agents#agent-tools
     @agent
@@ -56,18 +168,15 @@ class Ipm():
         return Agent(
             config=self.agents_config['researcher_agent'],
             verbose=True,
-            llm=llm,
-            embedder={
-                "provider": "google",
-                "config": {
-                    "model": "models/text-embedding-004",
-                    "api_key": GEMINI_API_KEY,
-                }
-            },
-            knowledge_sources=[knowledge]
+            llm=get_llm(),
+            embedder=EMBEDDER,
+            knowledge_sources=[self.knowledge()],
+            knowledge_storage=self.knowledge_storage("researcher_agent")
         )
     @agent
     def market_analysis_agent(self):
+        from ipm.tools.serper_news import SerperNewsTool
+
         exa_api_key = os.getenv('EXA_API_KEY')
         if not exa_api_key:
             raise ValueError("EXA_API_KEY environment variable is not set. Please check your environment variables.")
@@ -75,20 +184,26 @@ class Ipm():
             config=self.agents_config['market_analysis_agent'],
             verbose=True,
             # allow_delegation=True,
-            llm=llm,
+            llm=get_llm(),
             tools=[SerperNewsTool(api_key=os.getenv('SERPER_API_KEY'))],
             
         )
     @agent
     def stock_analysis_agent(self):
+        from crewai_tools import EXASearchTool
+        from ipm.tools.scrape_links import ScrapeLinksTool
+
         exa_api_key = os.getenv('EXA_API_KEY')
         if not exa_api_key:
             raise ValueError("EXA_API_KEY environment variable is not set. Please check your environment variables.")
+        exa_search = EXASearchTool(api_key=exa_api_key)
+        # Every Exa endpoint goes through Exa.request; hold it to the shared quota
+        exa_search.client.request = rate_limiter.wrap(exa_search.client.request, "exa")
         return Agent(
             config=self.agents_config['stock_analysis_agent'],
             verbose=True,
-            llm=llm,
-            tools=[EXASearchTool(api_key=exa_api_key), ScrapeWebsiteTool()]
+            llm=get_llm(),
+            tools=[exa_search, ScrapeLinksTool()]
             
         )
 
@@ -97,7 +212,7 @@ class Ipm():
     # https://docs.crewai.com/concepts/tasks#overview-of-a-task
     @task
     def document_query_task(self) -> Task:
-        return Task(
+        return CachedTask(
             config=self.tasks_config['document_query_task'],
             output_pydantic=FinalReport,
             output_file="output/project_overview.json"
@@ -105,7 +220,7 @@ class Ipm():
 
     @task
     def market_analysis_task(self) -> Task:
-        return Task(
+        return CachedTask(
             config=self.tasks_config['market_analysis_task'],
             output_pydantic=SerperNewsResponse,
             output_file="output/market_analysis.json"
@@ -113,30 +228,80 @@ class Ipm():
         
     @task
     def stock_analysis_task(self) -> Task:
-        return Task(
+        return CachedTask(
             config=self.tasks_config['stock_analysis_task'],
             output_pydantic=StockTrendAnalysisResult,
             output_file="output/stock_analysis.json"
         )
 
+    def for_document(self, path: str, output_dir: str) -> Crew:
+        """
+        Point this instance's crew at a single document and output directory.
+        Build the instance with Ipm(knowledge_source=document_knowledge(path))
+        for its first document; agents, tools and the LLM are then reused, and
+        later documents only swap the agents' knowledge and the task output files.
+        """
+        from crewai.knowledge.knowledge import Knowledge
+
+        source = self.knowledge_source
+        if getattr(source, "files", None) != [path]:
+            source = self.knowledge_source = document_knowledge(path)
+        crew = self.crew()  # memoized: built with the first document's source
+        for crew_agent in crew.agents:
+            if crew_agent.knowledge_sources and crew_agent.knowledge_sources[0] is not source:
+                crew_agent.knowledge_sources = [source]
+                crew_agent.knowledge_storage = self.knowledge_storage(crew_agent.role)
+        if crew.knowledge is None or crew.knowledge.sources[0] is not source:
+            crew.knowledge = Knowledge(
+                collection_name="crew",
+                sources=[source],
+                embedder=EMBEDDER,
+                storage=self.knowledge_storage("crew"),
+            )
+        for crew_task in crew.tasks:
+            if crew_task.output_file:
+                crew_task.output_file = os.path.join(output_dir, os.path.basename(crew_task.output_file))
+        return crew
+
+    def kickoff_stream(self, inputs: dict = None, output_dir: str = "output", tokens: bool = True):
+        """
+        Kick the crew off in the background and return a CrewStream: iterate it
+        (sync or async) for LLM tokens, tool results, answer fields and task
+        outputs as they arrive; they are also appended to NDJSON files in output_dir.
+        """
+        from ipm.streaming import stream_kickoff
+
+        return stream_kickoff(self.crew(), inputs, output_dir, tokens)
+
     @crew
     def crew(self) -> Crew:
         """Creates the Ipm crew"""
         # To learn how to add knowledge sources to your crew, check out the documentation:
         # https://docs.crewai.com/concepts/knowledge#what-is-knowledge
 
-        return Crew(
+        crew_args = dict(
             agents=self.agents, # Automatically created by the @agent decorator
             tasks=self.tasks, # Automatically created by the @task decorator
             process=Process.sequential,
             verbose=True,
-            knowledge_sources=[knowledge],
-            embedder={
-                "provider": "google",
-                "config": {
-                    "model": "models/text-embedding-004",
-                    "api_key": GEMINI_API_KEY,
-                }
-            }
+            knowledge_sources=[self.knowledge()],
+            embedder=EMBEDDER
             # process=Process.hierarchical, # In case you wanna use that instead https://docs.crewai.com/how-to/Hierarchical/
         )
+        if self.retriever == "local":
+            from crewai.knowledge.knowledge import Knowledge
+
+            # Crew only builds Chroma storage from knowledge_sources, so hand it a ready Knowledge
+            del crew_args["knowledge_sources"]
+            crew_args["knowledge"] = Knowledge(
+                collection_name="crew",
+                sources=[self.knowledge()],
+                embedder=EMBEDDER,
+                storage=self.knowledge_storage("crew"),
+            )
+        if self.process == "dag":
+            from ipm.scheduler import DagCrew
+
+            # Same crew, but tasks are scheduled from their `context` graph
+            return DagCrew(max_workers=self.max_workers, **crew_args)
+        return Crew(**crew_args)
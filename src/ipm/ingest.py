@@ -0,0 +1,223 @@
+import os
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+from xml.etree import ElementTree
+
+import numpy as np
+from crewai.knowledge.source.base_knowledge_source import BaseKnowledgeSource
+from crewai.utilities.constants import KNOWLEDGE_DIRECTORY
+from pydantic import Field
+
+from ipm.knowledge_index import EmbeddingIndex, chunk_id, document_date, embedding_index, save_to_storage
+from ipm.tracing import tracer
+
+SUPPORTED_EXTENSIONS = (".pdf", ".txt", ".docx")
+
+# Pages handed to one worker at a time; big PDFs split into many such units
+PAGES_PER_UNIT = 8
+
+_WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+def iter_documents(root: str = KNOWLEDGE_DIRECTORY, extensions: Tuple[str, ...] = SUPPORTED_EXTENSIONS) -> Iterator[str]:
+    """Walk ``root`` and yield supported document paths in a stable order."""
+    for directory, subdirectories, files in os.walk(root):
+        subdirectories.sort()
+        for name in sorted(files):
+            if name.lower().endswith(extensions) and not name.startswith("."):
+                yield os.path.join(directory, name)
+
+
+def _pdf_page_count(path: str) -> int:
+    import pdfplumber
+
+    with pdfplumber.open(path) as pdf:
+        return len(pdf.pages)
+
+
+def _extract_pdf_pages(path: str, start: int, stop: int) -> List[Tuple[str, int, str]]:
+    """Worker: text of pages ``[start, stop)`` as ``(path, page_number, text)``."""
+    import pdfplumber
+
+    with pdfplumber.open(path, pages=list(range(start + 1, stop + 1))) as pdf:
+        pages = [(path, start + i + 1, page.extract_text() or "") for i, page in enumerate(pdf.pages)]
+        for page in pdf.pages:
+            page.close()  # release the cached layout objects right away
+    return pages
+
+
+def _extract_docx_pages(path: str) -> List[Tuple[str, int, str]]:
+    """Worker: docx text split at explicit or last-rendered page breaks."""
+    pages, paragraphs, text = [], [], []
+    with zipfile.ZipFile(path) as archive, archive.open("word/document.xml") as xml:
+        for event, element in ElementTree.iterparse(xml, events=("start", "end")):
+            if event == "start":
+                continue
+            if element.tag == _WORD_NS + "t" and element.text:
+                text.append(element.text)
+            elif element.tag == _WORD_NS + "tab":
+                text.append("\t")
+            elif (element.tag == _WORD_NS + "br" and element.get(_WORD_NS + "type") == "page") or \
+                    element.tag == _WORD_NS + "lastRenderedPageBreak":
+                paragraphs.append("".join(text))
+                text = []
+                pages.append("\n".join(paragraphs))
+                paragraphs = []
+            elif element.tag == _WORD_NS + "p":
+                paragraphs.append("".join(text))
+                text = []
+                element.clear()
+    pages.append("\n".join(paragraphs))
+    return [(path, number, page) for number, page in enumerate(pages, start=1) if page.strip()]
+
+
+def _iter_txt_pages(path: str, lines_per_page: int = 60) -> Iterator[Tuple[str, int, str]]:
+    # Plain text is cheap to read, so it is streamed in-process in fixed-size "pages"
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for number, lines in enumerate(iter(lambda: list(islice(f, lines_per_page)), []), start=1):
+            yield path, number, "".join(lines)
+
+
+def _work_units(paths: Iterable[str]):
+    for path in paths:
+        extension = os.path.splitext(path)[1].lower()
+        if extension == ".pdf":
+            count = _pdf_page_count(path)
+            for start in range(0, count, PAGES_PER_UNIT):
+                yield _extract_pdf_pages, (path, start, min(start + PAGES_PER_UNIT, count))
+        elif extension == ".docx":
+            yield _extract_docx_pages, (path,)
+        elif extension == ".txt":
+            yield None, (path,)
+
+
+def iter_pages(paths: Iterable[str], max_workers: int = None) -> Iterator[Tuple[str, int, str]]:
+    """Yield ``(path, page_number, text)`` for every page, extracted on a process pool.
+
+    At most ``2 * max_workers`` units are in flight and results are yielded
+    in document order, so memory stays flat however large the corpus is.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1:
+        for function, args in _work_units(paths):
+            yield from function(*args) if function else _iter_txt_pages(*args)
+        return
+    window = deque()
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        for function, args in _work_units(paths):
+            if function is None:
+                # Drain pending work first to keep the output in document order
+                while window:
+                    yield from window.popleft().result()
+                yield from _iter_txt_pages(*args)
+                continue
+            window.append(pool.submit(function, *args))
+            if len(window) >= 2 * max_workers:
+                yield from window.popleft().result()
+        while window:
+            yield from window.popleft().result()
+
+
+def iter_chunks(pages: Iterable[Tuple[str, int, str]], model: str, chunk_size: int = 4000, chunk_overlap: int = 200) -> Iterator[dict]:
+    """Stream chunk records (``id``, ``source``, ``page``, ``date``, ``text``) from pages."""
+    step = chunk_size - chunk_overlap
+    dates = {}
+    for path, page_number, text in pages:
+        if not text.strip():
+            continue
+        if path not in dates:
+            dates[path] = document_date(path)
+        for start in range(0, len(text), step):
+            chunk = text[start:start + chunk_size]
+            yield {"id": chunk_id(model, chunk), "source": path, "page": page_number, "date": dates[path], "text": chunk}
+
+
+def batched(iterable: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def embed_batches(
+    chunks: Iterable[dict],
+    embedder: Callable[[List[str]], list],
+    index: EmbeddingIndex = None,
+    batch_size: int = 32,
+) -> Iterator[List[dict]]:
+    """Embed chunks missing from ``index`` in batches of ``batch_size``.
+
+    Yields each batch of records once all of its vectors are in the index,
+    so callers can push it to a vector store as the stream advances.
+    """
+    index = index or embedding_index
+    for batch in batched(chunks, batch_size):
+        batch = list({record["id"]: record for record in batch}.values())
+        missing = [record for record in batch if record["id"] not in index]
+        if missing:
+            texts = [record["text"] for record in missing]
+            with tracer.span("embed", "embedding", texts=len(texts), chars=sum(map(len, texts))):
+                vectors = embedder(texts)
+            index.add(missing, np.asarray(vectors, dtype=np.float32))
+        yield batch
+
+
+def ingest(
+    root: str,
+    embedder: Callable[[List[str]], list],
+    model: str,
+    index: EmbeddingIndex = None,
+    batch_size: int = 32,
+    max_workers: int = None,
+    chunk_size: int = 4000,
+    chunk_overlap: int = 200,
+) -> dict:
+    """Extract, chunk and embed every document under ``root`` into the index."""
+    index = index or embedding_index
+    stats = {"documents": 0, "chunks": 0, "embedded": 0}
+    paths = list(iter_documents(root))
+    stats["documents"] = len(paths)
+    before = len(index.vectors)
+    chunks = iter_chunks(iter_pages(paths, max_workers), model, chunk_size, chunk_overlap)
+    for batch in embed_batches(chunks, embedder, index, batch_size):
+        stats["chunks"] += len(batch)
+    stats["embedded"] = len(index.vectors) - before
+    return stats
+
+
+class KnowledgeDirectorySource(BaseKnowledgeSource):
+    """Knowledge source covering every pdf/txt/docx file under a directory,
+    or just the documents listed in ``files``.
+
+    Documents are streamed through ``iter_pages`` / ``iter_chunks`` and
+    embedded batch by batch, so neither the text of a whole document nor
+    its vectors are held in memory at once.
+    """
+
+    directory: str = Field(default=KNOWLEDGE_DIRECTORY, description="Directory walked for documents.")
+    files: Optional[List[str]] = Field(default=None, description="Explicit documents to use instead of walking the directory.")
+    embedding_model: str = Field(default="default", description="Embedding model name, part of every chunk's cache key.")
+    embed_batch_size: int = Field(default=32, description="Maximum number of chunks sent per embedding call.")
+    max_workers: Optional[int] = Field(default=None, description="Extraction processes; defaults to the CPU count.")
+
+    def model_post_init(self, _):
+        self.validate_content()
+
+    def validate_content(self):
+        if self.files:
+            for path in self.files:
+                if not os.path.isfile(path):
+                    raise FileNotFoundError(f"Knowledge document not found: {path}")
+        elif not os.path.isdir(self.directory):
+            raise FileNotFoundError(f"Knowledge directory not found: {self.directory}")
+
+    def add(self) -> None:
+        """Extract, chunk and embed the directory, saving each batch to the storage."""
+        if not self.storage:
+            raise ValueError("No storage found to save documents.")
+        pages = iter_pages(self.files or iter_documents(self.directory), self.max_workers)
+        chunks = iter_chunks(pages, self.embedding_model, self.chunk_size, self.chunk_overlap)
+        for batch in embed_batches(chunks, self.storage.embedder, embedding_index, self.embed_batch_size):
+            save_to_storage(self.storage, embedding_index, batch)
@@ -0,0 +1,221 @@
+import json
+import os
+import queue
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import Manager
+from typing import Any, Dict
+
+from ipm.rate_limit import rate_limiter
+from ipm.tracing import flushes_spans, tracer
+
+# Per-worker state: the parent's feedback request queue, set by the pool
+# initializer, and (answers queue, iteration) of the iteration running now
+_requests = None
+_current = None
+
+
+def _init_worker(workers: int, requests=None):
+    """Prepare a worker process: pooled quotas, private training data, human input via the parent."""
+    global _requests
+    import crewai.agent
+    import crewai.agents.crew_agent_executor
+    from crewai.agents.agent_builder.base_agent_executor_mixin import CrewAgentExecutorMixin
+
+    rate_limiter.configure_worker(workers)
+    tracer.clear()  # forked workers inherit the parent's spans
+    # crewAI keeps training feedback in ./training_data.pkl; each worker gets its own file
+    _requests = requests
+    training_file = os.path.join(tempfile.mkdtemp(prefix="ipm-iteration-"), "training_data.pkl")
+    crewai.agent.TRAINING_DATA_FILE = training_file
+    crewai.agents.crew_agent_executor.TRAINING_DATA_FILE = training_file
+    # Workers have no terminal; feedback prompts are answered by the parent, one at a time
+    CrewAgentExecutorMixin._ask_human_input = _ask_parent
+
+
+def _ask_parent(executor, final_answer: str) -> str:
+    answers, iteration = _current
+    _requests.put({"iteration": iteration, "agent": executor.agent.role, "output": final_answer})
+    return answers.get()
+
+
+def _iteration_crew(iteration: int, output_root: str):
+    """A fresh crew whose task files go to ``<output_root>/<iteration>/``."""
+    from ipm.crew import Ipm
+
+    crew = Ipm().crew()
+    for crew_task in crew.tasks:
+        if crew_task.output_file:
+            crew_task.output_file = os.path.join(output_root, str(iteration), os.path.basename(crew_task.output_file))
+    return crew
+
+
+@flushes_spans
+def _train_iteration(iteration: int, inputs: Dict[str, Any], output_root: str, answers) -> dict:
+    global _current
+    import crewai.agent
+    from crewai.utilities.training_handler import CrewTrainingHandler
+
+    _current = (answers, iteration)
+    handler = CrewTrainingHandler(crewai.agent.TRAINING_DATA_FILE)
+    handler.initialize_file()
+    crew = _iteration_crew(iteration, output_root)
+    # What Crew._setup_for_training does, minus resetting the shared files
+    crew._train = True
+    crew._train_iteration = iteration
+    for crew_task in crew.tasks:
+        crew_task.human_input = True
+        crew_task.cache = False  # a cached output would skip the feedback round
+    for crew_agent in crew.agents:
+        crew_agent.allow_delegation = False
+    with rate_limiter.scope(client=f"iteration-{iteration}"):
+        crew.kickoff(inputs=inputs)
+    data = handler.load()
+    # Agent ids are per process; roles identify the same agent across workers
+    return {"iteration": iteration, "data": {a.role: data[str(a.id)] for a in crew.agents if str(a.id) in data}}
+
+
+@flushes_spans
+def _test_iteration(iteration: int, inputs: Dict[str, Any], output_root: str, eval_llm: str) -> dict:
+    from crewai.llm import LLM
+    from crewai.utilities.evaluators.crew_evaluator_handler import CrewEvaluator
+
+    crew = _iteration_crew(iteration, output_root)
+    evaluator = CrewEvaluator(crew, LLM(model=eval_llm))
+    # The class-level defaults are shared dicts; keep this iteration's scores apart
+    evaluator.tasks_scores = defaultdict(list)
+    evaluator.run_execution_times = defaultdict(list)
+    evaluator.set_iteration(iteration)
+    started = time.perf_counter()
+    with rate_limiter.scope(client=f"iteration-{iteration}"):
+        crew.kickoff(inputs=inputs)
+    return {
+        "iteration": iteration,
+        "scores": evaluator.tasks_scores[iteration],
+        "execution_times": evaluator.run_execution_times[iteration],
+        "agents": [sorted(crew_task.processed_by_agents) for crew_task in crew.tasks],
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+def _serve_feedback(futures: set, requests, answers: Dict[int, Any]):
+    """Wait for ``futures``, asking the user for each feedback request meanwhile."""
+    pending = set(futures)
+    while pending:
+        try:
+            request = requests.get(timeout=0.5)
+        except queue.Empty:
+            _, pending = wait(pending, timeout=0, return_when=FIRST_COMPLETED)
+            continue
+        print(f"\n\033[1m\033[95m## Iteration {request['iteration']} · {request['agent']} · Final Result:\033[00m \033[92m{request['output']}\033[00m")
+        print(
+            "\n=====\n"
+            "## TRAINING MODE: Provide feedback to improve the agent's performance.\n"
+            "This will be used to train better versions of the agent.\n"
+            "Please provide detailed feedback about the result quality and reasoning process.\n"
+            "=====\n"
+        )
+        answers[request["iteration"]].put(input())
+
+
+def _results(futures: list) -> list:
+    """Results ordered by iteration, whatever order the workers finished in."""
+    return sorted((future.result() for future in futures), key=lambda result: result["iteration"])
+
+
+def _merge_training_data(agents: list, results: list) -> dict:
+    """Feedback of every iteration per agent, in the shape crewAI's train loop leaves behind.
+
+    Workers report by role; the merged data is keyed by the ids of ``agents``
+    (this process' crew), iterations in order.
+    """
+    training_data = {}
+    for crew_agent in agents:
+        merged = {}
+        for result in results:
+            merged.update(result["data"].get(crew_agent.role, {}))
+        if merged:
+            training_data[str(crew_agent.id)] = dict(sorted(merged.items()))
+    return training_data
+
+
+def _merge_test_results(crew, eval_llm: str, results: list):
+    """A ``CrewEvaluator`` for ``crew`` holding the scores and timings of every iteration."""
+    from crewai.llm import LLM
+    from crewai.utilities.evaluators.crew_evaluator_handler import CrewEvaluator
+
+    evaluator = CrewEvaluator(crew, LLM(model=eval_llm))
+    evaluator.tasks_scores = defaultdict(list)
+    evaluator.run_execution_times = defaultdict(list)
+    for result in results:
+        evaluator.tasks_scores[result["iteration"]] = result["scores"]
+        evaluator.run_execution_times[result["iteration"]] = result["execution_times"]
+    for crew_task, *agents in zip(crew.tasks, *(result["agents"] for result in results)):
+        crew_task.processed_by_agents.update(role for roles in agents for role in roles)
+    return evaluator
+
+
+def parallel_train(n_iterations: int, filename: str, inputs: Dict[str, Any] = None, workers: int = None, output_root: str = "output/iterations") -> dict:
+    """``Crew.train`` with the iterations spread over ``workers`` processes.
+
+    Each iteration runs on its own crew; feedback prompts from all workers
+    are asked here in turn. The feedback is merged in iteration order into
+    crewAI's training data and evaluated per agent exactly like ``train``,
+    so ``filename`` ends up with the same trained-agents content. Unlike
+    sequential training, an iteration does not see the feedback given to
+    iterations running alongside it.
+    """
+    from crewai.utilities.constants import TRAINING_DATA_FILE
+    from crewai.utilities.evaluators.task_evaluator import TaskEvaluator
+    from crewai.utilities.training_handler import CrewTrainingHandler
+    from ipm.crew import Ipm
+
+    workers = max(1, min(workers or os.cpu_count() or 1, n_iterations))
+    with Manager() as manager:
+        requests = manager.Queue()
+        answers = {iteration: manager.Queue() for iteration in range(n_iterations)}
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(workers, requests)) as pool:
+            futures = [
+                pool.submit(_train_iteration, iteration, inputs or {}, output_root, answers[iteration])
+                for iteration in range(n_iterations)
+            ]
+            _serve_feedback(set(futures), requests, answers)
+        results = _results(futures)
+
+    crew = Ipm().crew()
+    training_data = _merge_training_data(crew.agents, results)
+    CrewTrainingHandler(TRAINING_DATA_FILE).save(training_data)
+    trained = CrewTrainingHandler(filename)
+    trained.initialize_file()
+    for crew_agent in crew.agents:
+        if training_data.get(str(crew_agent.id)):
+            result = TaskEvaluator(crew_agent).evaluate_training_data(training_data=training_data, agent_id=str(crew_agent.id))
+            trained.save_trained_data(agent_id=str(crew_agent.role), trained_data=result.model_dump())
+    return {"iterations": n_iterations, "workers": workers, "agents": sorted({role for result in results for role in result["data"]})}
+
+
+def parallel_test(n_iterations: int, eval_llm: str, inputs: Dict[str, Any] = None, workers: int = None, output_root: str = "output/iterations") -> dict:
+    """``Crew.test`` with the iterations spread over ``workers`` processes.
+
+    Scores are merged by iteration number, printed in crewAI's score table
+    and written to ``<output_root>/test_results.json``.
+    """
+    from ipm.crew import Ipm
+
+    workers = max(1, min(workers or os.cpu_count() or 1, n_iterations))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(workers,)) as pool:
+        futures = [
+            pool.submit(_test_iteration, iteration, inputs or {}, output_root, eval_llm)
+            for iteration in range(1, n_iterations + 1)
+        ]
+        results = _results(futures)
+
+    _merge_test_results(Ipm().crew(), eval_llm, results).print_crew_evaluation_result()
+
+    summary = {"iterations": n_iterations, "workers": workers, "eval_llm": eval_llm, "results": results}
+    os.makedirs(output_root, exist_ok=True)
+    with open(os.path.join(output_root, "test_results.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    return summary
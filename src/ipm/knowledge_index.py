@@ -0,0 +1,188 @@
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import date
+from typing import Dict, List
+
+import numpy as np
+
+from ipm.tools.cache import CACHE_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, one process per index
+    fcntl = None
+
+
+def chunk_id(model: str, text: str) -> str:
+    """Content hash of a chunk; vectors depend on the model, so it is part of the key."""
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+
+def document_date(path) -> str:
+    """ISO date a document was last modified, used for date-range filters."""
+    return date.fromtimestamp(os.path.getmtime(path)).isoformat()
+
+
+class EmbeddingIndex:
+    """Append-only on-disk store of chunk embeddings keyed by content hash.
+
+    ``chunks.jsonl`` holds one ``{"id", "source", "page", "date", "text"}``
+    record per row and ``vectors.f32`` the matching float32 rows, read back
+    through ``np.memmap`` so opening the index costs a file read, not an
+    embedding call. Several processes may share one index: appends hold an
+    exclusive file lock and first pick up rows the others have written.
+    """
+
+    def __init__(self, root: str = None):
+        self.root = root or os.path.join(CACHE_DIR, "embeddings")
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.dim = None
+        self.records: List[dict] = []
+        self.rows: Dict[str, int] = {}  # chunk id -> row number
+        self._offset = 0  # bytes of chunks.jsonl covered by self.records
+        self._vectors = None
+
+    @property
+    def _meta_path(self):
+        return os.path.join(self.root, "index.json")
+
+    @property
+    def _chunks_path(self):
+        return os.path.join(self.root, "chunks.jsonl")
+
+    @property
+    def _vectors_path(self):
+        return os.path.join(self.root, "vectors.f32")
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool):
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, "index.lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _read_new(self):
+        """Pick up rows appended since the last read, by this or another process."""
+        if self.dim is None:
+            if not os.path.exists(self._meta_path):
+                return
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                self.dim = json.load(f)["dim"]
+        if not os.path.exists(self._chunks_path):
+            return
+        # A crash between the two appends leaves extra records; trust only complete rows
+        rows_on_disk = os.path.getsize(self._vectors_path) // (4 * self.dim) if os.path.exists(self._vectors_path) else 0
+        with open(self._chunks_path, "rb") as f:
+            f.seek(self._offset)
+            for line in f:
+                if len(self.records) >= rows_on_disk or not line.endswith(b"\n"):
+                    break
+                record = json.loads(line)
+                self.rows[record["id"]] = len(self.records)
+                self.records.append(record)
+                self._offset += len(line)
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        if not os.path.exists(self._meta_path):
+            return
+        with self._file_lock(exclusive=False):
+            self._read_new()
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """All stored vectors as a read-only ``(n, dim)`` memory map."""
+        with self._lock:
+            self._load()
+            if not self.records:
+                return np.empty((0, self.dim or 0), dtype=np.float32)
+            if self._vectors is None or len(self._vectors) != len(self.records):
+                self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(len(self.records), self.dim))
+            return self._vectors
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            self._load()
+            return key in self.rows
+
+    def get(self, ids: List[str]) -> np.ndarray:
+        """Vectors for ``ids``, which must all be present."""
+        vectors = self.vectors
+        return np.asarray(vectors[[self.rows[key] for key in ids]])
+
+    def add(self, records: List[dict], vectors: np.ndarray):
+        """Append new chunks; records already in the index are skipped."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock, self._file_lock(exclusive=True):
+            self._loaded = True
+            self._read_new()
+            fresh = [i for i, record in enumerate(records) if record["id"] not in self.rows]
+            if not fresh:
+                return
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+                os.makedirs(self.root, exist_ok=True)
+                # Written whole, so a concurrent reader never sees a partial file
+                temporary = f"{self._meta_path}.{os.getpid()}.tmp"
+                with open(temporary, "w", encoding="utf-8") as f:
+                    json.dump({"dim": self.dim}, f)
+                os.replace(temporary, self._meta_path)
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(
+                    f"Embedding dimension {vectors.shape[1]} does not match the index ({self.dim}). "
+                    f"Clear {self.root} after switching embedding models."
+                )
+            # Drop whatever a crashed append left past the last complete row
+            for path, size in ((self._chunks_path, self._offset), (self._vectors_path, len(self.records) * 4 * self.dim)):
+                if os.path.exists(path) and os.path.getsize(path) > size:
+                    os.truncate(path, size)
+            lines = [(json.dumps(records[i]) + "\n").encode("utf-8") for i in fresh]
+            with open(self._chunks_path, "ab") as f:
+                f.writelines(lines)
+            with open(self._vectors_path, "ab") as f:
+                f.write(np.ascontiguousarray(vectors[fresh]).tobytes())
+            for i in fresh:
+                self.rows[records[i]["id"]] = len(self.records)
+                self.records.append(records[i])
+            self._offset += sum(map(len, lines))
+            self._vectors = None
+
+
+# Shared index for every knowledge source in the process
+embedding_index = EmbeddingIndex()
+
+
+def save_to_storage(storage, index: EmbeddingIndex, records: List[dict]):
+    """Upsert indexed chunks the crewAI vector store does not hold yet.
+
+    Vectors come from ``index``, so the store never calls its embedder.
+    Storages that search the index directly only register the chunk ids.
+    """
+    add_indexed = getattr(storage, "add_indexed", None)
+    if add_indexed:
+        add_indexed(records)
+        return
+    collection = storage.collection
+    ids = [record["id"] for record in records]
+    existing = set(collection.get(ids=ids, include=[])["ids"]) if ids else set()
+    new = [record for record in records if record["id"] not in existing]
+    if new:
+        collection.upsert(
+            ids=[record["id"] for record in new],
+            documents=[record["text"] for record in new],
+            embeddings=index.get([record["id"] for record in new]).tolist(),
+            metadatas=[{"source": record["source"], "page": record["page"]} for record in new],
+        )
+
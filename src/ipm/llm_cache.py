@@ -0,0 +1,261 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ipm.tools.cache import CACHE_DIR, SQLiteCache, TieredCache, TTLCache, open_sqlite, write_sqlite
+from ipm.tracing import tracer
+
+# Completions stay valid until the prompt changes; the TTL only ages out dead entries
+LLM_CACHE_TTL = float(os.getenv("IPM_LLM_CACHE_TTL", str(30 * 24 * 60 * 60)))
+LLM_CACHE_SIZE = int(os.getenv("IPM_LLM_CACHE_SIZE", "5000"))
+
+# Embedding text is capped: the head carries the role and task, the tail the latest turn
+_SEMANTIC_HEAD = 4000
+_SEMANTIC_TAIL = 4000
+
+
+def _prompt_text(messages) -> str:
+    if isinstance(messages, str):
+        return messages
+    return "\n".join(f"{m.get('role', '')}: {m.get('content', '')}" for m in messages)
+
+
+def completion_scope(llm, tools: Optional[list] = None) -> str:
+    """Everything besides the messages that shapes a completion."""
+    response_format = getattr(llm, "response_format", None)
+    scope = {
+        "model": llm.model,
+        "temperature": llm.temperature,
+        "stop": sorted(llm.stop or []),
+        "tools": tools or [],
+        "response_format": response_format.model_json_schema() if hasattr(response_format, "model_json_schema") else response_format,
+    }
+    return hashlib.sha256(json.dumps(scope, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def completion_key(scope: str, messages) -> str:
+    return hashlib.sha256(f"{scope}\n{json.dumps(messages, sort_keys=True, default=str)}".encode("utf-8")).hexdigest()
+
+
+class SemanticIndex:
+    """Prompt embeddings of cached completions, searched by cosine similarity.
+
+    Rows live in SQLite next to the exact tier and are bounded LRU like it;
+    each scope's vectors are loaded into one matrix on first search. Like
+    the exact tier, a database locked by another process is a miss.
+    """
+
+    def __init__(self, path: str, maxsize: int = 5000):
+        self.path = path
+        self.maxsize = maxsize
+        self._conn = None
+        self._lock = threading.Lock()
+        self._matrices: Dict[str, Tuple[List[str], np.ndarray]] = {}  # scope -> (keys, unit vectors)
+
+    def _connect(self):
+        if self._conn is None:
+            conn = open_sqlite(self.path)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS prompts ("
+                "key TEXT PRIMARY KEY, scope TEXT NOT NULL, vector BLOB NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_prompts_scope ON prompts (scope)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _matrix(self, scope: str) -> Tuple[List[str], np.ndarray]:
+        if scope not in self._matrices:
+            rows = self._connect().execute("SELECT key, vector FROM prompts WHERE scope = ?", (scope,)).fetchall()
+            keys = [key for key, _ in rows]
+            vectors = np.stack([np.frombuffer(blob, dtype=np.float32) for _, blob in rows]) if rows else np.zeros((0, 0), np.float32)
+            self._matrices[scope] = (keys, vectors)
+        return self._matrices[scope]
+
+    def nearest(self, scope: str, vector: np.ndarray) -> Tuple[Optional[str], float]:
+        """Key of the most similar stored prompt in ``scope`` and its cosine similarity."""
+        with self._lock:
+            try:
+                keys, vectors = self._matrix(scope)
+            except sqlite3.OperationalError:
+                return None, 0.0
+            if not keys or vectors.shape[1] != len(vector):
+                return None, 0.0
+            scores = vectors @ vector
+            best = int(np.argmax(scores))
+            write_sqlite(self._conn, [("UPDATE prompts SET last_access = ? WHERE key = ?", (time.time(), keys[best]))])
+            return keys[best], float(scores[best])
+
+    def add(self, scope: str, key: str, vector: np.ndarray):
+        with self._lock:
+            try:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO prompts (key, scope, vector, last_access) VALUES (?, ?, ?, ?)",
+                    (key, scope, vector.astype(np.float32).tobytes(), time.time()),
+                )
+                evicted = conn.execute(
+                    "DELETE FROM prompts WHERE key IN ("
+                    "SELECT key FROM prompts ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                    (self.maxsize,),
+                ).rowcount
+                conn.commit()
+            except sqlite3.OperationalError:
+                if self._conn is not None:
+                    self._conn.rollback()
+                return  # not stored; the prompt is simply not found by later searches
+            if evicted:
+                self._matrices.clear()
+            elif scope in self._matrices:
+                keys, vectors = self._matrices[scope]
+                if key not in keys:
+                    stacked = np.vstack([vectors, vector[None, :]]) if len(keys) else vector[None, :]
+                    self._matrices[scope] = (keys + [key], stacked)
+
+    def clear(self):
+        with self._lock:
+            self._connect().execute("DELETE FROM prompts")
+            self._conn.commit()
+            self._matrices.clear()
+
+
+class LLMCache:
+    """Completion cache for the crew's LLM: an exact tier and an optional semantic tier.
+
+    The exact tier is keyed on the model, temperature, stop sequences, tools,
+    response format and the full message list, in memory and on disk
+    (size-bounded LRU). The semantic tier is off unless ``threshold`` is set;
+    it then embeds each missed prompt and answers from the stored completion
+    of the most similar earlier prompt with the same scope when the cosine
+    similarity reaches ``threshold``. Hits and misses are counted per crew
+    kickoff and reported when it completes.
+    """
+
+    def __init__(self, path: str = None, maxsize: int = LLM_CACHE_SIZE, ttl: float = LLM_CACHE_TTL):
+        path = path or os.path.join(CACHE_DIR, "llm.sqlite")
+        self.ttl = ttl
+        self.exact = TieredCache(TTLCache(maxsize=256), SQLiteCache(path, maxsize=maxsize))
+        self.semantic = SemanticIndex(path, maxsize=maxsize)
+        self.embedder: Optional[Callable[[List[str]], list]] = None
+        self.threshold: Optional[float] = None
+        self.enabled = os.getenv("IPM_LLM_CACHE", "1") != "0"
+        self.counts = defaultdict(int)  # "exact" / "semantic" / "miss" -> calls
+        self._lock = threading.Lock()
+        self.crew_stats: Dict[str, Dict[str, int]] = {}
+        self._listeners_installed = False
+
+    def use_semantic(self, embedder: Callable[[List[str]], list], threshold: Optional[float]):
+        """Enable the semantic tier (``threshold`` None disables it again)."""
+        self.embedder = embedder
+        self.threshold = threshold
+
+    def _embed(self, messages) -> np.ndarray:
+        text = _prompt_text(messages)
+        if len(text) > _SEMANTIC_HEAD + _SEMANTIC_TAIL:
+            text = text[:_SEMANTIC_HEAD] + "\n...\n" + text[-_SEMANTIC_TAIL:]
+        with tracer.span("embed.prompt", "embedding", chars=len(text)):
+            vector = np.asarray(self.embedder([text])[0], dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    def _count(self, outcome: str):
+        with self._lock:
+            self.counts[outcome] += 1
+
+    def lookup(self, llm, messages, tools: Optional[list] = None) -> Tuple[Any, str, str, Optional[np.ndarray]]:
+        """``(completion or None, tier, key, prompt vector)`` for a call about to be made."""
+        scope = completion_scope(llm, tools)
+        key = completion_key(scope, messages)
+        completion = self.exact.get(key)
+        if completion is not None:
+            return completion, "exact", key, None
+        if self.threshold is None or self.embedder is None:
+            return None, "miss", key, None
+        vector = self._embed(messages)
+        nearest, similarity = self.semantic.nearest(scope, vector)
+        if nearest is not None and similarity >= self.threshold:
+            completion = self.exact.get(nearest)
+            if completion is not None:
+                return completion, "semantic", key, vector
+        return None, "miss", key, vector
+
+    def store(self, llm, tools: Optional[list], key: str, completion: Any, vector: Optional[np.ndarray]):
+        if not isinstance(completion, str) or not completion:
+            return  # tool-call results and empty answers are not replayable
+        self.exact.set(key, completion, self.ttl)
+        if vector is not None:
+            self.semantic.add(completion_scope(llm, tools), key, vector)
+
+    def call(self, llm, messages, tools: Optional[list], compute: Callable[[], Any]) -> Any:
+        """Answer from the cache, or run ``compute`` and remember its completion."""
+        if not self.enabled:
+            return compute()
+        self._install_listeners()
+        completion, tier, key, vector = self.lookup(llm, messages, tools)
+        self._count(tier)
+        if completion is not None:
+            _emit_cached_call(llm, messages, tools, completion)
+            tracer.record(llm.model, "llm", int(time.time() * 1e6), 0, cache_hit=True, tier=tier)
+            return completion
+        completion = compute()
+        self.store(llm, tools, key, completion, vector)
+        return completion
+
+    def clear(self):
+        self.exact.clear()
+        self.semantic.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self.counts)
+        calls = sum(counts.values())
+        hits = counts.get("exact", 0) + counts.get("semantic", 0)
+        return {**counts, "calls": calls, "hit_rate": hits / calls if calls else 0.0}
+
+    def _install_listeners(self):
+        if self._listeners_installed:
+            return
+        self._listeners_installed = True
+
+        from crewai.utilities.events import crewai_event_bus
+        from crewai.utilities.events.crew_events import CrewKickoffCompletedEvent, CrewKickoffStartedEvent
+
+        started = {}  # crew id -> counts when its kickoff began
+
+        @crewai_event_bus.on(CrewKickoffStartedEvent)
+        def _kickoff_started(source, event):
+            with self._lock:
+                started[id(source)] = dict(self.counts)
+
+        @crewai_event_bus.on(CrewKickoffCompletedEvent)
+        def _kickoff_completed(source, event):
+            with self._lock:
+                before = started.pop(id(source), {})
+                delta = {outcome: self.counts[outcome] - before.get(outcome, 0) for outcome in ("exact", "semantic", "miss")}
+                total = self.crew_stats.setdefault(event.crew_name or "crew", defaultdict(int))
+                for outcome, count in delta.items():
+                    total[outcome] += count
+            calls = sum(delta.values())
+            if calls:
+                hits = delta["exact"] + delta["semantic"]
+                print(f"LLM cache for {event.crew_name or 'crew'}: {hits}/{calls} calls answered from cache "
+                      f"({delta['exact']} exact, {delta['semantic']} semantic, {hits / calls:.0%})")
+
+
+def _emit_cached_call(llm, messages, tools, completion: str):
+    # Stream consumers and UIs see a cached completion like a fresh one
+    from crewai.utilities.events import crewai_event_bus
+    from crewai.utilities.events.llm_events import LLMCallCompletedEvent, LLMCallStartedEvent, LLMCallType
+
+    crewai_event_bus.emit(llm, LLMCallStartedEvent(messages=messages, tools=tools))
+    crewai_event_bus.emit(llm, LLMCallCompletedEvent(response=completion, call_type=LLMCallType.LLM_CALL))
+
+
+# Shared by every LLM in the process, persisted across runs. IPM_LLM_CACHE=0 bypasses it.
+llm_cache = LLMCache()
@@ -1,11 +1,11 @@
 #!/usr/bin/env python
+import json
+import os
 import sys
 import warnings
 
 from datetime import datetime
 
-from ipm.crew import Ipm
-
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
 # This main file is intended to be a way for you to run your
@@ -17,6 +17,22 @@ def run():
     """
     Run the crew.
     """
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        sys.argv.pop(1)
+        return batch()
+    if len(sys.argv) > 1 and sys.argv[1] == "stream":
+        sys.argv.pop(1)
+        return stream()
+    if len(sys.argv) > 1 and sys.argv[1] == "invalidate":
+        sys.argv.pop(1)
+        return invalidate()
+    if len(sys.argv) > 1 and sys.argv[1] == "news":
+        sys.argv.pop(1)
+        return news()
+    if "--profile-startup" in sys.argv:
+        return profile_startup()
+    from ipm.crew import Ipm
+
     inputs = {
         'question': 'Give me a brief about this whole document.'
     }
@@ -30,20 +46,39 @@ def run():
 def train():
     """
     Train the crew for a given number of iterations.
+    Usage: train <n_iterations> <filename> [workers]   (workers > 1 runs iterations in parallel)
     """
+    from ipm.crew import Ipm
+
     inputs = {
         "topic": "AI LLMs"
     }
+    # Every task has to run and ask for feedback; cached outputs would skip that
+    os.environ["IPM_TASK_CACHE"] = "0"
+    workers = _iteration_workers(3)
     try:
-        Ipm().crew().train(n_iterations=int(sys.argv[1]), filename=sys.argv[2], inputs=inputs)
+        if workers > 1:
+            from ipm.iterations import parallel_train
+
+            parallel_train(int(sys.argv[1]), sys.argv[2], inputs=inputs, workers=workers)
+        else:
+            Ipm().crew().train(n_iterations=int(sys.argv[1]), filename=sys.argv[2], inputs=inputs)
 
     except Exception as e:
         raise Exception(f"An error occurred while training the crew: {e}")
 
+def _iteration_workers(position: int) -> int:
+    """Worker count for train/test: argv[position], else IPM_ITERATION_WORKERS, else 1."""
+    if len(sys.argv) > position:
+        return int(sys.argv[position])
+    return int(os.getenv("IPM_ITERATION_WORKERS", "1"))
+
 def replay():
     """
     Replay the crew execution from a specific task.
     """
+    from ipm.crew import Ipm
+
     try:
         Ipm().crew().replay(task_id=sys.argv[1])
 
@@ -53,17 +88,145 @@ def replay():
 def test():
     """
     Test the crew execution and returns the results.
+    Usage: test <n_iterations> <eval_model> [workers]   (workers > 1 runs iterations in parallel)
     """
+    from ipm.crew import Ipm
+
     inputs = {
         "topic": "AI LLMs",
         "current_year": str(datetime.now().year)
     }
+    # Each iteration is scored on a fresh run; cached outputs would score the first run n times
+    os.environ["IPM_TASK_CACHE"] = "0"
+    workers = _iteration_workers(3)
     try:
-        Ipm().crew().test(n_iterations=int(sys.argv[1]), openai_model_name=sys.argv[2], inputs=inputs)
+        if workers > 1:
+            from ipm.iterations import parallel_test
+
+            parallel_test(int(sys.argv[1]), sys.argv[2], inputs=inputs, workers=workers)
+        else:
+            Ipm().crew().test(n_iterations=int(sys.argv[1]), eval_llm=sys.argv[2], inputs=inputs)
 
     except Exception as e:
         raise Exception(f"An error occurred while testing the crew: {e}")
 
+def ingest():
+    """
+    Extract, chunk and embed every document in a directory (default: knowledge/)
+    into the local embedding index, so later crew runs skip the embedding calls.
+    """
+    from crewai.utilities import EmbeddingConfigurator
+    from ipm.crew import EMBEDDER
+    from ipm.ingest import ingest as ingest_directory
+    from ipm.rate_limit import EMBEDDING_QUOTAS, rate_limiter
+
+    directory = sys.argv[1] if len(sys.argv) > 1 else "knowledge"
+    try:
+        embedder = EmbeddingConfigurator().configure_embedder(EMBEDDER)
+        embedder = rate_limiter.limit_embedder(embedder, EMBEDDING_QUOTAS.get(EMBEDDER["provider"]))
+        stats = ingest_directory(directory, embedder, model=EMBEDDER["config"]["model"])
+        print(f"Ingested {stats['documents']} documents: {stats['chunks']} chunks, {stats['embedded']} newly embedded.")
+    except Exception as e:
+        raise Exception(f"An error occurred while ingesting documents: {e}")
+
+def batch():
+    """
+    Run the crew over every document in a directory on a process pool.
+    Usage: batch <dir> [output_dir] [workers]
+    """
+    from ipm.batch import run_directory
+
+    directory = sys.argv[1] if len(sys.argv) > 1 else "knowledge"
+    output_root = sys.argv[2] if len(sys.argv) > 2 else "output/batch"
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    inputs = {
+        'question': 'Give me a brief about this whole document.'
+    }
+    try:
+        summary = run_directory(directory, output_root, inputs=inputs, workers=workers)
+        print(f"Processed {summary['documents']} documents in {summary['seconds']}s: "
+              f"{summary['succeeded']} succeeded, {summary['failed']} failed. Summary: {output_root}/summary.json")
+    except Exception as e:
+        raise Exception(f"An error occurred while running the batch: {e}")
+
+def stream():
+    """
+    Run the crew and print each answer field, tool result and task as it completes.
+    Every event (including LLM tokens) is also appended to output/*.ndjson.
+    Usage: stream [output_dir]
+    """
+    from ipm.crew import Ipm
+
+    output_dir = sys.argv[1] if len(sys.argv) > 1 else "output"
+    inputs = {
+        'question': 'Give me a brief about this whole document.'
+    }
+    try:
+        for event in Ipm().kickoff_stream(inputs=inputs, output_dir=output_dir):
+            if event["type"] == "field":
+                print(f"[{event['task']}] {event['field']}: {json.dumps(event['value'])[:200]}")
+            elif event["type"] == "tool_result":
+                print(f"[{event['task']}] {event['tool']} returned {len(str(event['result']))} chars")
+            elif event["type"] in ("task_completed", "task_failed", "crew_completed"):
+                print(f"[{event.get('task') or 'crew'}] {event['type'].replace('_', ' ')}")
+    except Exception as e:
+        raise Exception(f"An error occurred while streaming the crew: {e}")
+
+def invalidate():
+    """
+    Drop cached task outputs so the next run recomputes them.
+    Usage: invalidate [task_name ...]   (no names: every task)
+           invalidate --llm             (cached LLM completions)
+           invalidate --news            (the local news archive)
+    """
+    from ipm.task_cache import task_cache
+
+    if "--llm" in sys.argv[1:]:
+        from ipm.llm_cache import llm_cache
+
+        llm_cache.clear()
+        print("Cleared cached LLM completions.")
+        return
+    if "--news" in sys.argv[1:]:
+        from ipm.tools.news_archive import news_archive
+        from ipm.tools.serper_client import news_cache
+
+        news_archive.clear()
+        news_cache.clear()
+        print("Cleared the news archive.")
+        return
+    names = sys.argv[1:]
+    removed = task_cache.invalidate(names)
+    print(f"Removed {removed} cached outputs for {', '.join(names) if names else 'all tasks'}.")
+
+def news():
+    """
+    Search the local news archive (every article the Serper tools have seen) without calling Serper.
+    Usage: news <query> [days]   (days: only articles published within that many days)
+    """
+    import time
+
+    from ipm.tools.news_archive import news_archive
+
+    if len(sys.argv) < 2:
+        print("Usage: news <query> [days]")
+        return
+    since = time.time() - float(sys.argv[2]) * 86400 if len(sys.argv) > 2 else None
+    articles = news_archive.search(sys.argv[1], since=since, limit=20)
+    for article in articles:
+        print(f"{article['date']:>14}  {article['title']}  ({article['source']})\n{'':>16}{article['link']}")
+    stats = news_archive.stats()
+    print(f"{len(articles)} of {stats['articles']} archived articles matched.")
+
+def profile_startup():
+    """
+    Report how long each CLI path spends importing, broken down by package.
+    Usage: ipm --profile-startup
+    """
+    from ipm.startup import profile_startup as report
+
+    report()
+
 #!/usr/bin/env python
 # import os
 # import sys
@@ -0,0 +1,306 @@
+import asyncio
+import contextvars
+import functools
+import heapq
+import itertools
+import os
+import re
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ipm.tools.cache import CACHE_DIR
+from ipm.tracing import tracer
+
+try:
+    import fcntl
+except ImportError:  # Windows: quotas are split between processes instead of pooled
+    fcntl = None
+
+# Published quotas of the plans we run on; override with IPM_RATE_LIMITS,
+# e.g. "gemini=2000/m,serper=50/s,exa=off". A provider without a quota is not throttled.
+DEFAULT_QUOTAS = {
+    "serper": "10/s",
+    "exa": "5/s",
+    # 15 requests a minute is the Gemini free tier; set IPM_GEMINI_RPM to a paid key's limit
+    "gemini": f"{os.getenv('IPM_GEMINI_RPM', '15')}/m",
+    "gemini_embedding": "1500/m",
+}
+
+# Waiters of a lower class are always served first
+PRIORITIES = {"interactive": 0, "batch": 1}
+
+# Embedder providers (crewAI embedder config) -> quota they draw from
+EMBEDDING_QUOTAS = {"google": "gemini_embedding"}
+
+_PERIODS = {"s": 1.0, "m": 60.0, "h": 3600.0}
+_QUOTA = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*/\s*(\d*)\s*([smh])\s*$")
+
+_priority: contextvars.ContextVar = contextvars.ContextVar("ipm_rate_priority", default=None)
+_client: contextvars.ContextVar = contextvars.ContextVar("ipm_rate_client", default=None)
+
+
+def parse_quota(quota: str) -> Tuple[float, float]:
+    """``"15/m"`` -> (requests per second, burst size); ``"100/10s"`` is also accepted."""
+    match = _QUOTA.match(quota)
+    if not match:
+        raise ValueError(f"Invalid quota '{quota}'. Expected e.g. '5/s', '15/m' or '100/10s'.")
+    limit, count, unit = match.groups()
+    period = float(count or 1) * _PERIODS[unit]
+    return float(limit) / period, float(limit)
+
+
+def parse_quotas(spec: str) -> Dict[str, str]:
+    quotas = {}
+    for item in filter(None, (part.strip() for part in (spec or "").split(","))):
+        provider, _, quota = item.partition("=")
+        quotas[provider.strip()] = quota.strip()
+    return quotas
+
+
+class TokenBucket:
+    """``rate`` tokens per second, holding at most ``capacity``.
+
+    Tokens may go negative: a request costing more than the bucket holds
+    takes it into debt, which later requests wait off.
+    """
+
+    _clock = staticmethod(time.monotonic)
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = self._clock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, cost: float) -> float:
+        """Seconds until ``cost`` tokens (capped at the capacity) are available."""
+        self._refill(self._clock())
+        missing = min(cost, self.capacity) - self.tokens
+        return max(0.0, missing / self.rate)
+
+    def take(self, cost: float):
+        self.tokens -= cost
+
+    def try_take(self, cost: float) -> float:
+        """Take ``cost`` tokens if they are available; returns the seconds to wait otherwise."""
+        wait = self.wait_time(cost)
+        if wait <= 0:
+            self.take(cost)
+        return wait
+
+    def pause(self, seconds: float):
+        """Hand out nothing for ``seconds``, e.g. after the provider answered 429."""
+        self._refill(self._clock())
+        self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+
+
+class SharedTokenBucket(TokenBucket):
+    """A ``TokenBucket`` kept in the file ``path``, drawn from by every process that opens it.
+
+    Provider quotas are per API key, not per process: pool workers pooling
+    one bucket can each use the whole quota while the others are idle.
+    ``try_take`` and ``pause`` read and write the state under an exclusive
+    ``fcntl`` lock.
+    """
+
+    _clock = staticmethod(time.time)  # comparable across processes
+    _state = struct.Struct("<dd")  # tokens, updated
+
+    def __init__(self, rate: float, capacity: float, path: str):
+        super().__init__(rate, capacity)
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    @contextmanager
+    def _locked(self):
+        # A new open file per call: flock on a descriptor inherited over fork would not exclude
+        with open(self.path, "a+b") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                data = f.read(self._state.size)
+                if len(data) == self._state.size:
+                    self.tokens, self.updated = self._state.unpack(data)
+                else:
+                    self.tokens, self.updated = self.capacity, self._clock()
+                yield
+                f.truncate(0)
+                f.write(self._state.pack(self.tokens, self.updated))
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def try_take(self, cost: float) -> float:
+        with self._locked():
+            return super().try_take(cost)
+
+    def pause(self, seconds: float):
+        with self._locked():
+            super().pause(seconds)
+
+
+class RateLimiter:
+    """Token-bucket quotas per provider, shared by every call in the process.
+
+    Callers ``acquire`` before each request and block until the provider's
+    bucket allows it. Waiters are ordered by priority class, then by
+    weighted fair queuing over clients: each client's requests are tagged
+    with a virtual finish time, so one busy crew cannot starve another.
+    The client defaults to the calling thread; ``scope`` sets it (and the
+    priority) for a block of work.
+    """
+
+    def __init__(self, quotas: Dict[str, str] = None, share: float = 1.0, priority: str = "interactive"):
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self.default_priority = priority
+        self.pooled = False
+        self.configure(quotas or {}, share)
+
+    def configure(self, quotas: Dict[str, str] = None, share: float = None, priority: str = None, pooled: bool = None):
+        """Replace quotas and/or scale them to ``share`` of the provider limit.
+
+        ``pooled`` keeps each bucket in a file under ``CACHE_DIR`` that
+        every pooled process draws from, so they share the quota of the key.
+        ``share`` instead splits a quota between processes, e.g. ``1 / workers``.
+        """
+        with self._cond:
+            if quotas is not None:
+                self.quotas = dict(quotas)
+            if share is not None:
+                self.share = share
+            if priority is not None:
+                self.default_priority = priority
+            if pooled is not None:
+                self.pooled = pooled and fcntl is not None
+            self.buckets: Dict[str, TokenBucket] = {}
+            for provider, quota in self.quotas.items():
+                if quota in ("", "off"):
+                    continue
+                rate, burst = parse_quota(quota)
+                if self.pooled:
+                    path = os.path.join(CACHE_DIR, "rate_limits", provider)
+                    self.buckets[provider] = SharedTokenBucket(rate * self.share, burst * self.share, path)
+                else:
+                    self.buckets[provider] = TokenBucket(rate * self.share, burst * self.share)
+            self._queues: Dict[str, list] = {provider: [] for provider in self.buckets}
+            self._virtual: Dict[str, float] = {provider: 0.0 for provider in self.buckets}
+            self._finish: Dict[tuple, float] = {}  # (provider, client) -> tag of its last request
+            self._cond.notify_all()
+
+    def configure_worker(self, workers: int):
+        """Set up a pool worker: batch priority, drawing from the pooled quotas.
+
+        Without file locks (Windows) each of the ``workers`` gets an even
+        share of every quota instead.
+        """
+        if fcntl is None:
+            self.configure(share=1 / workers, priority="batch")
+        else:
+            self.configure(pooled=True, priority="batch")
+
+    def describe(self, provider: str) -> str:
+        """The quota ``provider`` calls are held to, e.g. ``"15 requests/min, burst 15"``."""
+        bucket = self.buckets.get(provider)
+        if bucket is None:
+            return "unlimited"
+        shared = ", pooled across workers" if isinstance(bucket, SharedTokenBucket) else ""
+        return f"{bucket.rate * 60:g} requests/min, burst {bucket.capacity:g}{shared}"
+
+    @contextmanager
+    def scope(self, client: str = None, priority: str = None):
+        """Attribute calls made in this block to ``client`` at ``priority``."""
+        if priority is not None and priority not in PRIORITIES:
+            raise ValueError(f"Invalid priority '{priority}'. Options: {', '.join(PRIORITIES)}.")
+        tokens = [var.set(value) for var, value in ((_client, client), (_priority, priority)) if value is not None]
+        try:
+            yield self
+        finally:
+            for token in reversed(tokens):
+                token.var.reset(token)
+
+    def acquire(self, provider: str, cost: float = 1.0, priority: str = None, client: str = None) -> float:
+        """Block until ``cost`` requests to ``provider`` are allowed; returns seconds waited."""
+        if provider not in self.buckets:
+            return 0.0
+        priority = priority or _priority.get() or self.default_priority
+        client = client or _client.get() or threading.get_ident()
+        started = time.monotonic()
+        with self._cond:
+            bucket, queue = self.buckets[provider], self._queues[provider]
+            tag = max(self._virtual[provider], self._finish.get((provider, client), 0.0)) + cost
+            self._finish[(provider, client)] = tag
+            entry = (PRIORITIES[priority], tag, next(self._seq))
+            heapq.heappush(queue, entry)
+            self._cond.notify_all()  # a new head may need to take over the wait
+            while True:
+                if queue[0] is entry:
+                    wait = bucket.try_take(cost)
+                    if wait <= 0:
+                        heapq.heappop(queue)
+                        self._virtual[provider] = tag
+                        self._cond.notify_all()
+                        break
+                    self._cond.wait(wait)
+                else:
+                    self._cond.wait()
+        waited = time.monotonic() - started
+        if waited > 0.001:
+            tracer.record(f"wait {provider}", "rate_limit", int((time.time() - waited) * 1e6), int(waited * 1e6), priority=priority)
+        return waited
+
+    async def aacquire(self, provider: str, cost: float = 1.0, priority: str = None, client: str = None) -> float:
+        """``acquire`` for coroutines; waits in a worker thread, not on the event loop."""
+        if provider not in self.buckets:
+            return 0.0
+        priority = priority or _priority.get()
+        client = client or _client.get() or f"task-{id(asyncio.current_task())}"
+        return await asyncio.get_running_loop().run_in_executor(None, self.acquire, provider, cost, priority, client)
+
+    def penalize(self, provider: str, seconds: float):
+        """Stop handing out ``provider`` requests for ``seconds`` (the provider said 429)."""
+        with self._cond:
+            if provider in self.buckets:
+                self.buckets[provider].pause(seconds)
+                self._cond.notify_all()
+
+    def wrap(self, fn: Callable, provider: str) -> Callable:
+        """``fn`` that first acquires one ``provider`` request per call."""
+        @functools.wraps(fn)
+        def limited(*args, **kwargs):
+            self.acquire(provider)
+            return fn(*args, **kwargs)
+        return limited
+
+    def limit_embedder(self, embedder: Callable[[List[str]], list], provider: Optional[str]) -> Callable[[List[str]], list]:
+        """Wrap an embedding function so each text draws one request from ``provider``."""
+        if provider is None or getattr(embedder, "_rate_limited", False):
+            return embedder
+        limiter = self
+
+        def embed(texts):
+            bucket = limiter.buckets.get(provider)
+            if bucket is None:
+                return embedder(texts)
+            # Acquire per slice so a large batch does not hold the head of the queue
+            step = max(1, int(bucket.capacity))
+            vectors = []
+            for start in range(0, len(texts), step):
+                piece = texts[start:start + step]
+                limiter.acquire(provider, len(piece))
+                vectors.extend(embedder(piece))
+            return vectors
+
+        embed._rate_limited = True
+        return embed
+
+
+# Shared limiter for the process
+rate_limiter = RateLimiter({**DEFAULT_QUOTAS, **parse_quotas(os.getenv("IPM_RATE_LIMITS", ""))})
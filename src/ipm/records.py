@@ -0,0 +1,272 @@
+import json
+import math
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Type
+
+import numpy as np
+from pydantic import BaseModel, ValidationError
+from pydantic_core import from_json
+
+from ipm.models import NewsArticle, SerperNewsResponse, StockTrendAnalysisResult
+
+# Compact in-process forms of the models in ipm.models. The pydantic models
+# stay the external schema (LLM output, files, the API); these are what
+# archives and bulk loads keep in memory. ``to_model`` converts back by
+# validating: pydantic-core builds models faster than model_construct does.
+
+# "+1.2%", "-0.8 %", "−2%" (unicode minus)
+_PERCENT = re.compile(r"([+\-−]?)\s*(\d+(?:\.\d+)?)\s*%")
+_FALLING = re.compile(r"\b(down|fell|falls?|drop\w*|declin\w*|lower|slip\w*|slid|loss\w*)\b", re.I)
+# Sector performance wording -> rating; the first matching pattern wins
+_RATINGS = (
+    (re.compile(r"\b(under\s*-?perform\w*|bearish|weak\w*|negative|declin\w*|lag\w*|slump\w*)\b", re.I), -1),
+    (re.compile(r"\b(out\s*-?perform\w*|bullish|strong\w*|positive|gain\w*|rall(y|ied|ying)|grow\w*|robust)\b", re.I), 1),
+)
+
+# A free-form dict entry as (keys, values); identical key tuples are shared
+Entry = Tuple[Tuple[str, ...], Tuple[str, ...]]
+_shared_keys: Dict[tuple, tuple] = {}
+
+
+@lru_cache(maxsize=4096)
+def parse_change(text: str) -> float:
+    """Percentage change stated in ``text`` ("+1.2%", "down 3%"), NaN if none."""
+    match = _PERCENT.search(text or "")
+    if not match:
+        return math.nan
+    value = float(match.group(2))
+    if match.group(1) in ("-", "−") or (not match.group(1) and _FALLING.search(text)):
+        value = -value
+    return value
+
+
+@lru_cache(maxsize=4096)
+def parse_rating(text: str) -> int:
+    """+1 for outperforming wording, -1 for underperforming, 0 for neutral or unstated."""
+    for pattern, rating in _RATINGS:
+        if pattern.search(text or ""):
+            return rating
+    return 0
+
+
+def _entry(entry: Dict[str, str]) -> Entry:
+    keys = tuple(entry)
+    return _shared_keys.setdefault(keys, keys), tuple(entry.values())
+
+
+class ArticleRecord(NamedTuple):
+    """A ``NewsArticle`` as a plain tuple."""
+    title: str
+    link: str
+    snippet: Optional[str] = None
+    date: Optional[str] = None
+    source: Optional[str] = None
+    image_url: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ArticleRecord":
+        return cls(data["title"], data["link"], data.get("snippet"), data.get("date"), data.get("source"), data.get("imageUrl"))
+
+    @classmethod
+    def from_model(cls, model: NewsArticle) -> "ArticleRecord":
+        return cls(model.title, model.link, model.snippet, model.date, model.source, model.imageUrl)
+
+    def to_dict(self) -> dict:
+        return {"title": self.title, "link": self.link, "snippet": self.snippet, "date": self.date, "source": self.source, "imageUrl": self.image_url}
+
+    def to_model(self) -> NewsArticle:
+        return NewsArticle.model_validate(self.to_dict())
+
+
+class NewsRecord(NamedTuple):
+    """A ``SerperNewsResponse``: its articles as ``ArticleRecord`` tuples."""
+    news: Tuple[ArticleRecord, ...]
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "NewsRecord":
+        return cls(tuple(ArticleRecord.from_dict(article) for article in data["news"]))
+
+    @classmethod
+    def from_model(cls, model: SerperNewsResponse) -> "NewsRecord":
+        return cls(tuple(ArticleRecord.from_model(article) for article in model.news))
+
+    def to_dict(self) -> dict:
+        return {"news": [article.to_dict() for article in self.news]}
+
+    def to_model(self) -> SerperNewsResponse:
+        return SerperNewsResponse.model_validate(self.to_dict())
+
+
+class Fluctuation(NamedTuple):
+    keys: Tuple[str, ...]  # the entry as produced, e.g. ("index", "change", "driver")
+    values: Tuple[str, ...]  # e.g. ("NIFTY 50", "+1.2%", "Banking rally")
+
+    @property
+    def name(self) -> str:
+        return self.values[0] if self.values else ""
+
+    @property
+    def change_pct(self) -> float:
+        """The stated change, NaN when the entry states no percentage."""
+        entry = dict(zip(self.keys, self.values))
+        return parse_change(entry.get("change") or entry.get("change_pct") or " ".join(self.values))
+
+
+class Sector(NamedTuple):
+    name: str
+    text: str
+
+    @property
+    def rating(self) -> int:
+        """+1 outperforming, -1 underperforming, 0 neutral or unstated."""
+        return parse_rating(self.text)
+
+    @property
+    def change_pct(self) -> float:
+        """The stated change, NaN when the text states no percentage."""
+        return parse_change(self.text)
+
+
+class StockReportRecord:
+    """A ``StockTrendAnalysisResult`` with typed fluctuations and sector performance.
+
+    The free-form entries are kept as (keys, values) tuples, so the record
+    converts back to the exact dicts it was built from. The changes and
+    ratings are parsed from their text when first read, not on load;
+    ``StockReportTable`` reads them all once into its columns.
+    """
+
+    __slots__ = ("fluctuations", "job_market_trends", "economic_news", "sectors", "investment_strategies")
+
+    def __init__(self, fluctuations: Tuple[Fluctuation, ...], job_market_trends: Tuple[Entry, ...], economic_news: Tuple[Entry, ...],
+                 sectors: Tuple[Sector, ...], investment_strategies: Tuple[str, ...]):
+        self.fluctuations = fluctuations
+        self.job_market_trends = job_market_trends
+        self.economic_news = economic_news
+        self.sectors = sectors
+        self.investment_strategies = investment_strategies
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "StockReportRecord":
+        return cls(
+            tuple(Fluctuation(*_entry(entry)) for entry in data["stock_market_fluctuations"]),
+            tuple(map(_entry, data["job_market_trends"])),
+            tuple(map(_entry, data["economic_news"])),
+            tuple(map(Sector._make, data["sector_performance"].items())),
+            tuple(data["investment_strategies"]),
+        )
+
+    @classmethod
+    def from_model(cls, model: StockTrendAnalysisResult) -> "StockReportRecord":
+        return cls.from_dict(model.__dict__)
+
+    def to_dict(self) -> dict:
+        return {
+            "stock_market_fluctuations": [dict(zip(fluctuation.keys, fluctuation.values)) for fluctuation in self.fluctuations],
+            "job_market_trends": [dict(zip(*entry)) for entry in self.job_market_trends],
+            "economic_news": [dict(zip(*entry)) for entry in self.economic_news],
+            "sector_performance": {sector.name: sector.text for sector in self.sectors},
+            "investment_strategies": list(self.investment_strategies),
+        }
+
+    def to_model(self) -> StockTrendAnalysisResult:
+        return StockTrendAnalysisResult.model_validate(self.to_dict())
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, StockReportRecord) and all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"StockReportRecord({len(self.fluctuations)} fluctuations, {len(self.sectors)} sectors)"
+
+
+class StockReportTable:
+    """Many reports with their numeric fields in NumPy columns.
+
+    Fluctuations and sectors of every report are laid out one after the
+    other; ``*_report`` gives the report each row belongs to. Sector names
+    are coded against ``sector_names``.
+    """
+
+    def __init__(self, records: List[StockReportRecord]):
+        self.records = records
+        self.fluctuation_report = np.repeat(np.arange(len(records), dtype=np.int32), [len(r.fluctuations) for r in records])
+        self.fluctuation_change = np.fromiter((f.change_pct for r in records for f in r.fluctuations), dtype=np.float32)
+        codes: Dict[str, int] = {}
+        self.sector_report = np.repeat(np.arange(len(records), dtype=np.int32), [len(r.sectors) for r in records])
+        self.sector_code = np.fromiter((codes.setdefault(s.name, len(codes)) for r in records for s in r.sectors), dtype=np.int32)
+        self.sector_rating = np.fromiter((s.rating for r in records for s in r.sectors), dtype=np.int8)
+        self.sector_change = np.fromiter((s.change_pct for r in records for s in r.sectors), dtype=np.float32)
+        self.sector_names = list(codes)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, index: int) -> StockReportRecord:
+        return self.records[index]
+
+    def sector_summary(self) -> Dict[str, dict]:
+        """Per sector: how many reports rate it, their mean rating and mean stated change."""
+        count = np.bincount(self.sector_code, minlength=len(self.sector_names))
+        rating = np.bincount(self.sector_code, weights=self.sector_rating, minlength=len(self.sector_names))
+        stated = ~np.isnan(self.sector_change)
+        change_count = np.bincount(self.sector_code[stated], minlength=len(self.sector_names))
+        change = np.bincount(self.sector_code[stated], weights=self.sector_change[stated], minlength=len(self.sector_names))
+        return {
+            name: {
+                "reports": int(count[code]),
+                "mean_rating": float(rating[code] / count[code]),
+                "mean_change_pct": float(change[code] / change_count[code]) if change_count[code] else None,
+            }
+            for code, name in enumerate(self.sector_names)
+        }
+
+
+# External model -> its compact record type
+RECORD_TYPES = {
+    NewsArticle: ArticleRecord,
+    SerperNewsResponse: NewsRecord,
+    StockTrendAnalysisResult: StockReportRecord,
+}
+
+
+def load_ndjson(lines: Iterable[str], model: Type[BaseModel], records: bool = False, trusted: bool = False) -> Tuple[list, List[Tuple[int, str]]]:
+    """Instances of ``model`` from NDJSON lines, and ``(line number, error)`` for lines that failed.
+
+    Each line is validated on its own, so the good lines still load. The
+    result is pydantic models, the fastest to load. ``records`` converts
+    them to the compact records of ``RECORD_TYPES``, which take about half
+    the memory but two to three times as long to load. ``trusted`` (with
+    ``records``) is for files this code wrote itself: the records are
+    built straight from the parsed JSON, skipping validation. That is
+    faster than validated records, but still slower than models.
+    """
+    numbered = [(number, line) for number, line in enumerate(lines, 1) if line.strip()]
+    if trusted and records:
+        # cache_strings shares the repeated keys between records, as validation does
+        batch = from_json("[" + ",".join(line for _, line in numbered) + "]", cache_strings=True)
+        return [RECORD_TYPES[model].from_dict(data) for data in batch], []
+    convert = RECORD_TYPES[model].from_model if records else None
+    loaded, errors = [], []
+    for number, line in numbered:
+        try:
+            instance = model.model_validate_json(line)
+        except ValidationError as e:
+            error = e.errors()[0]
+            errors.append((number, f"{'.'.join(str(part) for part in error['loc']) or 'line'}: {error['msg']}"))
+            continue
+        loaded.append(convert(instance) if convert else instance)
+    return loaded, errors
+
+
+def load_ndjson_file(path: str, model: Type[BaseModel], records: bool = False, trusted: bool = False) -> Tuple[list, List[Tuple[int, str]]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return load_ndjson(f, model, records=records, trusted=trusted)
+
+
+def dump_ndjson(records: Iterable, path: str):
+    """Write records (or their pydantic models) as one compact JSON object per line."""
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            data = record.model_dump(mode="json") if isinstance(record, BaseModel) else record.to_dict()
+            f.write(json.dumps(data, separators=(",", ":")) + "\n")
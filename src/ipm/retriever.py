@@ -0,0 +1,226 @@
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from crewai.knowledge.storage.knowledge_storage import KnowledgeStorage
+
+from ipm.knowledge_index import EmbeddingIndex, chunk_id, embedding_index
+from ipm.rate_limit import EMBEDDING_QUOTAS, rate_limiter
+from ipm.tracing import tracer
+
+# Below this many vectors a brute-force scan is both exact and fast enough
+IVF_THRESHOLD = 20000
+
+
+def _top_k(scores: np.ndarray, k: int):
+    """Indices and values of the ``k`` largest entries of each row, best first."""
+    k = min(k, scores.shape[1])
+    if k == 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64), np.empty((scores.shape[0], 0), dtype=scores.dtype)
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    part_scores = np.take_along_axis(scores, part, axis=1)
+    order = np.argsort(-part_scores, axis=1)
+    return np.take_along_axis(part, order, axis=1), np.take_along_axis(part_scores, order, axis=1)
+
+
+class VectorSearch:
+    """Cosine top-k search over an ``EmbeddingIndex`` with metadata filters.
+
+    Small corpora are scanned exhaustively with one matrix product per query
+    batch. From ``ivf_threshold`` vectors on, an inverted-file index (k-means
+    lists, probing the ``n_probe`` closest lists) keeps queries sub-linear.
+    Vectors stay memory-mapped; only their norms and the IVF layout live in RAM.
+    """
+
+    def __init__(self, index: EmbeddingIndex = None, ivf_threshold: int = IVF_THRESHOLD, n_probe: int = 8, seed: int = 0):
+        self.index = index or embedding_index
+        self.ivf_threshold = ivf_threshold
+        self.n_probe = n_probe
+        self.seed = seed
+        self._lock = threading.Lock()
+        self._count = -1
+
+    def _refresh(self):
+        with self._lock:
+            vectors = self.index.vectors
+            if len(vectors) == self._count:
+                return
+            self._vectors = vectors
+            self._norms = np.linalg.norm(vectors, axis=1).astype(np.float32)
+            self._norms[self._norms == 0] = 1.0
+            records = self.index.records[:len(vectors)]
+            self._sources = np.array([record.get("source", "") for record in records], dtype=object)
+            self._pages = np.array([record.get("page", 0) for record in records], dtype=np.int32)
+            self._dates = np.array([record.get("date") or "NaT" for record in records], dtype="datetime64[D]")
+            self._centroids = None
+            if len(vectors) >= self.ivf_threshold:
+                self._build_ivf()
+            self._count = len(vectors)
+
+    def _build_ivf(self, iterations: int = 10, sample_size: int = 50000):
+        rng = np.random.default_rng(self.seed)
+        n = len(self._vectors)
+        n_lists = max(1, int(np.sqrt(n)))
+        sample = np.sort(rng.choice(n, size=min(n, sample_size), replace=False))
+        points = np.asarray(self._vectors[sample]) / self._norms[sample, None]
+        centroids = points[rng.choice(len(points), size=n_lists, replace=False)]
+        for _ in range(iterations):
+            assignment = np.argmax(points @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, points)
+            counts = np.bincount(assignment, minlength=n_lists)
+            filled = counts > 0
+            centroids[filled] = sums[filled] / counts[filled, None]
+            centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+        # Assign every vector in blocks so the full matrix is never materialized
+        assignment = np.concatenate([
+            np.argmax((np.asarray(self._vectors[start:start + 8192]) / self._norms[start:start + 8192, None]) @ centroids.T, axis=1)
+            for start in range(0, n, 8192)
+        ])
+        self._centroids = centroids
+        self._list_order = np.argsort(assignment, kind="stable")
+        self._list_offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=n_lists))])
+
+    def mask(
+        self,
+        rows: Optional[np.ndarray] = None,
+        sources: Optional[List[str]] = None,
+        pages: Optional[List[int]] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+    ) -> Optional[np.ndarray]:
+        """Boolean row filter; None when nothing is filtered."""
+        self._refresh()
+        if rows is None and not sources and not pages and not date_from and not date_to:
+            return None
+        keep = np.ones(self._count, dtype=bool)
+        if rows is not None:
+            keep &= rows[:self._count]
+        if sources:
+            keep &= np.isin(self._sources, list(sources))
+        if pages:
+            keep &= np.isin(self._pages, list(pages))
+        if date_from:
+            keep &= self._dates >= np.datetime64(date_from, "D")
+        if date_to:
+            keep &= self._dates <= np.datetime64(date_to, "D")
+        return keep
+
+    def search(self, queries: np.ndarray, k: int = 3, mask: Optional[np.ndarray] = None):
+        """Top-``k`` rows and cosine scores for each query vector."""
+        self._refresh()
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        if self._count == 0:
+            empty = np.empty((len(queries), 0))
+            return empty.astype(np.int64), empty
+        candidates = np.flatnonzero(mask) if mask is not None else None
+        if self._centroids is None or (candidates is not None and len(candidates) < self.ivf_threshold):
+            return self._scan(queries, k, candidates)
+        rows, scores = [], []
+        for query in queries:
+            r, s = self._probe(query, k, mask)
+            rows.append(r)
+            scores.append(s)
+        width = max((len(r) for r in rows), default=0)
+        return (
+            np.array([np.pad(r, (0, width - len(r)), constant_values=-1) for r in rows]),
+            np.array([np.pad(s, (0, width - len(s)), constant_values=-np.inf) for s in scores]),
+        )
+
+    def _scan(self, queries: np.ndarray, k: int, candidates: Optional[np.ndarray]):
+        if candidates is None:
+            scores = (queries @ np.asarray(self._vectors).T) / self._norms
+            return _top_k(scores, k)
+        scores = (queries @ np.asarray(self._vectors[candidates]).T) / self._norms[candidates]
+        top, top_scores = _top_k(scores, k)
+        return candidates[top], top_scores
+
+    def _probe(self, query: np.ndarray, k: int, mask: Optional[np.ndarray]):
+        n_probe = min(self.n_probe, len(self._centroids))
+        lists = np.argpartition(-(self._centroids @ query), n_probe - 1)[:n_probe]
+        candidates = np.concatenate([
+            self._list_order[self._list_offsets[i]:self._list_offsets[i + 1]] for i in lists
+        ])
+        if mask is not None:
+            candidates = candidates[mask[candidates]]
+        candidates.sort()  # sequential reads from the memmap
+        scores = (np.asarray(self._vectors[candidates]) @ query) / self._norms[candidates]
+        top, top_scores = _top_k(scores[None, :], k)
+        return candidates[top[0]], top_scores[0]
+
+
+class LocalKnowledgeStorage(KnowledgeStorage):
+    """crewAI knowledge storage backed by the local ``EmbeddingIndex``.
+
+    Drop-in replacement for the Chroma-backed ``KnowledgeStorage``: sources
+    register the chunks they indexed, and ``search`` embeds the query once
+    and runs a ``VectorSearch`` restricted to those chunks. ``filter`` accepts
+    ``source``, ``page``, ``date_from`` and ``date_to`` keys.
+    """
+
+    def __init__(self, embedder: Optional[Dict[str, Any]] = None, collection_name: Optional[str] = None, engine: VectorSearch = None):
+        super().__init__(embedder=embedder, collection_name=collection_name)
+        self.embedder = rate_limiter.limit_embedder(self.embedder, EMBEDDING_QUOTAS.get((embedder or {}).get("provider")))
+        self.model = ((embedder or {}).get("config") or {}).get("model", "default")
+        self.engine = engine or VectorSearch()
+        self.ids = set()
+
+    def initialize_knowledge_storage(self):
+        # Nothing to open: vectors live in the shared on-disk index
+        self.collection = None
+
+    def add_indexed(self, records: List[dict]):
+        """Attach chunks that are already in the index to this collection."""
+        self.ids.update(record["id"] for record in records)
+
+    def save(self, documents: List[str], metadata: Optional[Dict[str, Any] | List[Dict[str, Any]]] = None):
+        """Embed plain documents (from stock crewAI sources) into the index."""
+        index = self.engine.index
+        records = []
+        for i, document in enumerate(documents):
+            meta = metadata[i] if isinstance(metadata, list) else (metadata or {})
+            records.append({"id": chunk_id(self.model, document), "source": meta.get("source", ""), "page": meta.get("page", 0), "text": document})
+        missing = [record for record in records if record["id"] not in index]
+        if missing:
+            texts = [record["text"] for record in missing]
+            with tracer.span("embed", "embedding", texts=len(texts), chars=sum(map(len, texts))):
+                vectors = self.embedder(texts)
+            index.add(missing, np.asarray(vectors, dtype=np.float32))
+        self.add_indexed(records)
+
+    def search(self, query: List[str], limit: int = 3, filter: Optional[dict] = None, score_threshold: float = 0.35) -> List[Dict[str, Any]]:
+        index = self.engine.index
+        self.engine._refresh()
+        rows = np.zeros(len(index.records), dtype=bool)
+        rows[[index.rows[key] for key in self.ids if key in index.rows]] = True
+        filter = filter or {}
+        mask = self.engine.mask(
+            rows=rows,
+            sources=[filter["source"]] if isinstance(filter.get("source"), str) else filter.get("source"),
+            pages=[filter["page"]] if isinstance(filter.get("page"), int) else filter.get("page"),
+            date_from=filter.get("date_from"),
+            date_to=filter.get("date_to"),
+        )
+        with tracer.span("embed.query", "embedding", texts=len(query)):
+            vectors = np.asarray(self.embedder(query), dtype=np.float32)
+        with tracer.span("vector_search", "retrieval", k=limit) as span:
+            top, scores = self.engine.search(vectors, k=limit, mask=mask)
+            span["candidates"] = int(mask.sum()) if mask is not None else len(index.records)
+        results, seen = [], set()
+        # One result list across all query strings, best matches first
+        for row, score in sorted(zip(top.ravel(), scores.ravel()), key=lambda item: -item[1]):
+            if row < 0 or row in seen or score < score_threshold:
+                continue
+            seen.add(row)
+            record = index.records[row]
+            results.append({
+                "id": record["id"],
+                "metadata": {key: record[key] for key in ("source", "page", "date") if key in record},
+                "context": record["text"],
+                "score": float(score),
+            })
+        return results[:limit]
+
+    def reset(self):
+        self.ids.clear()
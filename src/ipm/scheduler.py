@@ -0,0 +1,86 @@
+import threading
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List
+
+from crewai import Crew, Task
+from crewai.tasks.conditional_task import ConditionalTask
+from crewai.tasks.task_output import TaskOutput
+from pydantic import Field, PrivateAttr
+
+
+def build_task_graph(tasks: List[Task]) -> Dict[int, List[int]]:
+    """Map each task index to the indices of the tasks named in its ``context``.
+
+    Only declared ``context`` edges order the tasks; a task without one is a
+    root of the graph and starts right away.
+    """
+    index = {id(task): i for i, task in enumerate(tasks)}
+    graph = {}
+    for i, task in enumerate(tasks):
+        context = task.context if isinstance(task.context, list) else []
+        graph[i] = [index[id(upstream)] for upstream in context if id(upstream) in index]
+    return graph
+
+
+class DagCrew(Crew):
+    """Crew that starts every task as soon as its ``context`` tasks are done.
+
+    Independent tasks run concurrently on up to ``max_workers`` threads, so
+    a run takes as long as its critical path rather than the sum of all
+    tasks. Tasks assigned to the same agent still run one at a time, since
+    an agent keeps per-task executor state.
+    """
+
+    max_workers: int = Field(default=4, description="Maximum number of tasks running at once.")
+    _agent_locks: Dict[int, threading.Lock] = PrivateAttr(default_factory=lambda: defaultdict(threading.Lock))
+    _log_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def _execute_tasks(self, tasks: List[Task], start_index: int = 0, was_replayed: bool = False):
+        graph = build_task_graph(tasks)
+        outputs: Dict[int, TaskOutput] = {}
+        # On replay, tasks before start_index keep the outputs they already have
+        for i, task in enumerate(tasks[:start_index or 0]):
+            if task.output:
+                outputs[i] = task.output
+        pending = [i for i in range(len(tasks)) if i not in outputs]
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as pool:
+            while pending or running:
+                ready = [i for i in pending if all(d in outputs for d in graph[i])]
+                for i in ready:
+                    pending.remove(i)
+                    upstream = [outputs[d] for d in graph[i]]
+                    running[pool.submit(self._execute_dag_task, tasks[i], i, upstream, was_replayed)] = i
+                if not running:
+                    raise ValueError("Task context declarations form a cycle or reference a task that never runs.")
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    outputs[running.pop(future)] = future.result()
+
+        # Keep declaration order so the last task's output remains the crew's final output
+        return self._create_crew_output([outputs[i] for i in sorted(outputs)])
+
+    def _execute_dag_task(self, task: Task, task_index: int, upstream: List[TaskOutput], was_replayed: bool) -> TaskOutput:
+        agent = self._get_agent_to_use(task)
+        if agent is None:
+            raise ValueError(
+                f"No agent available for task: {task.description}. "
+                f"Ensure that either the task has an assigned agent "
+                f"or a manager agent is provided."
+            )
+
+        if isinstance(task, ConditionalTask) and upstream and not task.should_execute(upstream[-1]):
+            output = task.get_skipped_task_output()
+        else:
+            with self._agent_locks[id(agent)]:
+                tools = self._prepare_tools(agent, task, task.tools or agent.tools or [])
+                self._log_task_start(task, agent.role)
+                context = self._get_context(task, upstream)
+                output = task.execute_sync(agent=agent, context=context, tools=tools)
+
+        with self._log_lock:
+            self._process_task_result(task, output)
+            self._store_execution_log(task, output, task_index, was_replayed)
+        return output
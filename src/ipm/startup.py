@@ -0,0 +1,54 @@
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+# What each CLI path imports up front, and what is deferred until first use
+PROFILE_TARGETS = (
+    ("ipm.main", "CLI entry point"),
+    ("ipm.crew", "crew definition (Ipm)"),
+    ("crewai_tools", "deferred: EXA tool"),
+    ("ipm.ingest", "deferred: knowledge ingestion"),
+)
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)")
+
+
+def import_times(module: str) -> Tuple[float, Dict[str, float]]:
+    """Import ``module`` in a fresh interpreter under ``-X importtime``.
+
+    Returns the module's cumulative import time and the self time spent in
+    each top-level package, both in seconds.
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    packages = defaultdict(float)
+    total = 0.0
+    for line in process.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, name = match.groups()
+        packages[name.split(".")[0]] += int(self_us) / 1e6
+        if name == module:
+            total = int(cumulative_us) / 1e6
+    if process.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{process.stderr.strip().splitlines()[-1]}")
+    return total, dict(packages)
+
+
+def profile_startup(targets=PROFILE_TARGETS, top: int = 10) -> List[dict]:
+    """Print and return an import-time breakdown for each target module."""
+    report = []
+    for module, label in targets:
+        total, packages = import_times(module)
+        heaviest = sorted(packages.items(), key=lambda item: -item[1])[:top]
+        report.append({"module": module, "label": label, "seconds": total, "packages": heaviest})
+        print(f"{module:<14} {total:6.2f}s  {label}")
+        for package, seconds in heaviest:
+            print(f"    {package:<24} {seconds:6.3f}s")
+    return report
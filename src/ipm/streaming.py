@@ -0,0 +1,286 @@
+import asyncio
+import json
+import os
+import queue
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+_FINAL_ANSWER = re.compile(r"Final Answer:\s*")
+_DONE = object()
+
+
+class PartialFields:
+    """Pulls top-level fields out of a JSON final answer while it is still streaming.
+
+    ``feed`` takes the next piece of LLM text and returns the ``(field, value)``
+    pairs whose values became complete with it. A value counts as complete
+    once the ``,`` or ``}`` that follows it has arrived.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._decoder = json.JSONDecoder()
+        self._pos = None  # next unparsed offset inside the answer object
+        self._done = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        self.text += chunk
+        if self._done:
+            return []
+        if self._pos is None:
+            marker = _FINAL_ANSWER.search(self.text)
+            start = self.text.find("{", marker.end()) if marker else -1
+            if start < 0:
+                return []
+            self._pos = start + 1
+        elif not any(c in chunk for c in ",}"):
+            return []  # nothing can have completed
+        return list(self._members())
+
+    def _skip(self, pos: int) -> int:
+        while pos < len(self.text) and self.text[pos].isspace():
+            pos += 1
+        return pos
+
+    def _members(self):
+        text = self.text
+        while True:
+            pos = self._skip(self._pos)
+            if pos < len(text) and text[pos] == "}":
+                self._done = True
+                return
+            try:
+                key, pos = self._decoder.raw_decode(text, pos)
+                pos = self._skip(pos)
+                if pos >= len(text) or text[pos] != ":":
+                    return
+                value, pos = self._decoder.raw_decode(text, self._skip(pos + 1))
+            except json.JSONDecodeError:
+                return  # member still arriving
+            pos = self._skip(pos)
+            if pos >= len(text) or text[pos] not in ",}":
+                return
+            self._pos = pos + 1 if text[pos] == "," else pos
+            yield key, value
+
+
+class NDJSONWriter:
+    """Appends events as JSON lines, flushed per line so readers can tail them.
+
+    Every event goes to ``<directory>/stream.ndjson``; events of a task also
+    go to ``<directory>/<task>.ndjson``, named after the task's output file.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._files: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _file(self, name: str):
+        if name not in self._files:
+            self._files[name] = open(os.path.join(self.directory, f"{name}.ndjson"), "w", encoding="utf-8")
+        return self._files[name]
+
+    def write(self, event: Dict[str, Any], stem: Optional[str] = None):
+        line = json.dumps(event, default=str) + "\n"
+        with self._lock:
+            for name in ("stream", stem) if stem else ("stream",):
+                f = self._file(name)
+                f.write(line)
+                f.flush()
+
+    def close(self):
+        with self._lock:
+            for f in self._files.values():
+                f.close()
+            self._files.clear()
+
+
+def _task_stem(task) -> str:
+    if task.output_file:
+        return os.path.splitext(os.path.basename(task.output_file))[0]
+    return task.name or f"task_{task.id}"
+
+
+def _task_output(output) -> Any:
+    if output.pydantic is not None:
+        return output.pydantic.model_dump(mode="json")
+    return output.json_dict or output.raw
+
+
+# Streams currently running, fed by one set of event-bus listeners
+_active: List["CrewStream"] = []
+_active_lock = threading.Lock()
+_listeners_installed = False
+
+
+class CrewStream:
+    """Runs a crew kickoff in the background and streams what it produces.
+
+    Events are dicts with a ``type`` of ``crew_started``, ``task_started``,
+    ``token`` (LLM text as it arrives), ``tool_result``, ``field`` (a
+    top-level field of a task's JSON answer, as soon as it is complete),
+    ``task_completed``, ``crew_completed`` or ``crew_failed``. Each is
+    written to NDJSON files under ``output_dir`` and handed to whoever
+    iterates the stream, either with ``for`` or ``async for``. A stream is
+    consumed once; ``join`` waits for the run and returns the crew output.
+    """
+
+    def __init__(self, crew, inputs: Dict[str, Any] = None, output_dir: str = "output", tokens: bool = True):
+        self.crew = crew
+        self.inputs = inputs or {}
+        self.tokens = tokens
+        self.writer = NDJSONWriter(output_dir)
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self._queue: "queue.Queue" = queue.Queue()
+        self._tasks = {id(task): task for task in crew.tasks}
+        self._running: Dict[int, Any] = {}  # thread id -> task it is executing
+        self._fields: Dict[int, PartialFields] = {}  # thread id -> current LLM call
+        self._step_callbacks: Dict[int, Optional[Callable]] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "CrewStream":
+        if self._thread is None:
+            _install_listeners()
+            for crew_agent in self.crew.agents:
+                self._step_callbacks[id(crew_agent)] = crew_agent.step_callback
+                crew_agent.step_callback = self._step_callback(crew_agent, crew_agent.step_callback)
+            with _active_lock:
+                _active.append(self)
+            self._thread = threading.Thread(target=self._run, name="crew-stream", daemon=True)
+            self._thread.start()
+        return self
+
+    def join(self):
+        """Wait for the kickoff to finish; returns its output or raises its error."""
+        self.start()
+        self._thread.join()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        self.start()
+        while True:
+            event = self._queue.get()
+            if event is _DONE:
+                break
+            yield event
+        self.join()
+
+    async def __aiter__(self):
+        self.start()
+        loop = asyncio.get_running_loop()
+        while True:
+            event = await loop.run_in_executor(None, self._queue.get)
+            if event is _DONE:
+                break
+            yield event
+        await loop.run_in_executor(None, self.join)
+
+    def _run(self):
+        self.emit("crew_started", inputs=self.inputs)
+        try:
+            self.result = self.crew.kickoff(inputs=self.inputs)
+            self.emit("crew_completed", raw=self.result.raw, token_usage=self.result.token_usage.model_dump())
+        except BaseException as e:
+            self.error = e
+            self.emit("crew_failed", error=f"{type(e).__name__}: {e}")
+        finally:
+            with _active_lock:
+                _active.remove(self)
+            for crew_agent in self.crew.agents:
+                crew_agent.step_callback = self._step_callbacks.get(id(crew_agent))
+            self.writer.close()
+            self._queue.put(_DONE)
+
+    def emit(self, kind: str, task=None, **fields):
+        event = {"type": kind, "ts": round(time.time(), 3)}
+        if task is not None:
+            event.update(task=task.name, agent=getattr(task.agent, "role", None))
+        event.update(fields)
+        self.writer.write(event, _task_stem(task) if task is not None else None)
+        self._queue.put(event)
+
+    def _step_callback(self, crew_agent, previous: Optional[Callable]):
+        from crewai.agents.parser import AgentAction
+
+        def step(step_output):
+            if isinstance(step_output, AgentAction):
+                self.emit(
+                    "tool_result", self._running.get(threading.get_ident()),
+                    tool=step_output.tool, tool_input=step_output.tool_input, result=step_output.result,
+                )
+            if previous:
+                previous(step_output)
+        return step
+
+    # Event-bus handlers; every event arrives in the thread that emitted it
+
+    def _task_started(self, task):
+        if id(task) in self._tasks:
+            self._running[threading.get_ident()] = task
+            self.emit("task_started", task)
+
+    def _task_finished(self, task, output=None, error=None):
+        if id(task) not in self._tasks:
+            return
+        self._running.pop(threading.get_ident(), None)
+        self._fields.pop(threading.get_ident(), None)
+        if error is not None:
+            self.emit("task_failed", task, error=error)
+        else:
+            self.emit("task_completed", task, output=_task_output(output))
+
+    def _llm_started(self):
+        if threading.get_ident() in self._running:
+            self._fields[threading.get_ident()] = PartialFields()
+
+    def _llm_text(self, text: str, chunk: bool):
+        task = self._running.get(threading.get_ident())
+        fields = self._fields.get(threading.get_ident())
+        if task is None or fields is None:
+            return
+        if not chunk:
+            if fields.text:
+                return  # already seen chunk by chunk
+            text = str(text)
+        elif self.tokens:
+            self.emit("token", task, text=text)
+        for name, value in fields.feed(text):
+            self.emit("field", task, field=name, value=value)
+
+
+def _install_listeners():
+    global _listeners_installed
+    if _listeners_installed:
+        return
+    _listeners_installed = True
+
+    from crewai.utilities.events import crewai_event_bus
+    from crewai.utilities.events.llm_events import LLMCallCompletedEvent, LLMCallStartedEvent, LLMStreamChunkEvent
+    from crewai.utilities.events.task_events import TaskCompletedEvent, TaskFailedEvent, TaskStartedEvent
+
+    def each_stream(handler):
+        def dispatch(source, event):
+            with _active_lock:
+                streams = list(_active)
+            for stream in streams:
+                handler(stream, source, event)
+        return dispatch
+
+    crewai_event_bus.on(TaskStartedEvent)(each_stream(lambda stream, source, event: stream._task_started(source)))
+    crewai_event_bus.on(TaskCompletedEvent)(each_stream(lambda stream, source, event: stream._task_finished(source, output=event.output)))
+    crewai_event_bus.on(TaskFailedEvent)(each_stream(lambda stream, source, event: stream._task_finished(source, error=event.error)))
+    crewai_event_bus.on(LLMCallStartedEvent)(each_stream(lambda stream, source, event: stream._llm_started()))
+    crewai_event_bus.on(LLMStreamChunkEvent)(each_stream(lambda stream, source, event: stream._llm_text(event.chunk, chunk=True)))
+    crewai_event_bus.on(LLMCallCompletedEvent)(each_stream(lambda stream, source, event: stream._llm_text(event.response, chunk=False)))
+
+
+def stream_kickoff(crew, inputs: Dict[str, Any] = None, output_dir: str = "output", tokens: bool = True) -> CrewStream:
+    """Start ``crew.kickoff(inputs)`` in the background and return its event stream."""
+    return CrewStream(crew, inputs, output_dir, tokens).start()
@@ -0,0 +1,208 @@
+import datetime
+import hashlib
+import json
+import os
+import shutil
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+from crewai import Task
+from crewai.agents.agent_builder.base_agent import BaseAgent
+from crewai.tasks.task_output import TaskOutput
+from crewai.utilities.events import crewai_event_bus
+from crewai.utilities.events.task_events import TaskCompletedEvent
+from crewai.utilities.printer import Printer
+from pydantic import Field, ValidationError
+
+from ipm.context import project_context
+from ipm.tools.cache import CACHE_DIR
+from ipm.tracing import tracer
+
+_digest_lock = threading.Lock()
+_file_digests: Dict[tuple, str] = {}  # (path, mtime_ns, size) -> sha256 of the bytes
+
+
+def file_digest(path: str) -> str:
+    """sha256 of a file's bytes, re-read only when its mtime or size changes."""
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    with _digest_lock:
+        if key in _file_digests:
+            return _file_digests[key]
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    with _digest_lock:
+        _file_digests[key] = digest.hexdigest()
+    return _file_digests[key]
+
+
+def _source_paths(source) -> List[str]:
+    from ipm.ingest import KnowledgeDirectorySource, iter_documents
+
+    if isinstance(source, KnowledgeDirectorySource):
+        return list(source.files or iter_documents(source.directory))
+    return [str(path) for path in getattr(source, "safe_file_paths", None) or []]
+
+
+def knowledge_digest(sources: Iterable) -> str:
+    """Hash of every document behind ``sources`` (file bytes, or inline content)."""
+    parts = []
+    for source in sources:
+        paths = _source_paths(source)
+        if paths:
+            parts.extend(f"{path}:{file_digest(path)}" for path in sorted(paths))
+        else:
+            parts.append(hashlib.sha256(str(getattr(source, "content", "")).encode("utf-8")).hexdigest())
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def task_cache_key(task: Task, agent: BaseAgent, context: Optional[str], tools: Optional[list]) -> str:
+    """Content address of a task run.
+
+    Covers the (interpolated) task and agent configuration, the model, the
+    kickoff inputs, the documents behind the agent's and crew's knowledge
+    and the upstream outputs passed in as ``context``.
+    """
+    crew = agent.crew
+    sources = list(agent.knowledge_sources or [])
+    if crew is not None:
+        if crew.knowledge is not None:
+            sources.extend(crew.knowledge.sources)
+        else:
+            sources.extend(crew.knowledge_sources or [])
+    output_model = task.output_pydantic or task.output_json
+    parts = {
+        "task": [task.name, task.description, task.expected_output],
+        "output_schema": output_model.model_json_schema() if output_model else None,
+        "agent": [agent.role, agent.goal, agent.backstory],
+        "tools": sorted(tool.name for tool in tools or task.tools or agent.tools or []),
+        "model": getattr(agent.llm, "model", str(agent.llm)),
+        "inputs": getattr(crew, "_inputs", None) or {},
+        "documents": knowledge_digest(sources),
+        "context": hashlib.sha256((context or "").encode("utf-8")).hexdigest(),
+    }
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class TaskResultCache:
+    """On-disk task outputs, one JSON file per ``<task name>/<key>``."""
+
+    def __init__(self, root: str = None):
+        self.root = root or os.path.join(CACHE_DIR, "tasks")
+
+    def _path(self, task_name: str, key: str) -> str:
+        return os.path.join(self.root, task_name, f"{key}.json")
+
+    def get(self, task_name: str, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(task_name, key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def set(self, task_name: str, key: str, payload: Dict[str, Any]):
+        path = self._path(task_name, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so a concurrent reader never sees a partial file
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        os.replace(temporary, path)
+
+    def task_names(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, name)))
+
+    def invalidate(self, task_names: Iterable[str] = None) -> int:
+        """Drop cached outputs of ``task_names`` (all tasks when empty); returns the count removed."""
+        removed = 0
+        for name in list(task_names or []) or self.task_names():
+            directory = os.path.join(self.root, name)
+            if os.path.isdir(directory):
+                removed += sum(1 for entry in os.listdir(directory) if entry.endswith(".json"))
+                shutil.rmtree(directory)
+        return removed
+
+
+# Shared store for every cached task in the process
+task_cache = TaskResultCache()
+
+
+class CachedTask(Task):
+    """Task whose output is memoized on disk by ``task_cache_key``.
+
+    On a hit the stored output is validated against ``output_pydantic`` and
+    returned without calling the agent, and ``output_file`` is rewritten, so
+    downstream tasks see exactly what a fresh run would have produced.
+    Set ``IPM_TASK_CACHE=0`` to bypass the cache.
+
+    The upstream outputs are first narrowed by ``project_context`` to the
+    ``context_fields`` the task declares, so the key covers what the agent
+    is actually shown.
+    """
+
+    cache: bool = Field(
+        default_factory=lambda: os.getenv("IPM_TASK_CACHE", "1") != "0",
+        description="Whether to reuse outputs of identical earlier runs.",
+    )
+    context_fields: Optional[Dict[str, List[str]]] = Field(
+        default=None,
+        description="Per upstream task, the output fields passed on as context (e.g. 'news.link'); unnamed tasks are passed whole.",
+    )
+    context_max_chars: Optional[int] = Field(
+        default=None,
+        description="Cap on the context length; the lowest ranked fields are cut first.",
+    )
+
+    def execute_sync(self, agent: Optional[BaseAgent] = None, context: Optional[str] = None, tools: Optional[list] = None) -> TaskOutput:
+        agent = agent or self.agent
+        context = project_context(self, context)
+        if not self.cache or agent is None:
+            return super().execute_sync(agent, context, tools)
+        key = task_cache_key(self, agent, context, tools)
+        name = self.name or self.key
+        payload = task_cache.get(name, key)
+        if payload is not None:
+            try:
+                with tracer.span(name, "task", agent=agent.role, cache_hit=True):
+                    return self._restore(payload, agent)
+            except ValidationError:
+                pass  # output model changed shape since; recompute below
+        output = super().execute_sync(agent, context, tools)
+        task_cache.set(name, key, {
+            "raw": output.raw,
+            "pydantic": output.pydantic.model_dump(mode="json") if output.pydantic else None,
+            "json_dict": output.json_dict,
+        })
+        return output
+
+    def _restore(self, payload: Dict[str, Any], agent: BaseAgent) -> TaskOutput:
+        pydantic_output = self.output_pydantic.model_validate(payload["pydantic"]) if payload.get("pydantic") else None
+        self.agent = agent
+        self.processed_by_agents.add(agent.role)
+        self.start_time = self.end_time = datetime.datetime.now()
+        self.output = TaskOutput(
+            name=self.name,
+            description=self.description,
+            expected_output=self.expected_output,
+            raw=payload["raw"],
+            pydantic=pydantic_output,
+            json_dict=payload.get("json_dict"),
+            agent=agent.role,
+            output_format=self._get_output_format(),
+        )
+        Printer().print(content=f"Task '{self.name}' unchanged since its last run; using the cached output.", color="cyan")
+
+        if self.callback:
+            self.callback(self.output)
+        crew = agent.crew
+        if crew and crew.task_callback and crew.task_callback != self.callback:
+            crew.task_callback(self.output)
+        if self.output_file:
+            self._save_file(payload.get("json_dict") or (pydantic_output.model_dump_json() if pydantic_output else payload["raw"]))
+        # Listeners (output streams, UIs) see the cached output like a fresh one
+        crewai_event_bus.emit(self, TaskCompletedEvent(output=self.output))
+        return self.output
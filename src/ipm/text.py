@@ -0,0 +1,11 @@
+def cap_text(text: str, max_chars: int) -> tuple:
+    """``(text, truncated)`` with ``text`` cut to ``max_chars`` at a sentence or word boundary."""
+    if len(text) <= max_chars:
+        return text, False
+    cut = text[:max_chars]
+    boundary = max(cut.rfind(". "), cut.rfind("\n"))
+    if boundary < max_chars * 0.8:
+        boundary = cut.rfind(" ")
+    if boundary > 0:
+        cut = cut[:boundary + 1]
+    return cut.rstrip() + " …", True
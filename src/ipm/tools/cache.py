@@ -0,0 +1,230 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+# Root directory for on-disk caches, relative to where the crew is run (like output/)
+CACHE_DIR = os.getenv("IPM_CACHE_DIR", ".cache")
+
+# Milliseconds a connection waits for another process's write lock before giving up
+SQLITE_BUSY_TIMEOUT_MS = 30000
+
+_MISSING = object()
+
+
+def open_sqlite(path: str) -> sqlite3.Connection:
+    """Connect to a cache database that several processes may use at once.
+
+    WAL lets readers run alongside a writer, and ``busy_timeout`` makes a
+    locked database wait rather than fail straight away.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000)
+    conn.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA journal_mode = WAL")
+    return conn
+
+
+def write_sqlite(conn: sqlite3.Connection, statements: list) -> bool:
+    """Run ``(sql, params)`` pairs in one transaction; False if the database stayed locked."""
+    try:
+        for sql, params in statements:
+            conn.execute(sql, params)
+        conn.commit()
+        return True
+    except sqlite3.OperationalError:
+        conn.rollback()
+        return False
+
+
+class TTLCache:
+    """In-memory LRU cache where every entry carries its own expiry time."""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._inflight = {}  # key -> Future of the computation currently filling it
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl: float):
+        with self._lock:
+            self._data[key] = (time.time() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_compute(self, key, compute, ttl: float):
+        """Return the cached value or compute and store it.
+
+        Concurrent callers missing on the same key share a single call to
+        ``compute``; if it raises, every waiting caller sees the exception
+        and nothing is cached.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+        try:
+            value = compute()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            self.set(key, value, ttl)
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+            }
+
+
+class SQLiteCache:
+    """On-disk LRU cache tier storing JSON-serializable values in a SQLite table.
+
+    The database may be shared with other processes. If it stays locked
+    past the busy timeout, a read counts as a miss and a write is dropped.
+    """
+
+    def __init__(self, path: str, maxsize: int = 5000):
+        self.path = path
+        self.maxsize = maxsize
+        self._conn = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _connect(self):
+        # Opened lazily so importing a tool never touches the filesystem
+        if self._conn is None:
+            conn = open_sqlite(self.path)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_last_access ON cache (last_access)")
+            conn.commit()
+            self._conn = conn  # only once the schema exists, so a locked first attempt is retried
+        return self._conn
+
+    def get(self, key, default=None):
+        entry = self.get_entry(key)
+        return default if entry is None else entry[0]
+
+    def get_entry(self, key):
+        """Return ``(value, expires_at)`` for a live entry, or None."""
+        with self._lock:
+            now = time.time()
+            try:
+                conn = self._connect()
+                row = conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            except sqlite3.OperationalError:
+                row = None
+            if row is None or row[1] <= now:
+                if row is not None:
+                    write_sqlite(conn, [("DELETE FROM cache WHERE key = ?", (key,))])
+                self.misses += 1
+                return None
+            write_sqlite(conn, [("UPDATE cache SET last_access = ? WHERE key = ?", (now, key))])
+            self.hits += 1
+            return json.loads(row[0]), row[1]
+
+    def set(self, key, value, ttl: float):
+        with self._lock:
+            now = time.time()
+            try:
+                conn = self._connect()
+            except sqlite3.OperationalError:
+                return
+            write_sqlite(conn, [
+                ("INSERT OR REPLACE INTO cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                 (key, json.dumps(value), now + ttl, now)),
+                # Drop expired rows first, then the least recently used ones above the size bound
+                ("DELETE FROM cache WHERE expires_at <= ?", (now,)),
+                ("DELETE FROM cache WHERE key IN ("
+                 "SELECT key FROM cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)", (self.maxsize,)),
+            ])
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM cache")
+            conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = self._connect().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+            return {"size": size, "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+class TieredCache:
+    """Memory tier in front of a disk tier; disk hits are promoted back into memory."""
+
+    def __init__(self, memory: TTLCache, disk: SQLiteCache):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key, default=None):
+        value = self.memory.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        entry = self.disk.get_entry(key)
+        if entry is None:
+            return default
+        value, expires_at = entry
+        self.memory.set(key, value, expires_at - time.time())
+        return value
+
+    def set(self, key, value, ttl: float):
+        self.memory.set(key, value, ttl)
+        self.disk.set(key, value, ttl)
+
+    def clear(self):
+        self.memory.clear()
+        self.disk.clear()
+
+    def stats(self) -> dict:
+        memory, disk = self.memory.stats(), self.disk.stats()
+        hits = memory["hits"] + disk["hits"]
+        return {"memory": memory, "disk": disk, "hits": hits, "misses": disk["misses"]}
+
@@ -122,12 +122,49 @@ import yfinance as yf
 import json
 from datetime import datetime
 from crewai.tools import BaseTool
-from typing import Type
-from pydantic import BaseModel, Field
+from typing import List, Optional, Type
+from pydantic import BaseModel, Field, model_validator
+
+from ipm.tools.cache import TTLCache
+from ipm.tools.price_format import INTERVALS, historical_payload
+from ipm.tools.price_store import price_store
+from ipm.tracing import tracer
+
+# Data types that can be served for many tickers with a single bulk download
+BULK_DATA_TYPES = ("current", "historical")
+
+# How long each kind of lookup stays fresh in the in-process cache (seconds)
+STOCK_DATA_TTL = {
+    "current": 30,
+    "info": 6 * 60 * 60,
+    "dividends": 24 * 60 * 60,
+    "earnings": 24 * 60 * 60,
+}
+
+stock_cache = TTLCache(maxsize=1024)
+
+
+def _cached(ticker: str, kind: str, fetch):
+    """Memoize one yfinance lookup per (ticker, kind); concurrent callers share a fetch."""
+    with tracer.span(f"yfinance.{kind}", "data", ticker=ticker.upper(), cache_hit=True) as span:
+        def traced_fetch():
+            span["cache_hit"] = False
+            return fetch()
+
+        return stock_cache.get_or_compute((ticker.upper(), kind), traced_fetch, STOCK_DATA_TTL[kind])
+
+
+def cache_stats() -> dict:
+    """Hit/miss counters of the stock lookup cache."""
+    return stock_cache.stats()
 
 class FetchStockDataInput(BaseModel):
     """Input schema for FetchStockDataTool."""
-    ticker: str = Field(..., description="The stock ticker symbol (e.g., 'AAPL').")
+    ticker: Optional[str] = Field(None, description="The stock ticker symbol (e.g., 'AAPL').")
+    tickers: Optional[List[str]] = Field(
+        None,
+        description="Several ticker symbols to fetch at once (e.g., ['AAPL', 'MSFT']). 'current' and 'historical' are downloaded in one bulk request."
+    )
     data_type: str = Field(
         "current",
         description="The type of data to fetch: 'current', 'historical', 'info', 'dividends', 'earnings', 'pe_ratio', or 'news'.",
@@ -142,9 +179,23 @@ class FetchStockDataInput(BaseModel):
     )
     format: str = Field(
         "text",
-        description="Output format: 'text' (default) or 'json'."
+        description="Output format: 'text' (default) or 'json'. Historical bars are sent as CSV in text and as column arrays in json."
+    )
+    interval: str = Field(
+        "daily",
+        description="Bar size for historical data: 'daily' (default), 'weekly' or 'monthly'. Use coarser bars for long ranges."
+    )
+    summary: bool = Field(
+        True,
+        description="Include summary statistics (return, volatility, max drawdown, moving averages) with historical data."
     )
 
+    @model_validator(mode="after")
+    def check_ticker(self):
+        if not self.ticker and not self.tickers:
+            raise ValueError("Either 'ticker' or 'tickers' must be provided.")
+        return self
+
 class FetchStockDataTool(BaseTool):
     name: str = "Fetch Stock Data Tool"
     description: str = (
@@ -152,15 +203,17 @@ class FetchStockDataTool(BaseTool):
     )
     args_schema: Type[BaseModel] = FetchStockDataInput
 
-    def _run(self, ticker: str, data_type: str = "current", start_date: str = None, end_date: str = None, format: str = "text"):
+    def _run(self, ticker: str = None, data_type: str = "current", start_date: str = None, end_date: str = None, format: str = "text", tickers: List[str] = None, interval: str = "daily", summary: bool = True):
         """Fetches stock data using yfinance and returns results in the requested format."""
+        if tickers:
+            return self._run_batch(tickers, data_type, start_date, end_date, format, interval, summary)
         try:
             stock = yf.Ticker(ticker)
             result = {}
 
             # Fetch the requested data type
             if data_type == "current":
-                history = stock.history(period="1d")
+                history = _cached(ticker, "current", lambda: stock.history(period="1d"))
                 if history.empty:
                     return f"No recent trading data available for {ticker}."
                 current_price = history['Close'].iloc[-1]  # Fixed the warning by using `.iloc[-1]`
@@ -170,24 +223,32 @@ class FetchStockDataTool(BaseTool):
                 if not start_date or not end_date:
                     return "Start date and end date are required for historical data."
                 
-                historical_data = stock.history(start=start_date, end=end_date)
+                # Only the parts of the range never downloaded before hit Yahoo
+                historical_data = price_store.history(
+                    ticker, start_date, end_date,
+                    lambda start, end: stock.history(start=start, end=end),
+                )
                 if historical_data.empty:
                     return f"No historical data found for {ticker} from {start_date} to {end_date}."
-                result = {"ticker": ticker, "historical_data": historical_data.to_dict()}
+                tabular = "columns" if format == "json" else "csv"
+                result = {"ticker": ticker, **historical_payload(historical_data, interval, summary, tabular)}
 
             elif data_type == "info":
-                result = {"ticker": ticker, "info": stock.info or "No data available"}
+                result = {"ticker": ticker, "info": _cached(ticker, "info", lambda: stock.info) or "No data available"}
             
             elif data_type == "dividends":
-                dividends = stock.dividends
-                result = {"ticker": ticker, "dividends": dividends.to_dict() if not dividends.empty else "No dividends data available."}
+                dividends = _cached(ticker, "dividends", lambda: stock.dividends)
+                # ISO date keys: Timestamp keys cannot be serialized to JSON
+                dividends = {date.strftime("%Y-%m-%d"): value for date, value in dividends.items()}
+                result = {"ticker": ticker, "dividends": dividends or "No dividends data available."}
             
             elif data_type == "earnings":
-                earnings = stock.earnings
+                earnings = _cached(ticker, "earnings", lambda: stock.earnings)
                 result = {"ticker": ticker, "earnings": earnings.to_dict() if not earnings.empty else "No earnings data available."}
             
             elif data_type == "pe_ratio":
-                pe_ratio = stock.info.get("trailingPE", "N/A")
+                # Shares the cached "info" entry, so asking for both costs one lookup
+                pe_ratio = _cached(ticker, "info", lambda: stock.info).get("trailingPE", "N/A")
                 result = {"ticker": ticker, "pe_ratio": pe_ratio}
             
             elif data_type == "news":
@@ -201,6 +262,9 @@ class FetchStockDataTool(BaseTool):
             
             # Format output
             if format == "json":
+                if data_type == "historical":
+                    # Indenting one value per line would multiply the size of the bar arrays
+                    return json.dumps(result, separators=(",", ":"))
                 return json.dumps(result, indent=4)
             elif format == "text":
                 formatted_output = "\n".join([f"{key}: {value}" for key, value in result.items()])
@@ -217,6 +281,84 @@ class FetchStockDataTool(BaseTool):
             print(error_message)
             return {"error": error_message}
 
+    def _run_batch(self, tickers: List[str], data_type: str, start_date: str = None, end_date: str = None, format: str = "text", interval: str = "daily", summary: bool = True):
+        """Fetches one data type for several tickers; failures are reported per ticker."""
+        tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t and t.strip()))
+        if data_type not in BULK_DATA_TYPES:
+            # No bulk endpoint for these; fall back to one lookup per ticker
+            data, errors = {}, {}
+            for symbol in tickers:
+                output = self._run(ticker=symbol, data_type=data_type, start_date=start_date, end_date=end_date, format="json")
+                if isinstance(output, dict):
+                    errors[symbol] = output["error"]
+                elif output.lstrip().startswith("{"):
+                    data[symbol] = json.loads(output)
+                else:
+                    errors[symbol] = output
+            return self._format_batch({"data_type": data_type, "data": data, "errors": errors}, format)
+
+        if data_type == "historical" and (not start_date or not end_date):
+            return "Start date and end date are required for historical data."
+        if interval not in INTERVALS:
+            return f"Invalid interval '{interval}'. Options: {', '.join(INTERVALS)}"
+        # Historical ranges already in the local store are not downloaded again
+        stale = tickers
+        if data_type == "historical":
+            stale = [symbol for symbol in tickers if price_store.missing_ranges(symbol, start_date, end_date)]
+        frame = None
+        try:
+            if data_type == "current":
+                frame = yf.download(tickers, period="5d", group_by="ticker", threads=True, progress=False)
+            elif stale:
+                frame = yf.download(stale, start=start_date, end=end_date, group_by="ticker", actions=True, threads=True, progress=False)
+        except Exception as e:
+            error_message = f"An error occurred: {str(e)}"
+            print(error_message)
+            return {"error": error_message}
+
+        data, errors = {}, {}
+        for symbol in tickers:
+            history = _ticker_frame(frame, symbol)
+            if data_type == "historical":
+                # Missing from the bulk result (or all-NaN): nothing is marked as downloaded
+                if symbol in stale and history is not None and not history.empty:
+                    price_store.put(symbol, history, start_date, end_date)
+                history = price_store.get(symbol, start_date, end_date)
+            if history is None or history.empty:
+                errors[symbol] = f"No price data returned for {symbol}."
+            elif data_type == "current":
+                data[symbol] = {"current_price": round(float(history["Close"].iloc[-1]), 2)}
+            else:
+                data[symbol] = historical_payload(history, interval, summary, "columns" if format == "json" else "csv")
+        return self._format_batch({"data_type": data_type, "data": data, "errors": errors}, format)
+
+    @staticmethod
+    def _format_batch(result: dict, format: str):
+        if format == "json":
+            return json.dumps(result, separators=(",", ":"), default=str)
+        elif format == "text":
+            lines = []
+            for symbol, value in result["data"].items():
+                if isinstance(value, dict) and "historical_data" in value:
+                    lines.append(f"{symbol}:")
+                    lines += [f"{key}: {item}" for key, item in value.items()]
+                else:
+                    lines.append(f"{symbol}: {value}")
+            lines += [f"{symbol}: error: {message}" for symbol, message in result["errors"].items()]
+            return "\n".join(lines)
+        else:
+            return f"Invalid format '{format}'. Options: 'text', 'json'."
+
+
+def _ticker_frame(frame, symbol: str):
+    """Slice one ticker out of a ``group_by='ticker'`` bulk download, dropping empty rows."""
+    if frame is None or frame.empty:
+        return None
+    if symbol not in frame.columns.get_level_values(0):
+        return None
+    return frame[symbol].dropna(subset=["Close"])
+
+
 # ------------------ Main Testing Function ------------------
 if __name__ == "__main__":
     fetch_tool = FetchStockDataTool()
@@ -241,3 +383,6 @@ if __name__ == "__main__":
 
     print("\nSimulated News (AAPL):")
     print(fetch_tool._run(ticker="AAPL", data_type="news", format="json"))
+
+    print("\nBulk Current Prices (AAPL, MSFT, GOOGL):")
+    print(fetch_tool._run(tickers=["AAPL", "MSFT", "GOOGL"], data_type="current", format="json"))
@@ -0,0 +1,311 @@
+import hashlib
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from ipm.tools.cache import CACHE_DIR, open_sqlite, write_sqlite
+from ipm.tools.news_dedup import canonicalize_link, dedupe_articles
+
+# Articles published longer ago than this are dropped from the archive
+RETENTION_DAYS = float(os.getenv("IPM_NEWS_RETENTION_DAYS", "365"))
+# Beyond this many articles, the least recently published are dropped
+ARCHIVE_SIZE = int(os.getenv("IPM_NEWS_ARCHIVE_SIZE", "50000"))
+
+# Serper's relative dates: "20 hours ago", "1 day ago", "5 mins ago"
+_RELATIVE_DATE = re.compile(r"\b(\d+|an?|one)\s*(second|sec|minute|min|hour|hr|day|week|month|year)s?\s+ago\b", re.I)
+_UNIT_SECONDS = {
+    "second": 1, "sec": 1, "minute": 60, "min": 60, "hour": 3600, "hr": 3600,
+    "day": 86400, "week": 7 * 86400, "month": 30 * 86400, "year": 365 * 86400,
+}
+_DATE_FORMATS = ("%b %d, %Y", "%B %d, %Y", "%d %b %Y", "%d %B %Y", "%d %b, %Y", "%Y-%m-%d", "%d-%b-%Y", "%m/%d/%Y")
+
+_TERM = re.compile(r"\w+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has in is it its of on or that the to was were will with".split()
+)
+# Title terms count this many times in an article's term frequencies
+TITLE_WEIGHT = 2
+# BM25 parameters
+_K1 = 1.2
+_B = 0.75
+
+
+def parse_news_date(text: str, now: float) -> Optional[float]:
+    """Epoch seconds of a Serper ``date`` string, relative ones counted back from ``now``."""
+    parsed = parse_news_date_range(text, now)
+    return parsed[0] if parsed else None
+
+
+def parse_news_date_range(text: str, now: float) -> Optional[tuple]:
+    """``(epoch seconds, resolution)`` of a Serper ``date`` string, or None.
+
+    The resolution is how much older the article may be than the parsed
+    time: one unit of a relative date ("3 days ago" is up to 4 days old),
+    a day for calendar dates.
+    """
+    if not text:
+        return None
+    value = text.strip()
+    lowered = value.lower()
+    if lowered in ("just now", "now"):
+        return now, 60.0
+    if lowered == "today":
+        return now, 86400.0
+    if lowered == "yesterday":
+        return now - 86400, 86400.0
+    match = _RELATIVE_DATE.search(lowered)
+    if match:
+        count = 1 if match.group(1) in ("a", "an", "one") else int(match.group(1))
+        unit = _UNIT_SECONDS[match.group(2)]
+        return now - count * unit, float(unit)
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).replace(tzinfo=timezone.utc).timestamp(), 86400.0
+        except ValueError:
+            continue
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return (parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)).timestamp(), 0.0
+
+
+def format_age(published: float, now: float) -> str:
+    """``published`` in Serper's style: "3 hours ago", or the date once over a month old."""
+    seconds = max(0.0, now - published)
+    if seconds >= 31 * 86400:
+        return datetime.fromtimestamp(published, timezone.utc).strftime("%b %d, %Y")
+    for unit, size in (("day", 86400), ("hour", 3600), ("minute", 60)):
+        if seconds >= size:
+            count = int(seconds // size)
+            return f"{count} {unit}{'s' if count != 1 else ''} ago"
+    return "just now"
+
+
+def tokenize(text: str) -> List[str]:
+    return [term for term in _TERM.findall((text or "").lower()) if len(term) > 1 and term not in STOPWORDS]
+
+
+def article_id(link: str) -> str:
+    """Stable id of an article: hash of its canonical link."""
+    return hashlib.sha1(canonicalize_link(link).encode("utf-8")).hexdigest()
+
+
+def query_key(query: str, gl: str) -> str:
+    return f"{gl}:{' '.join(query.lower().split())}"
+
+
+class NewsArchive:
+    """Every news article the tools have seen, with a full-text index.
+
+    Articles are stored once per canonical link. Their publication time is
+    parsed from Serper's ``date`` when they are first seen, since relative
+    dates ("20 hours ago") are most precise then, along with the
+    resolution of that date, so a window search keeps an article that
+    may fall inside it ("7 days ago" in a week). Title and snippet terms
+    go into an inverted index (term -> article, term frequency) searched
+    with BM25. The archive also remembers which articles each query
+    returned and what its fetches from Serper covered (since when, and how
+    many articles), so callers only need to ask Serper for what appeared
+    since.
+    """
+
+    def __init__(self, path: str = None, retention_days: float = RETENTION_DAYS, maxsize: int = ARCHIVE_SIZE):
+        self.path = path or os.path.join(CACHE_DIR, "news_archive.sqlite")
+        self.retention_days = retention_days
+        self.maxsize = maxsize
+        self._conn = None
+        self._lock = threading.Lock()
+        self.hits = 0  # searches answered without going to Serper
+        self.misses = 0
+
+    def _connect(self):
+        # Opened lazily so importing a tool never touches the filesystem
+        if self._conn is None:
+            conn = open_sqlite(self.path)
+            conn.executescript(
+                "CREATE TABLE IF NOT EXISTS articles ("
+                "id TEXT PRIMARY KEY, link TEXT NOT NULL, title TEXT NOT NULL, snippet TEXT, source TEXT, "
+                "image_url TEXT, published REAL NOT NULL, first_seen REAL NOT NULL, length INTEGER NOT NULL, "
+                "resolution REAL NOT NULL DEFAULT 0);"
+                "CREATE INDEX IF NOT EXISTS idx_articles_published ON articles (published);"
+                "CREATE TABLE IF NOT EXISTS postings ("
+                "term TEXT NOT NULL, article_id TEXT NOT NULL, tf INTEGER NOT NULL, "
+                "PRIMARY KEY (term, article_id)) WITHOUT ROWID;"
+                "CREATE TABLE IF NOT EXISTS query_hits ("
+                "query TEXT NOT NULL, article_id TEXT NOT NULL, rank INTEGER NOT NULL, "
+                "PRIMARY KEY (query, article_id)) WITHOUT ROWID;"
+                "CREATE TABLE IF NOT EXISTS fetches ("
+                "query TEXT PRIMARY KEY, fetched_at REAL NOT NULL, since REAL NOT NULL DEFAULT 0, num INTEGER NOT NULL DEFAULT 0);"
+            )
+            # Archives written before these columns existed; num 0 makes every query fetch its full window again
+            for table, column, definition in (
+                ("articles", "resolution", "REAL NOT NULL DEFAULT 0"),
+                ("fetches", "since", "REAL NOT NULL DEFAULT 0"),
+                ("fetches", "num", "INTEGER NOT NULL DEFAULT 0"),
+            ):
+                if column not in {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+            conn.commit()
+            self._conn = conn  # only once the schema exists, so a locked first attempt is retried
+        return self._conn
+
+    def add(self, articles: list, query: str = None, fetched_at: float = None, since: float = None, num: int = None) -> int:
+        """Archive ``articles`` (Serper dicts); returns how many were new (none if it stayed locked).
+
+        With ``query`` (a ``query_key``), they are recorded as that query's
+        results and ``fetched_at`` as the time it last went to Serper.
+        ``since`` and ``num`` record what the query's fetches now cover:
+        every article published after ``since``, up to ``num`` of them.
+        """
+        now = fetched_at or time.time()
+        statements, fresh = [], {}
+        with self._lock:
+            conn = self._connect()
+            keys = [article_id(article["link"]) for article in articles if article.get("link") and article.get("title")]
+            known = {row[0] for row in conn.execute(f"SELECT id FROM articles WHERE id IN ({','.join('?' * len(keys))})", keys)}
+            for rank, article in enumerate(articles):
+                link, title = article.get("link"), article.get("title")
+                if not link or not title:
+                    continue
+                key = article_id(link)
+                if key not in known and key not in fresh:
+                    terms = Counter(tokenize(title) * TITLE_WEIGHT + tokenize(article.get("snippet")))
+                    published, resolution = parse_news_date_range(article.get("date"), now) or (now, 0.0)
+                    fresh[key] = article
+                    # OR IGNORE: another process may archive the same article meanwhile
+                    statements.append((
+                        "INSERT OR IGNORE INTO articles (id, link, title, snippet, source, image_url, published, first_seen, length, resolution) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (key, link, title, article.get("snippet"), article.get("source"), article.get("imageUrl"),
+                         published, now, sum(terms.values()), resolution),
+                    ))
+                    statements += [
+                        ("INSERT OR IGNORE INTO postings (term, article_id, tf) VALUES (?, ?, ?)", (term, key, tf))
+                        for term, tf in terms.items()
+                    ]
+                if query:
+                    statements.append(("INSERT OR REPLACE INTO query_hits (query, article_id, rank) VALUES (?, ?, ?)", (query, key, rank)))
+            if query:
+                statements.append((
+                    "INSERT OR REPLACE INTO fetches (query, fetched_at, since, num) VALUES (?, ?, ?, ?)",
+                    (query, now, now if since is None else since, len(articles) if num is None else num),
+                ))
+            written = write_sqlite(conn, statements + self._prune(now))
+        return len(fresh) if written else 0
+
+    def _prune(self, now: float) -> list:
+        # Past the retention period, then the oldest above the size bound
+        statements = []
+        for expired, params in (
+            ("SELECT id FROM articles WHERE published < ?", (now - self.retention_days * 86400,)),
+            ("SELECT id FROM articles ORDER BY published DESC LIMIT -1 OFFSET ?", (self.maxsize,)),
+        ):
+            statements += [
+                (f"DELETE FROM postings WHERE article_id IN ({expired})", params),
+                (f"DELETE FROM query_hits WHERE article_id IN ({expired})", params),
+                (f"DELETE FROM articles WHERE id IN ({expired})", params),
+            ]
+        return statements
+
+    def last_fetch(self, query: str) -> Optional[dict]:
+        """When ``query`` (a ``query_key``) last went to Serper and what its fetches cover, if ever fetched."""
+        with self._lock:
+            row = self._connect().execute("SELECT fetched_at, since, num FROM fetches WHERE query = ?", (query,)).fetchone()
+        return dict(zip(("fetched_at", "since", "num"), row)) if row else None
+
+    def search(self, text: str, since: float = None, until: float = None, limit: int = 15, query: str = None) -> list:
+        """Archived articles matching ``text``, best first, as Serper-shaped dicts.
+
+        Articles a ``query`` (its ``query_key``) returned from Serper come
+        first, in Serper's order (the rank of their latest fetch, newer
+        first on ties). Other full-text matches follow by BM25 score over
+        title and snippet, then by recency. ``since`` / ``until`` bound the
+        publication time (epoch seconds); an article counts as published
+        after ``since`` if its date's resolution allows it.
+        """
+        terms = sorted(set(tokenize(text)))
+        since = since if since is not None else 0.0
+        until = until if until is not None else math.inf
+        with self._lock:
+            conn = self._connect()
+            total, avg_length = conn.execute("SELECT COUNT(*), AVG(length) FROM articles").fetchone()
+            if not total:
+                return []
+            scores, published = {}, {}
+            if terms:
+                marks = ",".join("?" * len(terms))
+                df = dict(conn.execute(f"SELECT term, COUNT(*) FROM postings WHERE term IN ({marks}) GROUP BY term", terms))
+                rows = conn.execute(
+                    f"SELECT p.term, p.article_id, p.tf, a.length, a.published FROM postings p JOIN articles a ON a.id = p.article_id "
+                    f"WHERE p.term IN ({marks}) AND a.published + a.resolution >= ? AND a.published < ?",
+                    (*terms, since, until),
+                )
+                for term, key, tf, length, when in rows:
+                    published[key] = when
+                    idf = math.log(1 + (total - df[term] + 0.5) / (df[term] + 0.5))
+                    norm = tf + _K1 * (1 - _B + _B * length / (avg_length or 1))
+                    scores[key] = scores.get(key, 0.0) + idf * tf * (_K1 + 1) / norm
+            hits = {}  # article -> its rank in the query's Serper results
+            if query:
+                for key, rank, when in conn.execute(
+                    "SELECT h.article_id, h.rank, a.published FROM query_hits h JOIN articles a ON a.id = h.article_id "
+                    "WHERE h.query = ? AND a.published + a.resolution >= ? AND a.published < ?",
+                    (query, since, until),
+                ):
+                    hits[key] = rank
+                    published[key] = when
+
+            def rank_key(key):
+                if key in hits:
+                    return 0, hits[key], -published[key]
+                return 1, -scores.get(key, 0.0), -published[key]
+
+            # Rank on the index alone; only the leading rows are read back (spare ones for dedupe)
+            ranked = sorted(published, key=rank_key)[:limit * 2]
+            if not ranked:
+                return []
+            rows = conn.execute(
+                f"SELECT id, link, title, snippet, source, image_url, published FROM articles WHERE id IN ({','.join('?' * len(ranked))})",
+                ranked,
+            ).fetchall()
+        order = {key: position for position, key in enumerate(ranked)}
+        rows.sort(key=lambda row: order[row[0]])
+        now = time.time()
+        articles = [
+            {"title": title, "link": link, "snippet": snippet, "date": format_age(published, now), "source": source, "imageUrl": image_url}
+            for _, link, title, snippet, source, image_url, published in rows
+        ]
+        return dedupe_articles(articles)[:limit]
+
+    def count(self, hit: bool):
+        """Count a search the archive answered alone (``hit``) or that went to Serper."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            conn = self._connect()
+            articles, oldest, newest = conn.execute("SELECT COUNT(*), MIN(published), MAX(published) FROM articles").fetchone()
+            terms = conn.execute("SELECT COUNT(DISTINCT term) FROM postings").fetchone()[0]
+            queries = conn.execute("SELECT COUNT(*) FROM fetches").fetchone()[0]
+        return {
+            "articles": articles, "maxsize": self.maxsize, "terms": terms, "queries": queries,
+            "oldest": oldest, "newest": newest, "hits": self.hits, "misses": self.misses,
+        }
+
+    def clear(self):
+        with self._lock:
+            write_sqlite(self._connect(), [(f"DELETE FROM {table}", ()) for table in ("postings", "query_hits", "fetches", "articles")])
+
+
+# Shared by every Serper tool in the process, persisted across runs
+news_archive = NewsArchive()
@@ -0,0 +1,59 @@
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only identify the referrer, not the article
+TRACKING_PARAMS = {"gclid", "fbclid", "mc_cid", "mc_eid", "ref", "ref_src", "cmpid", "ocid"}
+
+_TITLE_SUFFIX = re.compile(r"\s+[-|–—]\s+[^-|–—]{1,60}$")  # " - Economic Times"
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def canonicalize_link(link: str) -> str:
+    """Normalize an article URL so trivially different links compare equal."""
+    parts = urlsplit(link.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if host.startswith("amp."):
+        host = host[4:]
+    path = re.sub(r"/amp/?$", "", parts.path).rstrip("/") or "/"
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    ))
+    return urlunsplit(("https", host, path, query, ""))
+
+
+def title_tokens(title: str) -> frozenset:
+    """Lowercased word set of a headline with any trailing " - Source" removed."""
+    title = _TITLE_SUFFIX.sub("", title or "")
+    return frozenset(token for token in _NON_WORD.split(title.lower()) if token)
+
+
+def is_near_duplicate(a: frozenset, b: frozenset, threshold: float = 0.8) -> bool:
+    """Jaccard similarity test between two title token sets."""
+    if not a or not b:
+        return False
+    return len(a & b) / len(a | b) >= threshold
+
+
+def dedupe_articles(articles: list, title_threshold: float = 0.8) -> list:
+    """Drop articles whose canonical link or headline was already seen.
+
+    The first occurrence wins, so callers should pass the most relevant
+    results first.
+    """
+    seen_links = set()
+    seen_titles = []
+    unique = []
+    for article in articles:
+        link = canonicalize_link(article.get("link", ""))
+        if link in seen_links:
+            continue
+        tokens = title_tokens(article.get("title", ""))
+        if any(is_near_duplicate(tokens, seen, title_threshold) for seen in seen_titles):
+            continue
+        seen_links.add(link)
+        seen_titles.append(tokens)
+        unique.append(article)
+    return unique
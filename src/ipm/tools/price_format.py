@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+
+# Trading days per year, for annualizing daily volatility
+TRADING_DAYS = 252
+
+INTERVALS = {"daily": None, "weekly": "W-FRI", "monthly": "ME"}
+
+_AGGREGATIONS = {
+    "Open": "first",
+    "High": "max",
+    "Low": "min",
+    "Close": "last",
+    "Volume": "sum",
+    "Dividends": "sum",
+}
+
+
+def _combine_splits(splits: pd.Series) -> float:
+    # yfinance reports 0 on days without a split
+    factors = splits[splits != 0]
+    return float(factors.prod()) if len(factors) else 0.0
+
+
+def downsample(history: pd.DataFrame, interval: str = "daily") -> pd.DataFrame:
+    """Aggregate daily bars into weekly or monthly OHLCV bars."""
+    if interval not in INTERVALS:
+        raise ValueError(f"Invalid interval '{interval}'. Options: {', '.join(INTERVALS)}")
+    rule = INTERVALS[interval]
+    if rule is None or history.empty:
+        return history
+    aggregations = {column: how for column, how in _AGGREGATIONS.items() if column in history}
+    if "Stock Splits" in history:
+        aggregations["Stock Splits"] = _combine_splits
+    return history.resample(rule).agg(aggregations).dropna(subset=["Close"])
+
+
+def summary_stats(history: pd.DataFrame) -> dict:
+    """Return, volatility, drawdown and moving averages computed from daily closes."""
+    close = history["Close"].to_numpy(dtype="f8")
+    close = close[~np.isnan(close)]
+    if close.size == 0:
+        return {}
+    log_returns = np.diff(np.log(close))
+    running_peak = np.maximum.accumulate(close)
+    drawdowns = close / running_peak - 1.0
+    stats = {
+        "start_close": round(float(close[0]), 4),
+        "end_close": round(float(close[-1]), 4),
+        "period_high": round(float(np.nanmax(history["High"])), 4) if "High" in history else None,
+        "period_low": round(float(np.nanmin(history["Low"])), 4) if "Low" in history else None,
+        "total_return_pct": round(float(close[-1] / close[0] - 1.0) * 100, 2),
+        "annualized_volatility_pct": (
+            round(float(log_returns.std(ddof=1) * np.sqrt(TRADING_DAYS)) * 100, 2) if log_returns.size > 1 else None
+        ),
+        "max_drawdown_pct": round(float(drawdowns.min()) * 100, 2),
+        "trading_days": int(close.size),
+    }
+    for window in (20, 50, 200):
+        # Latest value of each moving average, only when the range is long enough
+        if close.size >= window:
+            stats[f"sma_{window}"] = round(float(close[-window:].mean()), 4)
+    return stats
+
+
+def _trimmed(history: pd.DataFrame) -> pd.DataFrame:
+    # Dividends / splits columns are almost always zero; drop them when they carry nothing
+    empty = [column for column in ("Dividends", "Stock Splits") if column in history and not history[column].any()]
+    history = history.drop(columns=empty).round(4)
+    if "Volume" in history and history["Volume"].notna().all():
+        history["Volume"] = history["Volume"].astype("int64")
+    return history
+
+
+def to_columnar(history: pd.DataFrame) -> dict:
+    """Column-oriented dict: one date list plus one value list per field."""
+    history = _trimmed(history)
+    columns = {"date": history.index.strftime("%Y-%m-%d").tolist()}
+    for column in history.columns:
+        values = history[column]
+        columns[column.lower().replace(" ", "_")] = values.astype(object).where(values.notna(), None).tolist()
+    return columns
+
+
+def to_csv(history: pd.DataFrame) -> str:
+    """Compact CSV with ISO dates and lower-case column names."""
+    history = _trimmed(history)
+    history.index = history.index.strftime("%Y-%m-%d")
+    history.index.name = "date"
+    history.columns = [column.lower().replace(" ", "_") for column in history.columns]
+    return history.to_csv(lineterminator="\n")
+
+
+def historical_payload(history: pd.DataFrame, interval: str = "daily", summary: bool = True, tabular: str = "columns") -> dict:
+    """Serialize daily bars for the LLM: optional summary stats plus downsampled bars.
+
+    ``tabular`` is ``'columns'`` for JSON arrays or ``'csv'`` for a CSV block.
+    Statistics always come from the daily bars, before downsampling.
+    """
+    payload = {}
+    if summary:
+        payload["summary"] = summary_stats(history)
+    bars = downsample(history, interval)
+    payload["interval"] = interval
+    payload["historical_data"] = to_csv(bars) if tabular == "csv" else to_columnar(bars)
+    return payload
@@ -0,0 +1,149 @@
+import json
+import os
+import threading
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from ipm.tools.cache import CACHE_DIR
+from ipm.tracing import tracer
+
+# Columns kept per daily bar, in the names yfinance uses
+FIELDS = ("Open", "High", "Low", "Close", "Volume", "Dividends", "Stock Splits")
+DTYPE = np.dtype([("date", "datetime64[D]")] + [(field, "f8") for field in FIELDS])
+
+
+def _day(value) -> date:
+    return pd.Timestamp(value).date()
+
+
+def _merge_intervals(intervals: list) -> list:
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+class PriceStore:
+    """On-disk daily OHLCV store with one memory-mapped NumPy file per ticker.
+
+    Alongside ``<TICKER>.npy`` a ``<TICKER>.json`` file records which
+    ``[start, end)`` date ranges have already been downloaded, so a request
+    only fetches the parts of its range that were never seen before. Only
+    the dates the returned bars span count as downloaded: yfinance answers
+    network errors with an empty frame, which must not hide the range for
+    good. Ranges reaching today are not marked as covered, since today's
+    bar is still moving.
+    """
+
+    def __init__(self, root: str = None):
+        self.root = root or os.path.join(CACHE_DIR, "prices")
+        self._lock = threading.Lock()
+
+    def _paths(self, ticker: str):
+        name = ticker.upper().replace("/", "_")
+        return os.path.join(self.root, f"{name}.npy"), os.path.join(self.root, f"{name}.json")
+
+    def _load(self, ticker: str):
+        data_path, meta_path = self._paths(ticker)
+        if not os.path.exists(meta_path):
+            return np.empty(0, dtype=DTYPE), []
+        with open(meta_path, "r", encoding="utf-8") as f:
+            coverage = [[date.fromisoformat(s), date.fromisoformat(e)] for s, e in json.load(f)["coverage"]]
+        return np.load(data_path, mmap_mode="r"), coverage
+
+    def _save(self, ticker: str, rows: np.ndarray, coverage: list):
+        os.makedirs(self.root, exist_ok=True)
+        data_path, meta_path = self._paths(ticker)
+        # Write-then-rename so readers never see a half-written file
+        with open(data_path + ".tmp", "wb") as f:
+            np.save(f, rows)
+        os.replace(data_path + ".tmp", data_path)
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"coverage": [[s.isoformat(), e.isoformat()] for s, e in coverage]}, f)
+        os.replace(meta_path + ".tmp", meta_path)
+
+    def missing_ranges(self, ticker: str, start, end) -> list:
+        """``[start, end)`` date ranges of the request not yet stored for ``ticker``."""
+        start, end = _day(start), _day(end)
+        with self._lock:
+            _, coverage = self._load(ticker)
+        missing, cursor = [], start
+        for covered_start, covered_end in coverage:
+            if covered_end <= cursor:
+                continue
+            if covered_start >= end:
+                break
+            if covered_start > cursor:
+                missing.append((cursor, covered_start))
+            cursor = max(cursor, covered_end)
+        if cursor < end:
+            missing.append((cursor, end))
+        return missing
+
+    def put(self, ticker: str, frame: pd.DataFrame, start, end):
+        """Store the bars of ``frame`` and mark the part of ``[start, end)`` they span as downloaded.
+
+        An empty frame stores nothing, so the range is fetched again next time.
+        """
+        if frame is None or frame.empty:
+            return
+        start, end = _day(start), _day(end)
+        new = np.empty(len(frame), dtype=DTYPE)
+        index = pd.DatetimeIndex(frame.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)  # keep the exchange's local trading date
+        new["date"] = index.normalize().values.astype("datetime64[D]")
+        for field in FIELDS:
+            new[field] = frame[field].to_numpy(dtype="f8") if field in frame else 0.0
+        first, last = new["date"].min().astype(date), new["date"].max().astype(date)
+        with self._lock:
+            rows, coverage = self._load(ticker)
+            # Fresh rows replace stored ones for the same date
+            keep = ~np.isin(rows["date"], new["date"])
+            merged = np.concatenate([np.asarray(rows[keep]), new])
+            merged.sort(order="date")
+            # Weekends next to the returned bars hold no bars either; business days might
+            covered_start = start if np.busday_count(start, first) == 0 else max(start, first)
+            after = last + timedelta(days=1)
+            covered_end = min(end if np.busday_count(after, max(after, end)) == 0 else min(end, after), date.today())
+            if covered_end > covered_start:
+                coverage = _merge_intervals(coverage + [[covered_start, covered_end]])
+            self._save(ticker, merged, coverage)
+
+    def get(self, ticker: str, start, end) -> pd.DataFrame:
+        """Stored bars in ``[start, end)`` as a DataFrame shaped like ``Ticker.history``."""
+        lo, hi = np.datetime64(_day(start), "D"), np.datetime64(_day(end), "D")
+        with self._lock:
+            rows, _ = self._load(ticker)
+        # Rows are sorted by date, so the range is a contiguous slice of the memmap
+        dates = rows["date"]
+        window = rows[np.searchsorted(dates, lo, "left"):np.searchsorted(dates, hi, "left")]
+        frame = pd.DataFrame({field: window[field] for field in FIELDS}, index=pd.DatetimeIndex(window["date"], name="Date"))
+        return frame
+
+    def history(self, ticker: str, start, end, fetch) -> pd.DataFrame:
+        """Serve ``[start, end)`` from disk, calling ``fetch(start, end)`` only for gaps."""
+        for gap_start, gap_end in self.missing_ranges(ticker, start, end):
+            with tracer.span("yfinance.history", "data", ticker=ticker, start=gap_start.isoformat(), end=gap_end.isoformat()) as span:
+                frame = fetch(gap_start.isoformat(), gap_end.isoformat())
+                span["rows"] = len(frame)
+            self.put(ticker, frame, gap_start, gap_end)
+        return self.get(ticker, start, end)
+
+    def clear(self, ticker: str = None):
+        with self._lock:
+            paths = self._paths(ticker) if ticker else (
+                [os.path.join(self.root, name) for name in os.listdir(self.root)] if os.path.isdir(self.root) else []
+            )
+            for path in paths:
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+# Shared store used by FetchStockDataTool
+price_store = PriceStore()
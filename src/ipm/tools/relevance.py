@@ -0,0 +1,69 @@
+import re
+
+# Market-related keywords and how strongly each one signals relevance
+MARKET_KEYWORDS = {
+    "stock market": 2.0,
+    "market analysis": 2.0,
+    "market research": 1.5,
+    "financial trends": 1.5,
+    "industry growth": 1.5,
+    "investment": 1.0,
+    "economy": 1.0,
+    "business strategy": 1.0,
+    "trading": 1.0,
+    "business news": 0.5,
+}
+
+
+class RelevanceFilter:
+    """Scores articles by weighted keyword hits in their title and snippet.
+
+    All keywords are compiled into one alternation over the lowered text, so
+    each field is scanned once per article regardless of how many keywords
+    there are. A keyword counts once per article; a hit in the title is
+    worth ``title_weight`` times a hit in the snippet.
+    """
+
+    def __init__(self, keywords: dict, title_weight: float = 2.0):
+        self.weights = {keyword.lower(): float(weight) for keyword, weight in keywords.items()}
+        self.title_weight = title_weight
+        # Plain substring matches, as the keyword loop this replaced did: "reinvestment"
+        # counts as "investment". The lookahead tries every offset, so overlapping
+        # keywords ("stock market analysis") each count. At one offset the longest
+        # keyword matches, and stands for the keywords it starts with.
+        alternation = "|".join(re.escape(keyword) for keyword in sorted(self.weights, key=len, reverse=True))
+        # Matched against lowered text: cheaper than IGNORECASE at every offset
+        self._pattern = re.compile(rf"(?=({alternation}))")
+        self._prefixes = {keyword: [other for other in self.weights if keyword.startswith(other)] for keyword in self.weights}
+
+    def _hits(self, text: str) -> set:
+        return {keyword for match in set(self._pattern.findall((text or "").lower())) for keyword in self._prefixes[match]}
+
+    def score(self, article: dict) -> float:
+        title_hits = self._hits(article.get("title"))
+        snippet_hits = self._hits(article.get("snippet")) - title_hits
+        return (
+            sum(self.weights[keyword] for keyword in title_hits) * self.title_weight
+            + sum(self.weights[keyword] for keyword in snippet_hits)
+        )
+
+    def score_many(self, articles: list) -> list:
+        return [self.score(article) for article in articles]
+
+    def filter(self, articles: list, min_score: float = 0.0, limit: int = None) -> list:
+        """Return articles scoring above ``min_score``, best first.
+
+        Each returned article is a copy carrying its ``relevance`` score.
+        Ties keep their original order.
+        """
+        scored = [
+            (score, index, article)
+            for index, (score, article) in enumerate(zip(self.score_many(articles), articles))
+            if score > min_score
+        ]
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [dict(article, relevance=score) for score, _, article in scored[:limit]]
+
+
+# Shared instance for the market news paths
+market_filter = RelevanceFilter(MARKET_KEYWORDS)
@@ -0,0 +1,55 @@
+import asyncio
+import json
+from crewai.tools import BaseTool
+from typing import List, Optional, Type
+from pydantic import BaseModel, Field, PrivateAttr, model_validator
+
+from ipm.tools.scraper import MAX_PAGE_CHARS, scrape_pages
+
+class ScrapeLinksToolInput(BaseModel):
+    """Input schema for Scrape Links Tool."""
+    urls: Optional[List[str]] = Field(
+        None,
+        description="Every article link to read, e.g. the `link` of each news article from the market analysis. They are fetched concurrently."
+    )
+    url: Optional[str] = Field(
+        None,
+        description="A single link to read."
+    )
+
+    @model_validator(mode="after")
+    def check_urls(self):
+        if not self.urls and not self.url:
+            raise ValueError("Either 'urls' or 'url' must be provided.")
+        return self
+
+class ScrapeLinksTool(BaseTool):
+    name: str = "Scrape Links Tool"
+    description: str = (
+        "Reads the main article text of web pages, without navigation, ads or other boilerplate. "
+        "Pass all `urls` in one call; they are fetched concurrently and each page's text is capped in length."
+    )
+    args_schema: Type[BaseModel] = ScrapeLinksToolInput
+    _max_chars: int = PrivateAttr(default=MAX_PAGE_CHARS)
+
+    def __init__(self, max_chars: int = None):
+        """max_chars: extracted characters kept per page (IPM_SCRAPE_MAX_CHARS by default)."""
+        super().__init__()
+        if max_chars:
+            self._max_chars = max_chars
+
+    def _run(self, urls: List[str] = None, url: str = None):
+        """Fetch every page and return their titles and article text."""
+        pages, errors = scrape_pages(([url] if url else []) + list(urls or []), max_chars=self._max_chars)
+        if not pages and errors:
+            error_message = {"error": "No page could be scraped", "details": errors}
+            print(json.dumps(error_message, indent=2))
+            return error_message
+        result = {"pages": [{key: page[key] for key in ("url", "title", "text", "truncated")} for page in pages]}
+        if errors:
+            result["errors"] = errors
+        return result
+
+    async def _arun(self, urls: List[str] = None, url: str = None):
+        """Async counterpart of ``_run``; the fetches run on their own thread pool."""
+        return await asyncio.get_running_loop().run_in_executor(None, self._run, urls, url)
@@ -0,0 +1,229 @@
+import importlib.util
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urldefrag, urlsplit
+
+from ipm.text import cap_text
+from ipm.tools.cache import CACHE_DIR, SQLiteCache, TieredCache, TTLCache
+from ipm.tools.transport import HttpTransport
+from ipm.tracing import tracer
+
+# Pages fetched within this many seconds are served without asking the site;
+# older ones are revalidated with a conditional GET (ETag / Last-Modified)
+PAGE_MAX_AGE = float(os.getenv("IPM_SCRAPE_MAX_AGE", str(60 * 60)))
+# How long a page and its validators are kept at all
+PAGE_CACHE_TTL = 7 * 24 * 60 * 60
+
+# Extracted article text handed to the LLM per page (characters)
+MAX_PAGE_CHARS = int(os.getenv("IPM_SCRAPE_MAX_CHARS", "4000"))
+# HTML beyond this is not parsed; article bodies sit well inside it
+MAX_HTML_CHARS = 2_000_000
+
+# Concurrent fetches per batch, and per host across the whole process
+SCRAPE_MAX_WORKERS = int(os.getenv("IPM_SCRAPE_WORKERS", "8"))
+SCRAPE_PER_HOST = int(os.getenv("IPM_SCRAPE_PER_HOST", "2"))
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.5",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+# Elements that never hold article text
+BOILERPLATE_TAGS = ["script", "style", "noscript", "template", "svg", "canvas", "iframe", "form", "button", "nav", "header", "footer", "aside"]
+# class / id fragments of navigation, ads, share bars, comments and the like
+BOILERPLATE_HINTS = re.compile(
+    r"(^|[-_ ])(nav|navbar|menu|footer|header|sidebar|breadcrumbs?|comments?|share|social|related|recommended|"
+    r"promo|ads?|advert\w*|sponsor\w*|cookie\w*|consent|newsletter|subscribe|signup|popup|modal|banner)([-_ ]|$)",
+    re.I,
+)
+BLOCK_TAGS = ["h1", "h2", "h3", "h4", "p", "li", "blockquote", "pre", "td"]
+# Shorter paragraphs are captions, bylines, buttons and link lists
+MIN_BLOCK_CHARS = 40
+
+_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+_SPACE = re.compile(r"\s+")
+
+# Shared by every scrape in the process, persisted across runs
+page_cache = TieredCache(
+    TTLCache(maxsize=256),
+    SQLiteCache(os.path.join(CACHE_DIR, "pages.sqlite"), maxsize=2000),
+)
+
+# Pages come from many sites; no provider quota, but a per-host cap (below)
+scrape_transport = HttpTransport(
+    timeout=float(os.getenv("IPM_SCRAPE_TIMEOUT", "10")),
+    max_retries=int(os.getenv("IPM_SCRAPE_MAX_RETRIES", "2")),
+    pool_size=SCRAPE_MAX_WORKERS,
+)
+
+_host_slots = {}  # host -> semaphore bounding concurrent connections to it
+_host_slots_lock = threading.Lock()
+
+
+class ScrapeError(Exception):
+    """Raised when a page cannot be fetched or holds no readable text."""
+
+
+def _host_slot(url: str) -> threading.BoundedSemaphore:
+    host = urlsplit(url).netloc.lower()
+    with _host_slots_lock:
+        if host not in _host_slots:
+            _host_slots[host] = threading.BoundedSemaphore(SCRAPE_PER_HOST)
+        return _host_slots[host]
+
+
+def normalize_url(url: str) -> str:
+    """The URL without its fragment; ``#section`` links name the same page."""
+    return urldefrag(url.strip())[0]
+
+
+def _is_boilerplate(element) -> bool:
+    if element.attrs is None or element.name in ("html", "body", "article", "main"):
+        return False
+    hints = " ".join(element.get("class") or []) + " " + (element.get("id") or "")
+    return bool(BOILERPLATE_HINTS.search(hints))
+
+
+def _main_container(soup):
+    """``<article>`` / ``<main>`` if the page has one, else the element holding the most paragraph text."""
+    container = soup.find("article") or soup.find("main") or soup.find(attrs={"role": "main"})
+    if container is not None and len(container.get_text(strip=True)) >= MIN_BLOCK_CHARS:
+        return container
+    scores = {}
+    for p in soup.find_all("p"):
+        parent = p.parent
+        if parent is not None:
+            scores[id(parent)] = (scores.get(id(parent), (0, parent))[0] + len(p.get_text(strip=True)), parent)
+    if not scores:
+        return soup.body or soup
+    return max(scores.values(), key=lambda score: score[0])[1]
+
+
+def extract_article(html) -> tuple:
+    """``(title, text)`` of the main article in ``html``, boilerplate removed.
+
+    ``html`` is text, or the raw bytes when the server named no charset;
+    bs4 then takes the encoding from the page's ``<meta charset>`` or its
+    bytes. The text is one line per heading, paragraph or list item, in
+    page order.
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html[:MAX_HTML_CHARS], _PARSER)
+    title = None
+    og_title = soup.find("meta", attrs={"property": "og:title"})
+    if og_title is not None and og_title.get("content"):
+        title = og_title["content"]
+    elif soup.title is not None and soup.title.string:
+        title = soup.title.string
+    elif soup.h1 is not None:
+        title = soup.h1.get_text(" ", strip=True)
+
+    for element in soup(BOILERPLATE_TAGS):
+        element.decompose()
+    for element in soup.find_all(_is_boilerplate):
+        element.decompose()
+
+    lines = []
+    for block in _main_container(soup).find_all(BLOCK_TAGS):
+        if block.find(BLOCK_TAGS) is not None:
+            continue  # the nested blocks are visited themselves
+        line = _SPACE.sub(" ", block.get_text(" ", strip=True))
+        if len(line) < MIN_BLOCK_CHARS and not block.name.startswith("h"):
+            continue
+        if line and (not lines or lines[-1] != line):
+            lines.append(line)
+    return (_SPACE.sub(" ", title).strip() if title else None), "\n".join(lines)
+
+
+def fetch_page(url: str, max_age: float = PAGE_MAX_AGE, use_cache: bool = True) -> dict:
+    """The page's extracted article, from the cache while fresh, else (re)fetched.
+
+    Returns a dict with ``url``, ``title``, ``text`` (uncapped), the
+    ``etag`` / ``last_modified`` validators and ``fetched_at``; ``cache``
+    tells whether it was a ``hit``, ``revalidated`` (304) or a ``miss``.
+    """
+    url = normalize_url(url)
+    with tracer.span("scrape.page", "scrape", url=url, cache="miss") as span:
+        cached = page_cache.get(url) if use_cache else None
+        if cached is not None and time.time() - cached["fetched_at"] < max_age:
+            span["cache"] = "hit"
+            return dict(cached, cache="hit")
+
+        headers = dict(HEADERS)
+        if cached is not None:
+            # Only validators the server issued; our own clock says nothing about its copy
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+        with _host_slot(url):
+            response = scrape_transport.get(url, headers=headers, allow_redirects=True)
+
+        if response.status_code == 304 and cached is not None:
+            page = dict(cached, fetched_at=time.time())
+            span["cache"] = "revalidated"
+        elif response.status_code != 200:
+            raise ScrapeError(f"Received {response.status_code} from {url}")
+        else:
+            content_type = response.headers.get("Content-Type", "text/html")
+            if "html" not in content_type and "text/plain" not in content_type:
+                raise ScrapeError(f"Unsupported content type '{content_type}' at {url}")
+            if "charset=" in content_type.lower():
+                body = response.text
+            elif "html" in content_type:
+                body = response.content
+            else:
+                # requests would decode as ISO-8859-1, the HTTP default for text/*
+                response.encoding = response.apparent_encoding
+                body = response.text
+            title, text = extract_article(body) if "html" in content_type else (None, body.strip())
+            if not text:
+                raise ScrapeError(f"No article text found at {url}")
+            page = {
+                "url": url,
+                "title": title,
+                "text": text,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "fetched_at": time.time(),
+            }
+        span["chars"] = len(page["text"])
+        if use_cache:
+            page_cache.set(url, page, PAGE_CACHE_TTL)
+        return dict(page, cache=span["cache"])
+
+
+def scrape_pages(urls: list, max_chars: int = MAX_PAGE_CHARS, max_workers: int = SCRAPE_MAX_WORKERS, max_age: float = PAGE_MAX_AGE) -> tuple:
+    """Fetch ``urls`` concurrently; returns ``(pages, errors)``.
+
+    ``pages`` follows the order of ``urls`` (repeats dropped), each with its
+    text capped at ``max_chars``; ``errors`` maps url -> message.
+    """
+    unique = list(dict.fromkeys(normalize_url(url) for url in urls if url and url.strip()))
+    if not unique:
+        return [], {}
+
+    def fetch(url):
+        try:
+            return url, fetch_page(url, max_age=max_age)
+        except ScrapeError as e:
+            return url, e
+        except Exception as e:  # one unreachable site must not sink the batch
+            return url, ScrapeError(f"{type(e).__name__}: {e}")
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(unique)))) as pool:
+        results = list(pool.map(fetch, unique))
+
+    pages, errors = [], {}
+    for url, page in results:
+        if isinstance(page, ScrapeError):
+            errors[url] = str(page)
+            continue
+        text, truncated = cap_text(page["text"], max_chars)
+        pages.append({"url": url, "title": page["title"], "text": text, "truncated": truncated, "cache": page["cache"]})
+    return pages, errors
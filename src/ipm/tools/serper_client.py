@@ -0,0 +1,266 @@
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ipm.models import SerperNewsResponse
+from ipm.tools.cache import TTLCache
+from ipm.tools.news_archive import news_archive, query_key
+from ipm.tools.news_dedup import dedupe_articles
+from ipm.tools.transport import serper_transport
+from ipm.tracing import tracer
+
+SERPER_NEWS_URL = "https://google.serper.dev/news"
+
+# How long the archive answers a query alone after it went to Serper, per
+# time window (seconds). A week-long window barely changes within a few
+# hours, an hourly one does.
+NEWS_TTL_BY_TBS = {
+    "qdr:h": 10 * 60,
+    "qdr:d": 60 * 60,
+    "qdr:w": 6 * 60 * 60,
+    "qdr:m": 24 * 60 * 60,
+}
+DEFAULT_NEWS_TTL = 60 * 60
+
+# Span of each Serper time window (seconds); the narrowest one covering the
+# time since a query was last fetched is all the archive needs from Serper
+NEWS_WINDOWS = {
+    "qdr:h": 60 * 60,
+    "qdr:d": 24 * 60 * 60,
+    "qdr:w": 7 * 24 * 60 * 60,
+    "qdr:m": 31 * 24 * 60 * 60,
+}
+# Serper indexes articles with some delay; delta windows reach back this much further
+ARCHIVE_OVERLAP = 60 * 60
+
+# Upper bound on concurrent Serper requests issued by one batch call
+BATCH_MAX_WORKERS = int(os.getenv("SERPER_BATCH_WORKERS", "4"))
+
+
+# Memory tier in front of the news archive (the disk tier): archived answers by
+# request, kept until the query is due for another Serper fetch
+news_cache = TTLCache(maxsize=256)
+
+
+class SerperAPIError(Exception):
+    """Raised when the Serper API answers with a non-200 status."""
+
+    def __init__(self, status_code: int, details: str):
+        super().__init__(f"Received {status_code} from API")
+        self.status_code = status_code
+        self.details = details
+
+
+def build_payload(query: str, gl: str = "in", tbs: str = "qdr:w", num: int = 15) -> dict:
+    """Build the Serper news request body."""
+    return {"q": query, "gl": gl, "tbs": tbs, "num": num}
+
+
+def cache_key(payload: dict) -> str:
+    """Key a request on its normalized query plus the remaining search parameters."""
+    normalized = dict(payload, q=" ".join(payload["q"].lower().split()))
+    return json.dumps(normalized, sort_keys=True)
+
+
+def _headers(api_key: str) -> dict:
+    return {
+        'X-API-KEY': api_key,
+        'Content-Type': 'application/json'
+    }
+
+
+def _decode(response) -> dict:
+    if response.status_code != 200:
+        raise SerperAPIError(response.status_code, response.text)
+    return response.json()
+
+
+def delta_window(query: str, gl: str, tbs: str, num: int):
+    """The Serper window to fetch for an archived search, or None if the archive is fresh enough.
+
+    A query gets its full window unless its earlier fetches reach back
+    over all of ``tbs`` with at least ``num`` articles. Afterwards the
+    archive answers alone for ``NEWS_TTL_BY_TBS`` of the window; then only
+    the narrowest window covering the time since the last fetch is asked for.
+    """
+    fetch = news_archive.last_fetch(query_key(query, gl))
+    if fetch is None or tbs not in NEWS_WINDOWS:
+        return tbs
+    now = time.time()
+    if fetch["num"] < num or fetch["since"] > now - NEWS_WINDOWS[tbs]:
+        return tbs
+    age = now - fetch["fetched_at"]
+    if age < NEWS_TTL_BY_TBS.get(tbs, DEFAULT_NEWS_TTL):
+        news_archive.count(hit=True)
+        return None
+    for window, seconds in sorted(NEWS_WINDOWS.items(), key=lambda item: item[1]):
+        if age + ARCHIVE_OVERLAP <= seconds or window == tbs:
+            return window
+    return tbs
+
+
+def archive_fetch(query: str, gl: str, tbs: str, num: int, window: str, data: dict):
+    """Add a Serper response for ``window`` to the archive as a fetch of ``query`` over ``tbs``."""
+    key = query_key(query, gl)
+    now = time.time()
+    previous = news_archive.last_fetch(key)
+    news_archive.count(hit=False)
+    if window == tbs or previous is None:
+        since, count = now - NEWS_WINDOWS.get(tbs, 0), num
+    else:
+        # A delta window reaches back to the last fetch, so the earlier coverage carries on
+        since, count = previous["since"], min(previous["num"], num)
+    news_archive.add(data.get("news", []), query=key, fetched_at=now, since=since, num=count)
+
+
+def archived_news(query: str, gl: str, tbs: str, num: int, key: str = None) -> dict:
+    """The archive's answer for a search, shaped like a Serper response.
+
+    With ``key``, the answer is kept in ``news_cache`` for as long as the
+    archive would answer the query alone.
+    """
+    since = time.time() - NEWS_WINDOWS[tbs] if tbs in NEWS_WINDOWS else None
+    with tracer.span("news_archive.search", "search", query=query) as span:
+        news = news_archive.search(query, since=since, limit=num, query=query_key(query, gl))
+        span["results"] = len(news)
+    data = {"news": news}
+    fetch = news_archive.last_fetch(query_key(query, gl)) if key is not None else None
+    if fetch is not None:
+        ttl = NEWS_TTL_BY_TBS.get(tbs, DEFAULT_NEWS_TTL) - (time.time() - fetch["fetched_at"])
+        if ttl > 0:
+            news_cache.set(key, data, ttl)
+    return data
+
+
+def cache_stats() -> dict:
+    """Hit/miss counters of the memory tier and of the archive behind it."""
+    return {"memory": news_cache.stats(), "archive": news_archive.stats()}
+
+
+def search_news(api_key: str, query: str, gl: str = "in", tbs: str = "qdr:w", num: int = 15, use_cache: bool = True, use_archive: bool = True) -> dict:
+    """Return the decoded Serper news response, served from the cache when possible.
+
+    With ``use_archive`` the answer comes from the local news archive, and
+    Serper is only asked for articles newer than the query's last fetch.
+    The archive is the disk tier of the response cache: a query fetched
+    recently is not sent to Serper at all, and ``news_cache`` holds its
+    answer in memory meanwhile.
+    """
+    if use_archive:
+        key = cache_key(build_payload(query, gl=gl, tbs=tbs, num=num)) if use_cache else None
+        cached = news_cache.get(key) if use_cache else None
+        if cached is not None:
+            return cached
+        window = delta_window(query, gl, tbs, num)
+        if window is not None:
+            data = search_news(api_key, query, gl=gl, tbs=window, num=num, use_archive=False)
+            archive_fetch(query, gl, tbs, num, window, data)
+        return archived_news(query, gl, tbs, num, key)
+
+    payload = build_payload(query, gl=gl, tbs=tbs, num=num)
+    with tracer.span("serper.news", "search", query=query):
+        response = serper_transport.post(SERPER_NEWS_URL, headers=_headers(api_key), data=json.dumps(payload))
+        return _decode(response)
+
+
+async def asearch_news(api_key: str, query: str, gl: str = "in", tbs: str = "qdr:w", num: int = 15, use_cache: bool = True, use_archive: bool = True) -> dict:
+    """Async variant of ``search_news`` sharing the same cache, archive and transport."""
+    if use_archive:
+        key = cache_key(build_payload(query, gl=gl, tbs=tbs, num=num)) if use_cache else None
+        cached = news_cache.get(key) if use_cache else None
+        if cached is not None:
+            return cached
+        window = delta_window(query, gl, tbs, num)
+        if window is not None:
+            data = await asearch_news(api_key, query, gl=gl, tbs=window, num=num, use_archive=False)
+            archive_fetch(query, gl, tbs, num, window, data)
+        return archived_news(query, gl, tbs, num, key)
+
+    payload = build_payload(query, gl=gl, tbs=tbs, num=num)
+    with tracer.span("serper.news", "search", query=query):
+        response = await serper_transport.apost(SERPER_NEWS_URL, headers=_headers(api_key), content=json.dumps(payload))
+        return _decode(response)
+
+
+def merge_batch(results: list) -> tuple:
+    """Merge per-query results into one deduplicated article list.
+
+    ``results`` holds ``(query, data_or_error)`` pairs in query order.
+    Returns ``(articles, errors)`` where ``errors`` maps query -> message.
+    """
+    # Interleave by rank so every query's top hits come before anyone's tail
+    ranked = []
+    errors = {}
+    for query, data in results:
+        if isinstance(data, SerperAPIError):
+            errors[query] = f"{data}: {data.details}"
+            continue
+        for rank, article in enumerate(data.get("news", [])):
+            ranked.append((rank, len(ranked), article))
+    ranked.sort(key=lambda item: (item[0], item[1]))
+    return dedupe_articles([article for _, _, article in ranked]), errors
+
+
+def search_news_batch(api_key: str, queries: list, max_workers: int = BATCH_MAX_WORKERS, **params) -> tuple:
+    """Run several queries concurrently on a thread pool and merge the results."""
+    def fetch(query):
+        try:
+            return query, search_news(api_key, query, **params)
+        except SerperAPIError as e:
+            return query, e
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(queries)))) as pool:
+        results = list(pool.map(fetch, queries))
+    return merge_batch(results)
+
+
+async def asearch_news_batch(api_key: str, queries: list, max_workers: int = BATCH_MAX_WORKERS, **params) -> tuple:
+    """Async variant of ``search_news_batch`` bounded by a semaphore."""
+    semaphore = asyncio.Semaphore(max(1, max_workers))
+
+    async def fetch(query):
+        async with semaphore:
+            try:
+                return query, await asearch_news(api_key, query, **params)
+            except SerperAPIError as e:
+                return query, e
+
+    results = await asyncio.gather(*(fetch(query) for query in queries))
+    return merge_batch(results)
+
+
+def batch_queries(query: str = None, queries: list = None) -> list:
+    """Combine the single and list query inputs, dropping repeats."""
+    seen = set()
+    combined = []
+    for q in ([query] if query else []) + list(queries or []):
+        normalized = " ".join(q.lower().split())
+        if normalized and normalized not in seen:
+            seen.add(normalized)
+            combined.append(q)
+    return combined
+
+
+def batch_response(articles: list, errors: dict, process) -> dict:
+    """Shape a merged batch into a ``SerperNewsResponse`` dict.
+
+    ``process`` is the tool's own post-processing step; it may return a
+    message dict instead of a list when nothing survives filtering.
+    """
+    if not articles and errors:
+        error_message = {"error": "All queries failed", "details": errors}
+        print(json.dumps(error_message, indent=2))
+        return error_message
+    processed = process({"news": articles})
+    if not isinstance(processed, list):
+        return processed
+    result = SerperNewsResponse(news=processed).model_dump()
+    # Validation drops keys outside the schema; keep the relevance filter's scores
+    for article, source in zip(result["news"], processed):
+        if "relevance" in source:
+            article["relevance"] = source["relevance"]
+    if errors:
+        result["errors"] = errors
+    return result
@@ -1,23 +1,47 @@
-import requests
 import json
 from crewai.tools import BaseTool
-from typing import Type
-from pydantic import BaseModel, Field, PrivateAttr
+from typing import List, Optional, Type
+from pydantic import BaseModel, Field, PrivateAttr, model_validator
 import os
 
+from ipm.tools.serper_client import (
+    SerperAPIError,
+    asearch_news,
+    asearch_news_batch,
+    batch_queries,
+    batch_response,
+    search_news,
+    search_news_batch,
+)
+
 class SerperNewsToolInput(BaseModel):
     """Input schema for Serper News Tool."""
-    query: str = Field(
+    query: Optional[str] = Field(
+        None,
         description="A brief or overview of the project"
     )
+    queries: Optional[List[str]] = Field(
+        None,
+        description="Several queries covering different angles of the project; they are searched concurrently and merged."
+    )
+
+    @model_validator(mode="after")
+    def check_query(self):
+        if not self.query and not self.queries:
+            raise ValueError("Either 'query' or 'queries' must be provided.")
+        return self
 
 class SerperNewsTool(BaseTool):
     name: str = "Serper News Extraction Tool"
     description: str = (
-        "Retrieves the most recent and relevant news articles related to the project description using the Serper API."
+        "Retrieves the most recent and relevant news articles related to the project description using the Serper API. "
+        "Pass several `queries` at once to search different angles of the project in one call."
     )
     args_schema: Type[BaseModel] = SerperNewsToolInput
     _api_key: str = PrivateAttr()  # Private attribute for the API key
+    _gl: str = PrivateAttr(default="in")  # Country code (India)
+    _tbs: str = PrivateAttr(default="qdr:w")  # Time range (last week)
+    _num: int = PrivateAttr(default=15)
 
     def __init__(self, api_key: str = None):
         """
@@ -29,34 +53,44 @@ class SerperNewsTool(BaseTool):
         if not self._api_key:
             raise ValueError("Serper API key is required. Set SERPER_API_KEY environment variable.")
 
-    def _run(self, query: str):
+    def _run(self, query: str = None, queries: List[str] = None):
         """Fetch news articles using the Serper API and return JSON data."""
-        gl = "in"   # Country code (India)
-        tbs = "qdr:w"  # Time range (last week)
-
-        url = "https://google.serper.dev/news"
-        payload = json.dumps({
-            "q": query,
-            "gl": gl,
-            "tbs": tbs,
-            "num": 15
-        })
-        headers = {
-            'X-API-KEY': self._api_key,
-            'Content-Type': 'application/json'
+        if queries:
+            articles, errors = search_news_batch(
+                self._api_key, batch_queries(query, queries), gl=self._gl, tbs=self._tbs, num=self._num
+            )
+            return batch_response(articles, errors, self._process)
+        try:
+            data = search_news(self._api_key, query, gl=self._gl, tbs=self._tbs, num=self._num)
+        except SerperAPIError as e:
+            return self._error(e)
+        return self._process(data)
+
+    async def _arun(self, query: str = None, queries: List[str] = None):
+        """Async counterpart of ``_run``; safe to gather across several queries."""
+        if queries:
+            articles, errors = await asearch_news_batch(
+                self._api_key, batch_queries(query, queries), gl=self._gl, tbs=self._tbs, num=self._num
+            )
+            return batch_response(articles, errors, self._process)
+        try:
+            data = await asearch_news(self._api_key, query, gl=self._gl, tbs=self._tbs, num=self._num)
+        except SerperAPIError as e:
+            return self._error(e)
+        return self._process(data)
+
+    @staticmethod
+    def _error(e: SerperAPIError) -> dict:
+        # Handle response errors
+        error_message = {
+            "error": str(e),
+            "details": e.details
         }
-        response = requests.post(url, headers=headers, data=payload)
+        print(json.dumps(error_message, indent=2))  # Print error in JSON format
+        return error_message
 
-        # Handle response errors
-        if response.status_code != 200:
-            error_message = {
-                "error": f"Received {response.status_code} from API",
-                "details": response.text
-            }
-            print(json.dumps(error_message, indent=2))  # Print error in JSON format
-            return error_message
-
-        data = response.json()
+    def _process(self, data: dict):
+        """Format, print and return the raw news articles."""
         news_articles = data.get("news", [])
 
         # Format and print news articles
@@ -0,0 +1,169 @@
+import asyncio
+import os
+import random
+import threading
+import time
+import weakref
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from ipm.rate_limit import rate_limiter
+from ipm.tracing import tracer
+
+# Statuses worth retrying: rate limiting and transient server-side failures
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class HttpTransport:
+    """Pooled HTTP client with timeouts and jittered exponential backoff.
+
+    One instance is meant to be shared by every tool talking to the same
+    service, so TCP/TLS connections are reused across calls. ``get`` and
+    ``post`` use a ``requests`` session; ``apost`` is the asyncio counterpart
+    built on httpx.
+    With a ``provider``, every attempt first waits for that provider's quota
+    in the shared ``rate_limiter``, and a 429 pauses the quota for everyone.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 10.0,
+        connect_timeout: float = 3.05,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        pool_size: int = 10,
+        provider: str = None,
+    ):
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.pool_size = pool_size
+        self.provider = provider
+        self.retries = 0  # Total retries performed, for diagnostics
+        self._session = None
+        self._async_clients = weakref.WeakKeyDictionary()  # event loop -> httpx.AsyncClient
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        with self._lock:
+            if self._session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._session = session
+            return self._session
+
+    def _async_client(self) -> httpx.AsyncClient:
+        # httpx clients are bound to the loop they were first used on
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+            )
+            self._async_clients[loop] = client
+        return client
+
+    def backoff(self, attempt: int, retry_after: str = None) -> float:
+        """Seconds to wait before retry number ``attempt`` (0-based)."""
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass  # HTTP-date form; fall back to exponential backoff
+        # "Full jitter": spreads retries from concurrent callers apart
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _throttled(self, status: int, attempt: int, retry_after: str = None) -> bool:
+        """On a 429, pause the provider's shared quota; the next acquire does the waiting."""
+        if status != 429 or self.provider not in rate_limiter.buckets:
+            return False
+        # No jitter: the pause is shared and the limiter spaces callers out afterwards
+        seconds = self.backoff(attempt, retry_after) if retry_after else min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        rate_limiter.penalize(self.provider, seconds)
+        return True
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Request with retries; returns the last response once retries are exhausted."""
+        kwargs.setdefault("timeout", (self.connect_timeout, self.timeout))
+        with tracer.span(_span_name(method, url), "http", request_bytes=_body_size(kwargs)) as span:
+            for attempt in range(self.max_retries + 1):
+                span["retries"] = attempt
+                rate_limiter.acquire(self.provider)
+                try:
+                    response = self.session.request(method, url, **kwargs)
+                except (requests.ConnectionError, requests.Timeout):
+                    if attempt == self.max_retries:
+                        raise
+                    self.retries += 1
+                    time.sleep(self.backoff(attempt))
+                    continue
+                span.update(status=response.status_code, response_bytes=len(response.content))
+                if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    return response
+                self.retries += 1
+                if not self._throttled(response.status_code, attempt, response.headers.get("Retry-After")):
+                    time.sleep(self.backoff(attempt, response.headers.get("Retry-After")))
+            return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    async def apost(self, url: str, **kwargs) -> httpx.Response:
+        """Async POST with the same retry policy as ``post``."""
+        client = self._async_client()
+        with tracer.span(_span_name("POST", url), "http", request_bytes=_body_size(kwargs)) as span:
+            for attempt in range(self.max_retries + 1):
+                span["retries"] = attempt
+                await rate_limiter.aacquire(self.provider)
+                try:
+                    response = await client.post(url, **kwargs)
+                except (httpx.ConnectError, httpx.TimeoutException):
+                    if attempt == self.max_retries:
+                        raise
+                    self.retries += 1
+                    await asyncio.sleep(self.backoff(attempt))
+                    continue
+                span.update(status=response.status_code, response_bytes=len(response.content))
+                if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    return response
+                self.retries += 1
+                if not self._throttled(response.status_code, attempt, response.headers.get("Retry-After")):
+                    await asyncio.sleep(self.backoff(attempt, response.headers.get("Retry-After")))
+            return response
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+def _span_name(method: str, url: str) -> str:
+    parts = urlsplit(url)
+    return f"{method} {parts.netloc}{parts.path}"
+
+
+def _body_size(kwargs: dict) -> int:
+    body = kwargs.get("data") or kwargs.get("content") or b""
+    return len(body.encode("utf-8") if isinstance(body, str) else body)
+
+
+# Shared transport for the Serper API
+serper_transport = HttpTransport(
+    timeout=float(os.getenv("SERPER_TIMEOUT", "10")),
+    max_retries=int(os.getenv("SERPER_MAX_RETRIES", "3")),
+    provider="serper",
+)
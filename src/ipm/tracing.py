@@ -0,0 +1,270 @@
+import atexit
+import functools
+import glob
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+
+def _now_us() -> int:
+    return time.time_ns() // 1000
+
+
+class Tracer:
+    """Collects timed spans (tasks, tools, LLM and embedding calls, HTTP requests).
+
+    Disabled by default; while disabled ``span`` hands out a scratch dict and
+    records nothing, so instrumented code pays almost nothing. Spans are
+    exported as JSON lines or in Chrome's trace-event format, which loads in
+    ``chrome://tracing`` and Perfetto.
+
+    Pool workers never run ``atexit``; they call ``flush_worker`` after each
+    task instead, and the parent merges their spans into its trace at exit.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.path = None
+        self._spans: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._open: Dict[Any, tuple] = {}  # event-bus key -> (start_us, args)
+        self._listeners_installed = False
+
+    def enable(self, path: str = None):
+        """Start recording; when ``path`` is given the trace is written there at exit."""
+        self.enabled = True
+        if path and not self.path:
+            atexit.register(self._finish, path)
+        self.path = path or self.path
+        self._install_listeners()
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+            self._open.clear()
+
+    @contextmanager
+    def span(self, name: str, category: str, **args):
+        """Time the enclosed block; callers may add attributes to the yielded dict."""
+        if not self.enabled:
+            yield args
+            return
+        start = _now_us()
+        try:
+            yield args
+        except BaseException as e:
+            args["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self.record(name, category, start, _now_us() - start, **args)
+
+    def record(self, name: str, category: str, start_us: int, duration_us: int, thread: Optional[int] = None, **args):
+        """Add a finished span, e.g. one timed by another library."""
+        if not self.enabled:
+            return
+        span = {
+            "name": name,
+            "cat": category,
+            "ts": start_us,
+            "dur": max(0, duration_us),
+            "pid": os.getpid(),
+            "tid": thread or threading.get_ident(),
+            "args": args,
+        }
+        with self._lock:
+            self._spans.append(span)
+
+    def begin(self, key, **args):
+        """Open a span that ``end`` closes, for start/finish event pairs."""
+        if self.enabled:
+            with self._lock:
+                self._open[key] = (_now_us(), args)
+
+    def end(self, key, name: str, category: str, **args):
+        with self._lock:
+            opened = self._open.pop(key, None)
+        if opened is not None:
+            start, begin_args = opened
+            self.record(name, category, start, _now_us() - start, **{**begin_args, **args})
+
+    @property
+    def spans(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._spans)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Count, total and max milliseconds and token totals per (category, name)."""
+        groups = defaultdict(lambda: {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "tokens": 0})
+        for span in self.spans:
+            group = groups[(span["cat"], span["name"])]
+            group["count"] += 1
+            group["total_ms"] += span["dur"] / 1000
+            group["max_ms"] = max(group["max_ms"], span["dur"] / 1000)
+            group["tokens"] += span["args"].get("total_tokens") or 0
+        rows = [{"category": cat, "name": name, **values} for (cat, name), values in groups.items()]
+        return sorted(rows, key=lambda row: -row["total_ms"])
+
+    def export(self, path: str):
+        """Write the trace; ``.json`` gives Chrome trace format, anything else JSON lines."""
+        spans = self.spans
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            if path.endswith(".json"):
+                events = [{**span, "ph": "X"} for span in spans]
+                json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, default=str)
+            else:
+                for span in spans:
+                    f.write(json.dumps(span, default=str) + "\n")
+
+    def _part_path(self, parent_pid: int, pid: int) -> str:
+        return f"{self.path}.{parent_pid}.{pid}.part"
+
+    def flush_worker(self):
+        """Hand this worker process's spans to the parent, through a part file next to the trace."""
+        if not self.enabled or not self.path:
+            return
+        with self._lock:
+            spans, self._spans = self._spans, []
+        if spans:
+            with open(self._part_path(os.getppid(), os.getpid()), "a", encoding="utf-8") as f:
+                for span in spans:
+                    f.write(json.dumps(span, default=str) + "\n")
+
+    def merge_workers(self):
+        """Add the spans flushed by this process's workers, and remove their part files."""
+        if not self.path:
+            return
+        for part in glob.glob(glob.escape(self.path) + f".{os.getpid()}.*.part"):
+            with open(part, "r", encoding="utf-8") as f:
+                spans = [json.loads(line) for line in f if line.strip()]
+            with self._lock:
+                self._spans.extend(spans)
+            os.remove(part)
+
+    def _finish(self, path: str):
+        self.merge_workers()
+        self.export(path)
+        print(f"Trace written to {path}. Slowest span groups:", file=sys.stderr)
+        for row in self.summary()[:10]:
+            tokens = f", {row['tokens']} tokens" if row["tokens"] else ""
+            print(f"  {row['category']:<10} {row['name'][:40]:<40} {row['count']:>5}x {row['total_ms']:>10.1f} ms{tokens}", file=sys.stderr)
+
+    def _install_listeners(self):
+        if self._listeners_installed:
+            return
+        self._listeners_installed = True
+        _install_crewai_listeners(self)
+        _install_litellm_callback(self)
+
+
+def _install_crewai_listeners(tracer: Tracer):
+    from crewai.utilities.events import crewai_event_bus
+    from crewai.utilities.events.agent_events import AgentExecutionCompletedEvent, AgentExecutionErrorEvent, AgentExecutionStartedEvent
+    from crewai.utilities.events.crew_events import CrewKickoffCompletedEvent, CrewKickoffFailedEvent, CrewKickoffStartedEvent
+    from crewai.utilities.events.task_events import TaskCompletedEvent, TaskFailedEvent, TaskStartedEvent
+    from crewai.utilities.events.tool_usage_events import ToolUsageErrorEvent, ToolUsageFinishedEvent
+
+    # Every handler runs in the emitting thread, so ids of the sources pair start and finish
+    @crewai_event_bus.on(CrewKickoffStartedEvent)
+    def _crew_started(source, event):
+        tracer.begin(("crew", id(source)), crew=event.crew_name)
+
+    @crewai_event_bus.on(CrewKickoffCompletedEvent)
+    def _crew_completed(source, event):
+        tracer.end(("crew", id(source)), "kickoff", "crew")
+
+    @crewai_event_bus.on(CrewKickoffFailedEvent)
+    def _crew_failed(source, event):
+        tracer.end(("crew", id(source)), "kickoff", "crew", error=event.error)
+
+    @crewai_event_bus.on(TaskStartedEvent)
+    def _task_started(source, event):
+        tracer.begin(("task", id(source)), agent=getattr(source.agent, "role", None))
+
+    @crewai_event_bus.on(TaskCompletedEvent)
+    def _task_completed(source, event):
+        tracer.end(("task", id(source)), source.name or source.description[:40], "task", output_chars=len(event.output.raw or ""))
+
+    @crewai_event_bus.on(TaskFailedEvent)
+    def _task_failed(source, event):
+        tracer.end(("task", id(source)), source.name or source.description[:40], "task", error=event.error)
+
+    @crewai_event_bus.on(AgentExecutionStartedEvent)
+    def _agent_started(source, event):
+        tracer.begin(("agent", id(source), threading.get_ident()))
+
+    @crewai_event_bus.on(AgentExecutionCompletedEvent)
+    def _agent_completed(source, event):
+        tracer.end(("agent", id(source), threading.get_ident()), source.role, "agent")
+
+    @crewai_event_bus.on(AgentExecutionErrorEvent)
+    def _agent_failed(source, event):
+        tracer.end(("agent", id(source), threading.get_ident()), source.role, "agent", error=event.error)
+
+    @crewai_event_bus.on(ToolUsageFinishedEvent)
+    def _tool_finished(source, event):
+        start = int(event.started_at.timestamp() * 1e6)
+        tracer.record(
+            event.tool_name, "tool", start, int(event.finished_at.timestamp() * 1e6) - start,
+            agent=event.agent_role, from_cache=event.from_cache, attempts=event.run_attempts,
+            args_chars=len(json.dumps(event.tool_args, default=str)),
+        )
+
+    @crewai_event_bus.on(ToolUsageErrorEvent)
+    def _tool_failed(source, event):
+        tracer.record(event.tool_name, "tool", _now_us(), 0, agent=event.agent_role, error=str(event.error))
+
+
+def _install_litellm_callback(tracer: Tracer):
+    import litellm
+
+    def _llm_call(kwargs, response, start_time, end_time):
+        # Streamed calls report the reassembled response separately
+        response = kwargs.get("complete_streaming_response") or response
+        usage = getattr(response, "usage", None)
+        start = int(start_time.timestamp() * 1e6)
+        tracer.record(
+            kwargs.get("model") or "llm", "llm", start, int(end_time.timestamp() * 1e6) - start,
+            prompt_tokens=getattr(usage, "prompt_tokens", None),
+            completion_tokens=getattr(usage, "completion_tokens", None),
+            total_tokens=getattr(usage, "total_tokens", None),
+            cache_hit=kwargs.get("cache_hit"),
+            stream=bool(kwargs.get("stream")),
+        )
+
+    def _llm_failure(kwargs, response, start_time, end_time):
+        start = int(start_time.timestamp() * 1e6)
+        tracer.record(
+            kwargs.get("model") or "llm", "llm", start, int(end_time.timestamp() * 1e6) - start,
+            error=str(kwargs.get("exception")),
+        )
+
+    litellm.success_callback.append(_llm_call)
+    litellm.failure_callback.append(_llm_failure)
+
+
+# Shared tracer; IPM_TRACE=<path> turns it on and writes the trace there at exit
+tracer = Tracer()
+
+
+def flushes_spans(fn):
+    """Decorate a process-pool task so the spans it records reach the parent's trace."""
+    @functools.wraps(fn)
+    def task(*args, **kwargs):
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            tracer.flush_worker()
+    return task
+if os.getenv("IPM_TRACE"):
+    tracer.enable(os.getenv("IPM_TRACE"))
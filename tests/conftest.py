@@ -0,0 +1,5 @@
+import os
+
+# crewAI reports usage unless told not to; tests run offline
+os.environ["CREWAI_DISABLE_TELEMETRY"] = "true"
+os.environ["OTEL_SDK_DISABLED"] = "true"
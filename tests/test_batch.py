@@ -0,0 +1,65 @@
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from ipm import batch, rate_limit
+
+
+class _Usage:
+    def __init__(self, total: int):
+        self.total = total
+
+    def model_dump(self) -> dict:
+        return {"total_tokens": self.total}
+
+
+class _Crew:
+    """Crew stand-in for one document; fails on documents named ``broken``."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def kickoff(self, inputs: dict):
+        if "broken" in self.path:
+            raise RuntimeError("model refused the document")
+        return SimpleNamespace(raw=f"report on {os.path.basename(inputs['file_path'])} for {inputs['topic']}", token_usage=_Usage(len(self.path)))
+
+
+@pytest.fixture
+def documents(tmp_path, monkeypatch):
+    # Pool workers are forked, so they inherit these patches
+    monkeypatch.setattr(batch, "_crew_for", lambda path, output_dir: _Crew(path))
+    monkeypatch.setattr(rate_limit, "CACHE_DIR", str(tmp_path / "cache"))
+    root = tmp_path / "knowledge"
+    (root / "q1").mkdir(parents=True)
+    paths = []
+    for name in ("q1/cement.pdf", "steel.pdf", "broken.pdf", "q1/roads.md"):
+        (root / name).write_text(name)
+        paths.append(str(root / name))
+    return str(root), paths
+
+
+def test_summary_records_every_document_in_order(tmp_path, documents):
+    root, paths = documents
+    output_root = str(tmp_path / "batch")
+    summary = batch.run_batch(paths, root, output_root, inputs={"topic": "capex"}, workers=2)
+
+    with open(os.path.join(output_root, "summary.json"), encoding="utf-8") as f:
+        assert json.load(f) == summary
+    assert {key: summary[key] for key in ("documents", "succeeded", "failed", "workers")} == {"documents": 4, "succeeded": 3, "failed": 1, "workers": 2}
+    # Results follow the order the documents were given in, not completion order
+    assert [record["document"] for record in summary["results"]] == paths
+    slugs = [os.path.basename(record["output_dir"]) for record in summary["results"]]
+    assert slugs == ["q1__cement", "steel", "broken", "q1__roads"]
+
+    ok, failed = summary["results"][0], summary["results"][2]
+    assert ok["status"] == "ok"
+    assert ok["token_usage"] == {"total_tokens": len(paths[0])}
+    with open(os.path.join(ok["output_dir"], "result.md"), encoding="utf-8") as f:
+        assert f.read() == "report on cement.pdf for capex"
+    assert failed["status"] == "error"
+    assert failed["error"] == "RuntimeError: model refused the document"
+    assert not os.path.exists(os.path.join(failed["output_dir"], "result.md"))
+    assert all(record["seconds"] >= 0 for record in summary["results"])
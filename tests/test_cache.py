@@ -0,0 +1,23 @@
+import sqlite3
+
+from ipm.tools import cache
+from ipm.tools.cache import SQLiteCache
+
+
+def test_locked_database_is_a_miss_not_an_error(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "SQLITE_BUSY_TIMEOUT_MS", 50)
+    path = str(tmp_path / "cache.sqlite")
+    store = SQLiteCache(path)
+    store.set("kept", "value", ttl=60)
+
+    # Another process holds the write lock for longer than the busy timeout
+    other = sqlite3.connect(path)
+    other.execute("BEGIN EXCLUSIVE")
+    store.set("dropped", "value", ttl=60)
+    assert store.get("kept") == "value"  # WAL: reads go on while another process writes
+    other.rollback()
+    other.close()
+
+    assert store.get("dropped") is None
+    store.set("dropped", "value", ttl=60)
+    assert store.get("dropped") == "value"
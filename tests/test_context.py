@@ -0,0 +1,33 @@
+from ipm.context import MIN_TEXT_CHARS, fit_budget, render_context
+
+
+def _articles(count: int) -> list:
+    return [{"title": f"Cement demand update {n}", "link": f"https://news.example.com/{n}"} for n in range(count)]
+
+
+def _sections(description_sentences: int, articles: int) -> list:
+    description = "The project builds a four-lane ring road around the city. " * description_sentences
+    return [
+        ["document_query_task", {"project_name": "Ring Road", "project_description": description}],
+        ["market_analysis_task", {"news": _articles(articles)}],
+    ]
+
+
+def test_long_text_is_cut_before_list_items():
+    sections = _sections(100, 15)
+    budget = len(render_context(_sections(10, 15)))
+    fit_budget(sections, budget)
+    assert len(render_context(sections)) <= budget
+    assert sections[1][1]["news"] == _articles(15)
+    assert MIN_TEXT_CHARS <= len(sections[0][1]["project_description"]) < 1000
+
+
+def test_lists_shrink_in_proportion():
+    sections = _sections(1, 15)
+    sections[0][1]["risks"] = [f"Land acquisition delay {n}" for n in range(6)]
+    budget = len(render_context(sections)) // 2
+    fit_budget(sections, budget)
+    assert len(render_context(sections)) <= budget
+    news, risks = len(sections[1][1]["news"]), len(sections[0][1]["risks"])
+    assert 1 < news < 15 and 1 < risks < 6
+    assert abs(news / 15 - risks / 6) < 0.25
@@ -0,0 +1,101 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import replay
+from ipm.tools import fin
+from ipm.tools.cache import TTLCache
+from ipm.tools.price_store import PriceStore
+
+MISSING = "NOSUCH.NS"
+
+
+def _download(tickers, **kwargs):
+    """``replay.fake_download``, with the all-NaN columns Yahoo returns for an unknown symbol."""
+    tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+    known = [symbol for symbol in tickers if symbol != MISSING]
+    frame = replay.fake_download(known, **kwargs) if known else pd.DataFrame(columns=pd.MultiIndex.from_tuples([], names=["Ticker", "Price"]))
+    if MISSING in tickers:
+        for field in ("Open", "High", "Low", "Close", "Volume"):
+            frame[(MISSING, field)] = np.nan
+    return frame
+
+
+class _Ticker(replay.FakeTicker):
+    def __init__(self, symbol: str):
+        if symbol == MISSING:
+            raise ValueError(f"{symbol}: No data found, symbol may be delisted")
+        super().__init__(symbol)
+
+
+@pytest.fixture
+def downloads(tmp_path, monkeypatch):
+    """Patches yfinance and the stores; collects the tickers of each bulk download."""
+    downloads = []
+
+    def download(tickers, **kwargs):
+        downloads.append(list(tickers))
+        return _download(tickers, **kwargs)
+
+    monkeypatch.setattr(fin.yf, "download", download)
+    monkeypatch.setattr(fin.yf, "Ticker", _Ticker)
+    monkeypatch.setattr(fin, "price_store", PriceStore(root=str(tmp_path)))
+    monkeypatch.setattr(fin, "stock_cache", TTLCache(maxsize=64))
+    return downloads
+
+
+@pytest.fixture
+def tool(downloads):
+    return fin.FetchStockDataTool()
+
+
+def _batch(tool, tickers, data_type, **kwargs):
+    return json.loads(tool._run(tickers=tickers, data_type=data_type, format="json", **kwargs))
+
+
+def test_current_prices_per_ticker(tool, downloads):
+    closes = replay.FakeTicker("RELIANCE.NS").history(period="5d")["Close"]
+    result = _batch(tool, ["reliance.ns", "TCS.NS", "RELIANCE.NS"], "current")
+    # Normalised and deduplicated, fetched with one download
+    assert downloads == [["RELIANCE.NS", "TCS.NS"]]
+    assert result["data"] == {symbol: {"current_price": round(float(closes.iloc[-1]), 2)} for symbol in ("RELIANCE.NS", "TCS.NS")}
+    assert result["errors"] == {}
+
+
+def test_historical_reuses_stored_ranges(tool, downloads):
+    expected = replay.FakeTicker("TCS.NS").history(start="2024-01-01", end="2024-03-01")
+    result = _batch(tool, ["RELIANCE.NS", "TCS.NS"], "historical", start_date="2024-01-01", end_date="2024-03-01", summary=False)
+    for symbol in ("RELIANCE.NS", "TCS.NS"):
+        bars = result["data"][symbol]["historical_data"]
+        assert bars["date"] == expected.index.strftime("%Y-%m-%d").tolist()
+        assert bars["close"] == pytest.approx(expected["Close"].tolist(), abs=0.01)
+    # Both ranges are stored now; asking again downloads nothing
+    again = _batch(tool, ["RELIANCE.NS", "TCS.NS"], "historical", start_date="2024-01-01", end_date="2024-03-01", summary=False)
+    assert downloads == [["RELIANCE.NS", "TCS.NS"]]
+    assert again == result
+
+
+@pytest.mark.parametrize("data_type", ["current", "historical"])
+def test_missing_ticker_is_reported_inline(tool, data_type):
+    dates = {"start_date": "2024-01-01", "end_date": "2024-03-01"} if data_type == "historical" else {}
+    result = _batch(tool, ["RELIANCE.NS", MISSING, "TCS.NS"], data_type, **dates)
+    assert set(result["data"]) == {"RELIANCE.NS", "TCS.NS"}
+    assert result["errors"] == {MISSING: f"No price data returned for {MISSING}."}
+
+    text = tool._run(tickers=["RELIANCE.NS", MISSING], data_type=data_type, **dates)
+    assert text.splitlines()[-1] == f"{MISSING}: error: No price data returned for {MISSING}."
+
+
+def test_invalid_ticker_in_per_ticker_lookup(tool):
+    result = _batch(tool, ["RELIANCE.NS", MISSING], "dividends")
+    assert set(result["data"]) == {"RELIANCE.NS"}
+    assert result["data"]["RELIANCE.NS"]["dividends"] == {"2023-08-21": 9.0, "2024-08-19": 10.0}
+    assert "No data found" in result["errors"][MISSING]
+
+
+def test_unknown_interval_is_rejected(tool, downloads):
+    result = tool._run(tickers=["RELIANCE.NS"], data_type="historical", start_date="2024-01-01", end_date="2024-03-01", interval="hourly")
+    assert result.startswith("Invalid interval 'hourly'")
+    assert downloads == []
@@ -0,0 +1,88 @@
+import zipfile
+
+import pytest
+
+from ipm import ingest
+
+
+def _pdf(path, pages):
+    """Minimal PDF with one line of Helvetica text per page."""
+    count = len(pages)
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{' '.join(f'{4 + 2 * i} 0 R' for i in range(count))}] /Count {count} >>",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, text in enumerate(pages):
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>")
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    body, offsets = "%PDF-1.4\n", []
+    for number, content in enumerate(objects, start=1):
+        offsets.append(len(body))
+        body += f"{number} 0 obj\n{content}\nendobj\n"
+    xref = len(body)
+    body += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n" + "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    body += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    path.write_bytes(body.encode("latin-1"))
+    return str(path)
+
+
+def _docx(path, pages):
+    """docx whose pages are separated by explicit page breaks."""
+    w = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+    breaks = '<w:p><w:r><w:br w:type="page"/></w:r></w:p>'
+    body = breaks.join(f"<w:p><w:r><w:t>{text}</w:t></w:r></w:p>" for text in pages)
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("word/document.xml", f'<w:document xmlns:w="{w}"><w:body>{body}</w:body></w:document>')
+    return str(path)
+
+
+@pytest.fixture
+def corpus(tmp_path, monkeypatch):
+    # Small units, so even these documents span several of them
+    monkeypatch.setattr(ingest, "PAGES_PER_UNIT", 3)
+    report = _pdf(tmp_path / "a_report.pdf", [f"Report page {n}" for n in range(1, 11)])
+    memo = _docx(tmp_path / "b_memo.docx", ["Memo page 1", "Memo page 2"])
+    notes = tmp_path / "c_notes.txt"
+    notes.write_text("".join(f"note {n}\n" for n in range(150)))
+    appendix = _pdf(tmp_path / "d_appendix.pdf", [f"Appendix page {n}" for n in range(1, 5)])
+    return [report, memo, str(notes), appendix]
+
+
+def _numbers(pages):
+    return [(path.rsplit("/", 1)[-1], number) for path, number, _ in pages]
+
+
+def test_pages_stream_in_document_order(corpus):
+    pages = list(ingest.iter_pages(corpus, max_workers=2))
+    assert _numbers(pages) == (
+        [("a_report.pdf", n) for n in range(1, 11)]
+        + [("b_memo.docx", 1), ("b_memo.docx", 2)]
+        + [("c_notes.txt", n) for n in range(1, 4)]
+        + [("d_appendix.pdf", n) for n in range(1, 5)]
+    )
+    texts = {(path.rsplit("/", 1)[-1], number): text for path, number, text in pages}
+    assert texts[("a_report.pdf", 7)].strip() == "Report page 7"
+    assert texts[("b_memo.docx", 2)].strip() == "Memo page 2"
+    assert texts[("c_notes.txt", 3)] == "".join(f"note {n}\n" for n in range(120, 150))
+    # The pool produces exactly what in-process extraction does
+    assert pages == list(ingest.iter_pages(corpus, max_workers=1))
+
+
+def test_extraction_is_bounded_by_the_window(corpus, monkeypatch):
+    produced = []
+    units = ingest._work_units
+
+    def counted(paths):
+        for unit in units(paths):
+            produced.append(unit)
+            yield unit
+
+    monkeypatch.setattr(ingest, "_work_units", counted)
+    pages = ingest.iter_pages(corpus, max_workers=2)
+    next(pages)
+    # The first page is out after at most 2 * max_workers units were submitted
+    assert len(produced) <= 2 * 2
+    assert len(list(pages)) == 18
+    assert len(produced) == 4 + 1 + 1 + 2  # report, memo, notes, appendix
@@ -0,0 +1,60 @@
+from concurrent.futures import Future
+
+from crewai import Agent, Crew, Task
+from crewai.llm import LLM
+
+from ipm.iterations import _merge_test_results, _merge_training_data, _results
+
+
+def _done(result: dict) -> Future:
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+def _agent(role: str) -> Agent:
+    return Agent(role=role, goal="Answer", backstory="Test agent", llm=LLM(model="gemini/gemini-2.0-flash"))
+
+
+def _feedback(iteration: int) -> dict:
+    return {"initial_output": f"draft {iteration}", "human_feedback": "shorter", "improved_output": f"final {iteration}"}
+
+
+def test_results_are_ordered_by_iteration():
+    futures = [_done({"iteration": 2}), _done({"iteration": 0}), _done({"iteration": 1})]
+    assert [result["iteration"] for result in _results(futures)] == [0, 1, 2]
+
+
+def test_training_data_is_merged_per_agent_in_iteration_order():
+    analyst, editor, idle = _agent("Analyst"), _agent("Editor"), _agent("Reviewer")
+    # What each worker reported, keyed by role since agent ids differ between processes
+    results = [
+        {"iteration": 0, "data": {"Analyst": {0: _feedback(0)}, "Editor": {0: _feedback(0)}}},
+        {"iteration": 1, "data": {"Analyst": {1: _feedback(1)}}},
+        {"iteration": 2, "data": {"Analyst": {2: _feedback(2)}, "Editor": {2: _feedback(2)}}},
+    ]
+    merged = _merge_training_data([analyst, editor, idle], list(reversed(results)))
+    assert merged == {
+        str(analyst.id): {0: _feedback(0), 1: _feedback(1), 2: _feedback(2)},
+        str(editor.id): {0: _feedback(0), 2: _feedback(2)},
+    }
+    assert list(merged[str(analyst.id)]) == [0, 1, 2]
+
+
+def test_test_scores_are_merged_by_iteration():
+    analyst, editor = _agent("Analyst"), _agent("Editor")
+    tasks = [
+        Task(description="Collect news.", expected_output="News.", agent=analyst),
+        Task(description="Write the report.", expected_output="Report.", agent=editor),
+    ]
+    crew = Crew(agents=[analyst, editor], tasks=tasks)
+    results = [
+        {"iteration": 1, "scores": [8.0, 7.0], "execution_times": [12, 30], "agents": [["Analyst"], ["Editor"]]},
+        {"iteration": 2, "scores": [9.0, 6.5], "execution_times": [10, 28], "agents": [["Analyst"], ["Analyst", "Editor"]]},
+    ]
+    evaluator = _merge_test_results(crew, "gemini/gemini-2.0-flash", results)
+    assert dict(evaluator.tasks_scores) == {1: [8.0, 7.0], 2: [9.0, 6.5]}
+    assert dict(evaluator.run_execution_times) == {1: [12, 30], 2: [10, 28]}
+    assert [sorted(task.processed_by_agents) for task in crew.tasks] == [["Analyst"], ["Analyst", "Editor"]]
+    # The merged evaluator renders crewAI's score table
+    evaluator.print_crew_evaluation_result()
@@ -0,0 +1,55 @@
+import sqlite3
+
+from ipm.tools import cache
+from ipm.tools.news_archive import NewsArchive, query_key
+
+
+def _article(n: int, title: str) -> dict:
+    return {"title": title, "link": f"https://news.example.com/{n}", "snippet": "", "date": "1 hour ago", "source": "Example"}
+
+
+def test_query_hits_keep_serper_order(tmp_path):
+    archive = NewsArchive(path=str(tmp_path / "news.sqlite"))
+    query = query_key("cement demand", "in")
+    # Serper ranks the article that barely mentions the terms first
+    serper = [
+        _article(1, "Infrastructure spending lifts cement"),
+        _article(2, "Cement demand: cement makers see cement demand soar"),
+        _article(3, "Steel and cement demand outlook"),
+    ]
+    archive.add(serper, query=query)
+    archive.add([_article(4, "Cement demand cement demand")])  # a full-text match from elsewhere
+
+    links = [article["link"] for article in archive.search("cement demand", query=query)]
+    assert links == [article["link"] for article in serper] + ["https://news.example.com/4"]
+
+
+def test_oldest_articles_beyond_the_size_bound_are_dropped(tmp_path):
+    archive = NewsArchive(path=str(tmp_path / "news.sqlite"), maxsize=2)
+    archive.add([dict(_article(n, f"Cement demand {n}"), date=f"{n + 1} days ago") for n in range(3)])
+    links = [article["link"] for article in archive.search("cement demand")]
+    assert links == ["https://news.example.com/0", "https://news.example.com/1"]
+    assert archive.stats()["articles"] == 2
+
+
+def test_archives_sharing_a_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "news.sqlite")
+    first, second = NewsArchive(path=path), NewsArchive(path=path)
+    assert first.add([_article(1, "Cement demand"), _article(2, "Steel prices")]) == 2
+    # The same article arriving through another process is stored once
+    assert second.add([_article(2, "Steel prices"), _article(3, "Rail orders")]) == 1
+    assert first.stats()["articles"] == 3
+
+    # A writer holding the database past the busy timeout costs the write, not the search
+    monkeypatch.setattr(cache, "SQLITE_BUSY_TIMEOUT_MS", 50)
+    locked = NewsArchive(path=path)
+    locked.search("cement")
+    writer = sqlite3.connect(path)
+    writer.execute("BEGIN EXCLUSIVE")
+    try:
+        assert locked.add([_article(4, "Cement exports")], query=query_key("cement", "in")) == 0
+    finally:
+        writer.rollback()
+        writer.close()
+    assert [article["link"] for article in locked.search("cement")] == ["https://news.example.com/1"]
+    assert locked.last_fetch(query_key("cement", "in")) is None
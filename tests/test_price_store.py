@@ -0,0 +1,35 @@
+import pandas as pd
+
+from ipm.tools.price_store import PriceStore
+
+
+def _bars(start: str, end: str) -> pd.DataFrame:
+    index = pd.bdate_range(start, end, inclusive="left", name="Date")
+    return pd.DataFrame({"Open": 1.0, "High": 2.0, "Low": 0.5, "Close": 1.5, "Volume": 100.0}, index=index)
+
+
+def test_empty_fetch_is_fetched_again(tmp_path):
+    store = PriceStore(root=str(tmp_path))
+    calls = []
+
+    def failing(start, end):
+        calls.append((start, end))
+        return pd.DataFrame()  # what yfinance returns when the request fails
+
+    assert store.history("TEST", "2024-01-01", "2024-02-01", failing).empty
+    assert store.missing_ranges("TEST", "2024-01-01", "2024-02-01") == [(pd.Timestamp("2024-01-01").date(), pd.Timestamp("2024-02-01").date())]
+
+    def working(start, end):
+        calls.append((start, end))
+        return _bars(start, end)
+
+    frame = store.history("TEST", "2024-01-01", "2024-02-01", working)
+    assert calls == [("2024-01-01", "2024-02-01")] * 2
+    assert len(frame) == len(_bars("2024-01-01", "2024-02-01"))
+
+
+def test_coverage_is_limited_to_returned_bars(tmp_path):
+    store = PriceStore(root=str(tmp_path))
+    # Only the first half of the month came back
+    store.put("TEST", _bars("2024-01-01", "2024-01-16"), "2024-01-01", "2024-02-01")
+    assert store.missing_ranges("TEST", "2024-01-01", "2024-02-01") == [(pd.Timestamp("2024-01-16").date(), pd.Timestamp("2024-02-01").date())]
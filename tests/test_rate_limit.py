@@ -0,0 +1,84 @@
+import multiprocessing
+
+import pytest
+
+from ipm.rate_limit import RateLimiter, SharedTokenBucket, TokenBucket, fcntl, parse_quota
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(TokenBucket, "_clock", staticmethod(clock))
+    return clock
+
+
+def test_parse_quota():
+    assert parse_quota("15/m") == (0.25, 15.0)
+    assert parse_quota("100/10s") == (10.0, 100.0)
+    with pytest.raises(ValueError):
+        parse_quota("fifteen a minute")
+
+
+def test_bucket_refills_at_its_rate(clock):
+    bucket = TokenBucket(rate=2.0, capacity=4)
+    assert [bucket.try_take(1) for _ in range(4)] == [0.0] * 4
+    assert bucket.try_take(1) == pytest.approx(0.5)
+
+    clock.now += 0.5
+    assert bucket.try_take(1) == 0.0
+    # An idle bucket fills up to its capacity, no further
+    clock.now += 60
+    assert [bucket.try_take(1) for _ in range(5)][-1] == pytest.approx(0.5)
+
+
+def test_pause_withholds_tokens(clock):
+    bucket = TokenBucket(rate=1.0, capacity=10)
+    bucket.pause(3)
+    assert bucket.try_take(1) == pytest.approx(4.0)
+    clock.now += 4
+    assert bucket.try_take(1) == 0.0
+
+
+def _drain(path: str, attempts: int, taken):
+    bucket = SharedTokenBucket(rate=0.001, capacity=5, path=path)
+    count = sum(1 for _ in range(attempts) if bucket.try_take(1) <= 0)
+    with taken.get_lock():
+        taken.value += count
+
+
+@pytest.mark.skipif(fcntl is None, reason="pooled buckets need fcntl")
+def test_shared_bucket_is_drawn_from_by_every_process(tmp_path):
+    path = str(tmp_path / "rate_limits" / "serper")
+    context = multiprocessing.get_context("fork")
+    taken = context.Value("i", 0)
+    workers = [context.Process(target=_drain, args=(path, 20, taken)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=30)
+        assert worker.exitcode == 0
+    # Four processes share one burst of 5, not 5 each
+    assert taken.value == 5
+
+    # A pause recorded by one process holds for the others
+    SharedTokenBucket(rate=1.0, capacity=5, path=str(tmp_path / "gemini")).pause(30)
+    assert SharedTokenBucket(rate=1.0, capacity=5, path=str(tmp_path / "gemini")).try_take(1) > 25
+
+
+def test_limiter_skips_providers_without_quota():
+    limiter = RateLimiter({"serper": "1000/s", "exa": "off"})
+    assert set(limiter.buckets) == {"serper"}
+    assert limiter.acquire("exa") == 0.0
+    assert limiter.acquire("serper") < 0.1
+
+    # The quota reported at startup
+    assert RateLimiter({"gemini": "15/m"}).describe("gemini") == "15 requests/min, burst 15"
+    assert limiter.describe("exa") == "unlimited"
@@ -0,0 +1,36 @@
+import json
+import math
+
+from ipm.models import StockTrendAnalysisResult
+from ipm.records import StockReportRecord, StockReportTable, load_ndjson
+
+REPORT = {
+    "stock_market_fluctuations": [{"index": "NIFTY 50", "change": "+1.2%", "driver": "Banking rally"}, {"index": "NIFTY IT", "driver": "Fell 0.8% on weak guidance"}],
+    "job_market_trends": [{"sector": "Construction", "trend": "Hiring up 8% year on year"}],
+    "economic_news": [{"headline": "RBI holds repo rate", "impact": "Neutral for rate-sensitive stocks"}],
+    "sector_performance": {"Infrastructure": "Outperforming, +3.5%", "IT": "Underperforming", "FMCG": "Flat"},
+    "investment_strategies": ["Overweight capital goods"],
+}
+
+
+def test_load_paths_agree():
+    lines = [json.dumps(REPORT) + "\n", "\n", json.dumps(dict(REPORT, economic_news="none")) + "\n"]
+    models, errors = load_ndjson(lines, StockTrendAnalysisResult)
+    assert models == [StockTrendAnalysisResult.model_validate(REPORT)]
+    assert [number for number, _ in errors] == [3]
+
+    records, _ = load_ndjson(lines[:1], StockTrendAnalysisResult, records=True)
+    trusted, _ = load_ndjson(lines[:1], StockTrendAnalysisResult, records=True, trusted=True)
+    assert records == trusted == [StockReportRecord.from_dict(REPORT)]
+    assert records[0].to_dict() == REPORT
+
+
+def test_typed_fields():
+    record = StockReportRecord.from_dict(REPORT)
+    assert [fluctuation.change_pct for fluctuation in record.fluctuations] == [1.2, -0.8]
+    assert [(sector.rating, sector.change_pct) for sector in record.sectors][:2] == [(1, 3.5), (-1, record.sectors[1].change_pct)]
+    assert math.isnan(record.sectors[1].change_pct) and record.sectors[2].rating == 0
+
+    summary = StockReportTable([record, record]).sector_summary()
+    assert summary["Infrastructure"] == {"reports": 2, "mean_rating": 1.0, "mean_change_pct": 3.5}
+    assert summary["IT"]["mean_change_pct"] is None
@@ -0,0 +1,43 @@
+import pytest
+
+from ipm.tools.relevance import MARKET_KEYWORDS, RelevanceFilter, market_filter
+
+
+def _baseline(article: dict) -> bool:
+    """The keyword loop SerperNewsTool2 used before the relevance filter."""
+    return any(
+        keyword in article.get("snippet", "").lower() or keyword in article.get("title", "").lower()
+        for keyword in MARKET_KEYWORDS
+    )
+
+
+@pytest.mark.parametrize("text", [
+    "Reinvestment plans lift cement makers",  # inside a longer word
+    "Stock markets rally on rate cut",  # plural
+    "Insider-trading probe widens",
+    "The macroeconomy slows",
+])
+def test_keywords_match_as_substrings(text):
+    article = {"title": text, "snippet": ""}
+    assert market_filter.score(article) > 0
+    assert _baseline(article)
+
+
+def test_filter_keeps_what_the_keyword_loop_kept():
+    articles = [
+        {"title": "Steel output rises", "snippet": "Reinvestment in plants"},
+        {"title": "Monsoon arrives early", "snippet": "Farmers plan sowing"},
+        {"title": "STOCK MARKET closes higher", "snippet": ""},
+        {"title": "Budget focus", "snippet": "industry growth seen at 7%"},
+        {"title": "Stock\nmarket wrap", "snippet": "Traders cautious"},
+    ]
+    kept = market_filter.filter(articles)
+    assert sorted(article["title"] for article in kept) == sorted(article["title"] for article in articles if _baseline(article))
+
+
+def test_overlapping_keywords_each_count():
+    relevance = RelevanceFilter({"stock market": 2.0, "market analysis": 1.0, "market": 0.5}, title_weight=1.0)
+    assert relevance.score({"title": "Stock market analysis", "snippet": ""}) == 3.5
+    # Each keyword counts once per article, a title hit worth title_weight snippet hits
+    assert RelevanceFilter({"economy": 1.0}, title_weight=2.0).score({"title": "Economy, economy", "snippet": "the economy"}) == 2.0
+    assert RelevanceFilter({"economy": 1.0}, title_weight=2.0).score({"title": "Rates", "snippet": "the economy"}) == 1.0
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from ipm.knowledge_index import EmbeddingIndex
+from ipm.retriever import VectorSearch
+
+
+@pytest.fixture(scope="module")
+def index(tmp_path_factory):
+    """6000 vectors around 60 topics, the way chunk embeddings cluster."""
+    rng = np.random.default_rng(7)
+    centers = rng.normal(size=(60, 32))
+    vectors = centers[rng.integers(0, 60, size=6000)] + 0.3 * rng.normal(size=(6000, 32))
+    records = [
+        {"id": f"chunk-{i}", "source": f"doc{i % 5}.pdf", "page": i % 40 + 1, "date": f"2024-{i % 12 + 1:02d}-01", "text": ""}
+        for i in range(len(vectors))
+    ]
+    index = EmbeddingIndex(root=str(tmp_path_factory.mktemp("embeddings")))
+    index.add(records, vectors)
+    return index
+
+
+@pytest.fixture(scope="module")
+def queries():
+    rng = np.random.default_rng(11)
+    return rng.normal(size=(40, 32))
+
+
+def _exact(index, queries, k, keep=None):
+    vectors = np.asarray(index.vectors, dtype=np.float64)
+    scores = (queries @ vectors.T) / np.linalg.norm(vectors, axis=1)
+    if keep is not None:
+        scores[:, ~keep] = -np.inf
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def _recall(found, expected) -> float:
+    return np.mean([len(set(f) & set(e)) / len(e) for f, e in zip(found, expected)])
+
+
+def test_brute_force_is_exact(index, queries):
+    search = VectorSearch(index, ivf_threshold=10 ** 9)
+    rows, scores = search.search(queries, k=10)
+    assert search._centroids is None
+    assert (rows == _exact(index, queries, 10)).all()
+    assert (np.diff(scores, axis=1) <= 0).all()  # best first
+
+
+def test_ivf_recall_against_brute_force(index, queries):
+    exact = VectorSearch(index, ivf_threshold=10 ** 9).search(queries, k=10)[0]
+    ivf = VectorSearch(index, ivf_threshold=1000, n_probe=8)
+    rows, _ = ivf.search(queries, k=10)
+    assert ivf._centroids is not None
+    assert _recall(rows, exact) >= 0.9
+    # Probing every list is exhaustive again
+    rows, _ = VectorSearch(index, ivf_threshold=1000, n_probe=10 ** 6).search(queries, k=10)
+    assert _recall(rows, exact) == 1.0
+
+
+def test_ivf_respects_filters(index, queries):
+    search = VectorSearch(index, ivf_threshold=1000, n_probe=8)
+    mask = search.mask(sources=["doc1.pdf", "doc3.pdf"], date_from="2024-03-01")
+    assert mask.sum() >= search.ivf_threshold  # large enough to stay on the IVF path
+    rows, _ = search.search(queries, k=10, mask=mask)
+    assert mask[rows[rows >= 0]].all()
+    assert _recall(rows, _exact(index, queries, 10, keep=mask)) >= 0.9
+
+    # A narrow filter falls back to an exact scan of the matching rows
+    narrow = search.mask(sources=["doc2.pdf"], pages=[3])
+    rows, _ = search.search(queries, k=5, mask=narrow)
+    assert (rows == _exact(index, queries, 5, keep=narrow)).all()
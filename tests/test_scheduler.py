@@ -0,0 +1,70 @@
+import re
+import threading
+
+import pytest
+from crewai import Agent, Task
+from crewai.llm import LLM
+
+from ipm.scheduler import DagCrew, build_task_graph
+
+
+@pytest.fixture
+def prompts(monkeypatch):
+    """Stub LLM answering each task with its own name; collects the prompt of every task."""
+    prompts = {}
+    barrier = threading.Barrier(2, timeout=10)
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None):
+        text = "\n".join(str(message.get("content", "")) for message in messages)
+        name = re.search(r"task-\w+", text).group()
+        prompts[name] = text
+        if name in ("task-a", "task-b"):
+            barrier.wait()  # only returns once both roots are running at the same time
+        if name == "task-fail":
+            raise RuntimeError("provider unavailable")
+        return f"Thought: I now know the final answer\nFinal Answer: result of {name}"
+
+    monkeypatch.setattr(LLM, "call", call)
+    return prompts
+
+
+def _agent(role: str) -> Agent:
+    return Agent(role=role, goal="Answer", backstory="Test agent", llm=LLM(model="gemini/gemini-2.0-flash"), max_retry_limit=0)
+
+
+def _task(name: str, agent: Agent, context=None) -> Task:
+    return Task(description=f"Run {name}.", expected_output="One line.", agent=agent, context=context)
+
+
+def test_graph_follows_declared_context():
+    agent = _agent("Analyst")
+    a, b = _task("task-a", agent), _task("task-b", agent)
+    c = _task("task-c", agent, context=[a, b])
+    assert build_task_graph([a, b, c]) == {0: [], 1: [], 2: [0, 1]}
+
+
+def test_independent_tasks_run_concurrently(prompts):
+    a = _task("task-a", _agent("First analyst"))
+    b = _task("task-b", _agent("Second analyst"))
+    c = _task("task-c", _agent("Editor"), context=[a])
+    crew = DagCrew(agents=[a.agent, b.agent, c.agent], tasks=[a, b, c], max_workers=2)
+
+    result = crew.kickoff()
+
+    # Outputs keep declaration order; the last task's output is the crew's
+    assert [output.raw for output in result.tasks_output] == ["result of task-a", "result of task-b", "result of task-c"]
+    assert result.raw == "result of task-c"
+    # task-c sees only the output of its declared context
+    assert "result of task-a" in prompts["task-c"]
+    assert "result of task-b" not in prompts["task-c"]
+    assert "result of task-" not in prompts["task-a"] + prompts["task-b"]
+
+
+def test_failing_task_surfaces_its_error(prompts):
+    failing = _task("task-fail", _agent("Analyst"))
+    after = _task("task-after", _agent("Editor"), context=[failing])
+    crew = DagCrew(agents=[failing.agent, after.agent], tasks=[failing, after])
+
+    with pytest.raises(RuntimeError, match="provider unavailable"):
+        crew.kickoff()
+    assert "task-after" not in prompts
@@ -0,0 +1,48 @@
+import requests
+
+from ipm.tools import scraper
+from ipm.tools.cache import SQLiteCache, TieredCache, TTLCache
+
+ARTICLE = "<html><head>{meta}<title>Ciment</title></head><body><article><p>{text}</p></article></body></html>"
+TEXT = "La production de ciment a augmenté de 12 % au premier trimestre, portée par les chantiers publics."
+
+
+def _response(body: bytes, content_type: str, status: int = 200, **headers) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response.headers.update({"Content-Type": content_type, **headers})
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    return response
+
+
+def _serve(monkeypatch, tmp_path, responses: list) -> list:
+    sent = []
+    monkeypatch.setattr(scraper, "page_cache", TieredCache(TTLCache(), SQLiteCache(str(tmp_path / "pages.sqlite"))))
+
+    def get(url, headers=None, **kwargs):
+        sent.append(headers)
+        return responses.pop(0)
+
+    monkeypatch.setattr(scraper.scrape_transport, "get", get)
+    return sent
+
+
+def test_html_without_charset_is_decoded_from_its_bytes(monkeypatch, tmp_path):
+    html = ARTICLE.format(meta='<meta charset="utf-8">', text=TEXT).encode("utf-8")
+    _serve(monkeypatch, tmp_path, [_response(html, "text/html")])
+    assert scraper.fetch_page("https://example.com/a")["text"] == TEXT
+
+
+def test_revalidation_sends_only_server_validators(monkeypatch, tmp_path):
+    html = ARTICLE.format(meta="", text=TEXT).encode("utf-8")
+    sent = _serve(monkeypatch, tmp_path, [
+        _response(html, "text/html; charset=utf-8"),
+        _response(html, "text/html; charset=utf-8", ETag='"v1"'),
+        _response(b"", "text/html", status=304),
+    ])
+    scraper.fetch_page("https://example.com/a", max_age=0)
+    scraper.fetch_page("https://example.com/a", max_age=0)
+    assert "If-Modified-Since" not in sent[1] and "If-None-Match" not in sent[1]
+    scraper.fetch_page("https://example.com/a", max_age=0)
+    assert sent[2]["If-None-Match"] == '"v1"' and "If-Modified-Since" not in sent[2]
@@ -0,0 +1,62 @@
+import json
+
+import requests
+
+from ipm.tools import serper_client
+from ipm.tools.cache import TTLCache
+from ipm.tools.news_archive import NewsArchive
+
+
+def _serve(monkeypatch, tmp_path, dates: list) -> list:
+    """Answer Serper with one article per date; returns the payloads sent."""
+    sent = []
+    monkeypatch.setattr(serper_client, "news_archive", NewsArchive(path=str(tmp_path / "news.sqlite")))
+    monkeypatch.setattr(serper_client, "news_cache", TTLCache(maxsize=16))
+
+    def post(url, headers=None, data=None, **kwargs):
+        payload = json.loads(data)
+        sent.append(payload)
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps({"news": [
+            {"title": f"Cement demand report {n}", "link": f"https://news.example.com/{n}", "snippet": "Cement demand", "date": date, "source": "Example"}
+            for n, date in enumerate(dates[:payload["num"]])
+        ]}).encode()
+        return response
+
+    monkeypatch.setattr(serper_client.serper_transport, "post", post)
+    return sent
+
+
+def test_wider_window_or_more_articles_go_to_serper(monkeypatch, tmp_path):
+    sent = _serve(monkeypatch, tmp_path, [f"{n + 1} hours ago" for n in range(15)])
+    assert len(serper_client.search_news("key", "cement demand", tbs="qdr:h", num=3)["news"]) == 1
+    serper_client.search_news("key", "cement demand", tbs="qdr:m", num=10)
+    assert [(payload["tbs"], payload["num"]) for payload in sent] == [("qdr:h", 3), ("qdr:m", 10)]
+
+    assert len(serper_client.search_news("key", "cement demand", tbs="qdr:m", num=15)["news"]) == 15
+    assert [(payload["tbs"], payload["num"]) for payload in sent][-1] == ("qdr:m", 15)
+    # Covered by the fetch above: answered by the archive alone
+    assert len(serper_client.search_news("key", "cement demand", tbs="qdr:w", num=5)["news"]) == 5
+    assert len(sent) == 3
+
+
+def test_articles_at_the_window_edge_are_kept(monkeypatch, tmp_path):
+    _serve(monkeypatch, tmp_path, ["2 hours ago", "3 days ago", "1 week ago", "7 days ago"])
+    assert len(serper_client.search_news("key", "cement demand", tbs="qdr:w", num=4)["news"]) == 4
+
+    _serve(monkeypatch, tmp_path, ["1 hour ago"])
+    assert len(serper_client.search_news("key", "cement demand", tbs="qdr:h", num=1)["news"]) == 1
+
+
+def test_repeat_searches_come_from_memory(monkeypatch, tmp_path):
+    sent = _serve(monkeypatch, tmp_path, ["1 hour ago", "2 hours ago"])
+    first = serper_client.search_news("key", "cement demand", num=2)
+    assert serper_client.search_news("key", "Cement  demand", num=2) == first
+    assert len(sent) == 1
+    stats = serper_client.cache_stats()
+    assert (stats["memory"]["hits"], stats["archive"]["misses"]) == (1, 1)
+
+    # Bypassing the memory tier, the archive answers alone
+    serper_client.search_news("key", "cement demand", num=2, use_cache=False)
+    assert len(sent) == 1 and serper_client.cache_stats()["archive"]["hits"] == 1
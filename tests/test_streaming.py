@@ -0,0 +1,69 @@
+import json
+
+from ipm.streaming import NDJSONWriter, PartialFields
+
+ANSWER = (
+    'Thought: I now know the final answer\nFinal Answer: {"title": "Capex, {steel} and cement",'
+    ' "sectors": [{"name": "Cement", "rating": "Bullish"}], "score": 7.5, "notes": null}'
+)
+
+
+def _feed(chunks):
+    """``(field, value, text fed so far)`` for every field, in the order they completed."""
+    fields, fed = PartialFields(), ""
+    completed = []
+    for chunk in chunks:
+        fed += chunk
+        completed += [(name, value, fed) for name, value in fields.feed(chunk)]
+    return completed
+
+
+def test_fields_complete_once_their_delimiter_arrives():
+    completed = _feed(ANSWER)  # one character at a time
+    assert [(name, value) for name, value, _ in completed] == [
+        ("title", "Capex, {steel} and cement"),
+        ("sectors", [{"name": "Cement", "rating": "Bullish"}]),
+        ("score", 7.5),
+        ("notes", None),
+    ]
+    # Each field is reported exactly when the "," or "}" after its value arrives,
+    # not at the commas and braces inside the value
+    for name, value, fed in completed:
+        assert fed[-1] in ",}"
+        assert fed.rstrip(",}").endswith(json.dumps(value))
+
+
+def test_chunking_does_not_change_the_fields():
+    expected = [(name, value) for name, value, _ in _feed(ANSWER)]
+    for size in (3, 17, len(ANSWER)):
+        chunks = [ANSWER[i:i + size] for i in range(0, len(ANSWER), size)]
+        assert [(name, value) for name, value, _ in _feed(chunks)] == expected
+
+
+def test_text_before_the_final_answer_is_ignored():
+    fields = PartialFields()
+    assert fields.feed('Thought: the tool returned {"price": 10}, checking.\n') == []
+    assert fields.feed('Final Answer: {"price": 12}') == [("price", 12)]
+    assert fields.feed(', "late": 1}') == []  # the object is closed
+
+
+def test_ndjson_writer_frames_one_event_per_line(tmp_path):
+    writer = NDJSONWriter(str(tmp_path / "stream"))
+    events = [
+        ({"type": "crew_started"}, None),
+        ({"type": "token", "text": "line one\nline two"}, "news_report"),
+        ({"type": "task_completed", "output": {"title": "Capex"}}, "news_report"),
+        ({"type": "task_started", "task": "outlook"}, "outlook"),
+    ]
+    for event, stem in events:
+        writer.write(event, stem)
+    # Lines are flushed as they are written, so a reader can tail the files
+    with open(tmp_path / "stream" / "stream.ndjson", encoding="utf-8") as f:
+        assert [json.loads(line) for line in f] == [event for event, _ in events]
+    writer.close()
+
+    with open(tmp_path / "stream" / "news_report.ndjson", encoding="utf-8") as f:
+        lines = f.read().split("\n")
+    assert lines[-1] == ""  # every line is terminated
+    assert [json.loads(line) for line in lines[:-1]] == [event for event, stem in events if stem == "news_report"]
+    assert sorted(path.name for path in (tmp_path / "stream").iterdir()) == ["news_report.ndjson", "outlook.ndjson", "stream.ndjson"]
@@ -0,0 +1,93 @@
+import pytest
+from crewai import Agent
+from crewai.llm import LLM
+
+from ipm import task_cache as task_cache_module
+from ipm.task_cache import CachedTask, TaskResultCache, file_digest, knowledge_digest, task_cache_key
+
+
+class _Files:
+    """Knowledge source stand-in backed by files on disk."""
+
+    def __init__(self, *paths):
+        self.safe_file_paths = list(paths)
+
+
+@pytest.fixture
+def calls(tmp_path, monkeypatch):
+    """Stub LLM counting its calls, and an empty task cache under ``tmp_path``."""
+    calls = []
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None):
+        calls.append(messages)
+        return f"Thought: I now know the final answer\nFinal Answer: answer {len(calls)}"
+
+    monkeypatch.setattr(LLM, "call", call)
+    monkeypatch.setattr(task_cache_module, "task_cache", TaskResultCache(root=str(tmp_path / "tasks")))
+    return calls
+
+
+def _agent(**overrides) -> Agent:
+    config = {"role": "Analyst", "goal": "Answer", "backstory": "Test agent", "llm": LLM(model="gemini/gemini-2.0-flash")}
+    return Agent(**{**config, **overrides})
+
+
+def _task(**overrides) -> CachedTask:
+    config = {"name": "summary", "description": "Summarise the market.", "expected_output": "One line.", "cache": True}
+    return CachedTask(**{**config, **overrides})
+
+
+def test_key_is_stable_and_covers_its_inputs():
+    agent, task = _agent(), _task()
+    key = task_cache_key(task, agent, "upstream", None)
+    # Fresh but identical objects address the same entry
+    assert task_cache_key(_task(), _agent(), "upstream", None) == key
+    changed = [
+        task_cache_key(_task(description="Summarise the bond market."), agent, "upstream", None),
+        task_cache_key(task, _agent(goal="Answer briefly"), "upstream", None),
+        task_cache_key(task, _agent(llm=LLM(model="gemini/gemini-1.5-pro")), "upstream", None),
+        task_cache_key(task, agent, "other upstream", None),
+    ]
+    assert key not in changed
+    assert len(set(changed)) == len(changed)
+
+
+def test_knowledge_digest_follows_file_bytes(tmp_path):
+    path = tmp_path / "notes.md"
+    path.write_text("capex is rising")
+    before = knowledge_digest([_Files(str(path))])
+    assert knowledge_digest([_Files(str(path))]) == before
+    assert file_digest(str(path)) == file_digest(str(path))
+
+    path.write_text("capex is falling")
+    assert knowledge_digest([_Files(str(path))]) != before
+
+
+def test_repeat_run_is_served_from_the_cache(calls):
+    first = _task().execute_sync(agent=_agent())
+    second = _task().execute_sync(agent=_agent())
+    assert len(calls) == 1
+    assert second.raw == first.raw == "answer 1"
+
+    # Different upstream context is a different run
+    _task().execute_sync(agent=_agent(), context="new upstream output")
+    assert len(calls) == 2
+
+
+def test_invalidate_and_bypass(calls, monkeypatch):
+    _task().execute_sync(agent=_agent())
+    _task(name="outlook").execute_sync(agent=_agent())
+    store = task_cache_module.task_cache
+    assert store.task_names() == ["outlook", "summary"]
+
+    assert store.invalidate(["summary"]) == 1
+    assert store.task_names() == ["outlook"]
+    _task().execute_sync(agent=_agent())
+    assert len(calls) == 3
+
+    # IPM_TASK_CACHE=0 (as train and test set) neither reads nor writes
+    monkeypatch.setenv("IPM_TASK_CACHE", "0")
+    assert store.invalidate() == 2
+    CachedTask(name="summary", description="Summarise the market.", expected_output="One line.").execute_sync(agent=_agent())
+    assert len(calls) == 4
+    assert store.task_names() == []
@@ -0,0 +1,116 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+import requests
+
+from ipm.tools import serper_client
+from ipm.tools.cache import TTLCache
+from ipm.tools.news_archive import NewsArchive
+from ipm.tools.serper_news import SerperNewsTool
+from ipm.tools.transport import HttpTransport
+
+
+class StubServer:
+    """Local server answering each request with the next scripted ``(status, delay, headers, body)``."""
+
+    def __init__(self, *script):
+        self.script = list(script)
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _reply(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                stub.requests.append((self.command, self.path, self.rfile.read(length)))
+                status, delay, headers, body = stub.script.pop(0) if stub.script else (200, 0, {}, b"{}")
+                time.sleep(delay)
+                self.send_response(status)
+                for name, value in {"Content-Type": "application/json", **headers}.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = _reply
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_port}"
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def _transport(**kwargs) -> HttpTransport:
+    return HttpTransport(**{"timeout": 1.0, "max_retries": 3, "backoff_base": 0.01, "backoff_max": 0.05, **kwargs})
+
+
+def test_retries_429_and_5xx_with_backoff():
+    with StubServer((503, 0, {}, b""), (429, 0, {"Retry-After": "0"}, b""), (200, 0, {}, b'{"ok": true}')) as server:
+        transport = _transport()
+        response = transport.post(f"{server.url}/news", data="{}")
+    assert response.status_code == 200 and response.json() == {"ok": True}
+    assert len(server.requests) == 3 and transport.retries == 2
+
+
+def test_gives_up_after_max_retries_with_the_last_response():
+    with StubServer(*[(500, 0, {}, b"")] * 3) as server:
+        transport = _transport(max_retries=2)
+        assert transport.get(f"{server.url}/page").status_code == 500
+    assert len(server.requests) == 3
+
+
+def test_client_errors_are_not_retried():
+    with StubServer((404, 0, {}, b"")) as server:
+        assert _transport().get(f"{server.url}/page").status_code == 404
+    assert len(server.requests) == 1
+
+
+def test_timeouts_are_retried_then_raised():
+    with StubServer((200, 0.3, {}, b"{}"), (200, 0.3, {}, b"{}")) as server:
+        transport = _transport(timeout=0.1, max_retries=1)
+        with pytest.raises(requests.Timeout):
+            transport.get(f"{server.url}/slow")
+    assert transport.retries == 1
+
+
+def test_async_post_retries_and_times_out():
+    async def run(url):
+        transport = _transport()
+        response = await transport.apost(f"{url}/news", content="{}")
+        slow = _transport(timeout=0.1, max_retries=1)
+        with pytest.raises(httpx.TimeoutException):
+            await slow.apost(f"{url}/slow", content="{}")
+        return response, transport.retries, slow.retries
+
+    with StubServer((502, 0, {}, b""), (200, 0, {}, b'{"ok": true}'), (200, 0.3, {}, b""), (200, 0.3, {}, b"")) as server:
+        response, retries, slow_retries = asyncio.run(run(server.url))
+    assert response.status_code == 200 and response.json() == {"ok": True}
+    assert (retries, slow_retries) == (1, 1)
+
+
+def test_serper_tool_arun_goes_through_the_transport(monkeypatch, tmp_path):
+    news = {"news": [{"title": "Cement demand rises", "link": "https://news.example.com/1", "snippet": "Cement", "date": "1 hour ago", "source": "Example"}]}
+    with StubServer((503, 0, {}, b""), (200, 0, {}, json.dumps(news).encode())) as server:
+        monkeypatch.setattr(serper_client, "SERPER_NEWS_URL", f"{server.url}/news")
+        monkeypatch.setattr(serper_client, "serper_transport", _transport())
+        monkeypatch.setattr(serper_client, "news_archive", NewsArchive(path=str(tmp_path / "news.sqlite")))
+        monkeypatch.setattr(serper_client, "news_cache", TTLCache())
+        result = asyncio.run(SerperNewsTool(api_key="test")._arun(query="cement demand"))
+    assert [article["link"] for article in result] == ["https://news.example.com/1"]
+    assert len(server.requests) == 2 and json.loads(server.requests[1][2])["q"] == "cement demand"